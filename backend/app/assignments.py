@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, update
+from sqlmodel import Session, select
+from .models import Assignment, ConfigModel, Dataset, Solution
+
+
+def _rows(solution_id: int, rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"solution_id": solution_id, "member_id": m["id"], "room_id": room["id"]}
+        for room in rooms
+        for m in room.get("members", [])
+    ]
+
+
+def save_solution(
+    session: Session,
+    dataset_id: int,
+    config_id: int,
+    rooms: List[Dict[str, Any]],
+    score: float,
+    runtime_ms: int,
+    params: Optional[Dict[str, Any]] = None,
+) -> Solution:
+    # Only (member id, room id) pairs are stored; details are joined back on read
+    solution = Solution(
+        dataset_id=dataset_id,
+        config_id=config_id,
+        score=score,
+        runtime_ms=runtime_ms,
+        params_json=json.dumps(params) if params is not None else None,
+    )
+    session.add(solution)
+    session.flush()
+    rows = _rows(solution.id or 0, rooms)
+    if rows:
+        session.execute(insert(Assignment), rows)
+    session.commit()
+    session.refresh(solution)
+    return solution
+
+
+def load_assignment(session: Session, solution_id: int) -> Dict[str, Optional[str]]:
+    # member id -> room id (None = unassigned), in insertion order
+    rows = session.exec(
+        select(Assignment.member_id, Assignment.room_id)
+        .where(Assignment.solution_id == solution_id)
+        .order_by(Assignment.id)
+    )
+    return {mid: rid for mid, rid in rows}
+
+
+def load_assignment_matrix(
+    session: Session, solution_ids: List[int], member_ids: List[str]
+) -> Tuple[np.ndarray, List[str]]:
+    """Rooms of many solutions from one query, as compact integer vectors.
+
+    Returns an S×P int32 array (rows follow solution_ids, columns member_ids) of
+    indices into the returned room id list; -1 means unassigned or no row.
+    Members outside member_ids are skipped.
+    """
+    row_of = {sid: s for s, sid in enumerate(solution_ids)}
+    col_of = {mid: p for p, mid in enumerate(member_ids)}
+    codes = np.full((len(solution_ids), len(member_ids)), -1, dtype=np.int32)
+    room_code: Dict[str, int] = {}
+    if not solution_ids:
+        return codes, []
+    rows = session.exec(
+        select(Assignment.solution_id, Assignment.member_id, Assignment.room_id)
+        .where(Assignment.solution_id.in_(solution_ids))
+    )
+    for sid, mid, rid in rows:
+        p = col_of.get(mid)
+        if p is not None and rid is not None:
+            codes[row_of[sid], p] = room_code.setdefault(rid, len(room_code))
+    return codes, list(room_code)
+
+
+def build_rooms(
+    rooms_spec: List[Dict[str, Any]],
+    members: Dict[str, Any],
+    assignment: Dict[str, Optional[str]],
+) -> List[Dict[str, Any]]:
+    # Room layout comes from the config, member details from the dataset
+    by_id = {m["id"]: m for m in members.get("members", [])}
+    rooms = [
+        {"id": room.get("id"), "label": room.get("label"), "capacity": int(room.get("capacity", 0)), "members": []}
+        for room in rooms_spec
+    ]
+    room_idx = {room["id"]: r for r, room in enumerate(rooms)}
+    for mid, rid in assignment.items():
+        if rid is None:
+            continue
+        if rid not in room_idx:
+            room_idx[rid] = len(rooms)
+            rooms.append({"id": rid, "label": rid, "capacity": 0, "members": []})
+        rooms[room_idx[rid]]["members"].append(by_id.get(mid, {"id": mid, "name": mid}))
+    return rooms
+
+
+def load_rooms(session: Session, solution: Solution) -> List[Dict[str, Any]]:
+    dataset = session.get(Dataset, solution.dataset_id)
+    config = session.get(ConfigModel, solution.config_id)
+    members = dataset.get_members() if dataset else {}
+    rooms_spec = json.loads(config.config_json or "{}").get("rooms", []) if config else []
+    return build_rooms(rooms_spec, members, load_assignment(session, solution.id or 0))
+
+
+def set_rooms(session: Session, solution: Solution, rooms_of: Dict[str, Optional[str]]) -> None:
+    # Manual moves: one row update per member and a single version bump; the caller commits
+    if not rooms_of:
+        return
+    existing = set(session.exec(
+        select(Assignment.member_id).where(
+            Assignment.solution_id == solution.id, Assignment.member_id.in_(list(rooms_of))
+        )
+    ))
+    table = Assignment.__table__
+    updates = [{"mid": mid, "rid": rid} for mid, rid in rooms_of.items() if mid in existing]
+    if updates:
+        session.execute(
+            update(table)
+            .where(table.c.solution_id == solution.id, table.c.member_id == bindparam("mid"))
+            .values(room_id=bindparam("rid")),
+            updates,
+        )
+    inserts = [
+        {"solution_id": solution.id, "member_id": mid, "room_id": rid}
+        for mid, rid in rooms_of.items()
+        if mid not in existing
+    ]
+    if inserts:
+        session.execute(insert(Assignment), inserts)
+    solution.version += 1
+    session.add(solution)
+
+
+def set_room(session: Session, solution: Solution, member_id: str, room_id: Optional[str]) -> None:
+    set_rooms(session, solution, {member_id: room_id})
+
+
+def migrate_rooms_json(session: Session) -> int:
+    """Move solutions stored as rooms_json blobs into Assignment rows.
+
+    Idempotent: a solution's rows are rewritten from its blob and the blob is
+    cleared in the same transaction. Returns the number of solutions migrated.
+    """
+    legacy = session.exec(select(Solution).where(Solution.rooms_json.is_not(None))).all()
+    for solution in legacy:
+        session.execute(delete(Assignment).where(Assignment.solution_id == solution.id))
+        rows = _rows(solution.id or 0, json.loads(solution.rooms_json or "[]"))
+        if rows:
+            session.execute(insert(Assignment), rows)
+        solution.rooms_json = None
+        session.add(solution)
+    session.commit()
+    return len(legacy)
@@ -1,6 +1,39 @@
 from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
+import math
+import os
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    # CPUs allowed by the container's CFS quota (cgroup v2, then v1); None when unlimited
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota_us = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period_us = int(f.read())
+        return None if quota_us <= 0 else quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    # Cores this process may actually use: affinity mask capped by the cgroup quota
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
 
 
 class Settings(BaseSettings):
@@ -12,6 +45,14 @@ class Settings(BaseSettings):
     admin_email: str = Field(default="admin@example.com")
     admin_password: str = Field(default="admin123")
     database_url: str = Field(default="sqlite:///./app.db")
+    optimize_workers: int = Field(default=2)
+    data_dir: str = Field(default="app_data")
+    result_cache_size: int = Field(default=64)
+    result_cache_ttl_sec: float = Field(default=3600.0)
+    # Solver threads all weight sweeps together may use; the rest stays for /optimize
+    sweep_cores: int = Field(default_factory=lambda: max(1, available_cpus() // 2))
+    # CP-SAT threads per solve; unset = every core the container may use
+    solver_workers: Optional[int] = Field(default=None)
 
     model_config = {
         "env_prefix": "",
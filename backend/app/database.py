@@ -1,7 +1,9 @@
-from typing import Iterator
+from typing import Any, Iterator, List
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import inspect, text
 from sqlalchemy.engine import Engine
 from .config import get_settings
+from .assignments import migrate_rooms_json
 
 _settings = get_settings()
 engine: Engine = create_engine(
@@ -10,8 +12,46 @@ engine: Engine = create_engine(
 )
 
 
+def _add_missing_columns() -> None:
+    # create_all never alters existing tables; add columns and indexes introduced since they were created
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {col["name"] for col in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(engine.dialect)}"
+                if col.server_default is not None:
+                    ddl += f" DEFAULT {col.server_default.arg}"
+                conn.execute(text(ddl))
+            # Indexes whose uniqueness changed are rebuilt; duplicate rows then fail loudly here
+            unique = {ix["name"]: bool(ix["unique"]) for ix in insp.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in unique and unique[index.name] != bool(index.unique):
+                    index.drop(conn)
+                    if index.name in _KEEP_LAST:
+                        _drop_shadowed_rows(conn, table.name, [col.name for col in index.columns])
+                index.create(conn, checkfirst=True)
+
+
+# Unique indexes over rows where readers already took the last one (highest id) as current,
+# so older duplicates are dropped instead of failing the rebuild
+_KEEP_LAST = {"ix_assignment_solution_member"}
+
+
+def _drop_shadowed_rows(conn: Any, table: str, columns: List[str]) -> None:
+    cols = ", ".join(columns)
+    conn.execute(text(f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {cols})"))
+
+
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    with Session(engine) as session:
+        migrate_rooms_json(session)
 
 
 def get_session() -> Iterator[Session]:
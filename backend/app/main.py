@@ -1,9 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 from .config import get_settings
 from .database import init_db, engine
 from .auth import get_or_create_admin
+from .services.jobs import shutdown_job_manager
+from .services.weights import MissingWeightsError
 from .routers import auth, health, upload, config as cfg, optimize, solution
 from .routers import export_pdf
 
@@ -33,6 +36,13 @@ def create_app() -> FastAPI:
     app.include_router(solution.router)
     app.include_router(export_pdf.router)
 
+    app.add_event_handler("shutdown", shutdown_job_manager)
+
+    @app.exception_handler(MissingWeightsError)
+    async def missing_weights(request: Request, exc: MissingWeightsError) -> JSONResponse:
+        # Any endpoint that scores against the config ends up here
+        return JSONResponse(status_code=409, content={"detail": str(exc)})
+
     return app
 
 
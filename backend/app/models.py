@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Optional
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, Text
+from sqlalchemy import Column, Index, LargeBinary, Text
 import json
 
 
@@ -38,14 +38,97 @@ class Solution(SQLModel, table=True):
     config_id: int = Field(index=True)
     score: float = 0.0
     runtime_ms: int = 0
+    # Bumped on every edit so cached views can tell they are stale
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Legacy blob of rooms with full member objects; moved into Assignment rows at startup
     rooms_json: Optional[str] = Field(default=None, sa_column=Column(Text))
     audit_log_json: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Engine, time limit and CP-SAT settings the solution was produced with
+    params_json: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Last move number handed out, and the move the current assignment ends at (0 = as solved)
+    move_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    head_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+    def get_params(self) -> dict:
+        return json.loads(self.params_json or "{}")
+
+
+class Assignment(SQLModel, table=True):
+    __table_args__ = (
+        # One row per member; a second write for the same member fails instead of shadowing the first
+        Index("ix_assignment_solution_member", "solution_id", "member_id", unique=True),
+        Index("ix_assignment_solution_room", "solution_id", "room_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    solution_id: int
+    member_id: str
+    # None = unassigned (staging)
+    room_id: Optional[str] = None
 
 
 class Move(SQLModel, table=True):
+    # Append-only: undo and redo move Solution.head_seq, rows are never changed.
+    # Moves form a tree (prev links) so edits after an undo start a new branch.
+    __table_args__ = (
+        # A lost update that reuses a move number fails instead of forking the history
+        Index("ix_move_solution_seq", "solution_id", "seq", unique=True),
+        Index("ix_move_solution_prev", "solution_id", "prev"),
+        Index("ix_move_solution_batch", "solution_id", "batch"),
+        Index("ix_move_solution_base", "solution_id", "base"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     solution_id: int = Field(index=True)
     member_id: str
     from_room_id: Optional[str] = None
     to_room_id: Optional[str] = None
     reason: Optional[str] = None
+    # Move number within the solution (None on moves logged before history was kept)
+    seq: Optional[int] = None
+    # Move this one was applied after (0 = the solved assignment) and its distance from it
+    prev: Optional[int] = None
+    depth: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # First move of the batch it was applied in; undo and redo work batch by batch
+    batch: Optional[int] = None
+    # Snapshot (by move number) that replay to this move starts from
+    base: Optional[int] = None
+
+
+class SolutionSnapshot(SQLModel, table=True):
+    # Full assignment after move `seq` (0 = before the first move), zlib-compressed JSON
+    __table_args__ = (Index("ix_snapshot_solution_seq", "solution_id", "seq", unique=True),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    solution_id: int
+    seq: int = 0
+    depth: int = 0
+    data: bytes = Field(sa_column=Column(LargeBinary))
+
+
+class SolveRun(SQLModel, table=True):
+    # Telemetry of one optimizer run, used to pick time limits for similar instances
+    __table_args__ = (Index("ix_solverun_engine_members", "engine", "members"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    solution_id: Optional[int] = Field(default=None, index=True)
+    engine: str = "cpsat"
+    status: str = ""
+    # Started from a stored solution; such runs say little about a cold solve
+    warm_start: bool = False
+    members: int = 0
+    rooms: int = 0
+    pairs: Optional[int] = None
+    variables: Optional[int] = None
+    time_limit_sec: float = 0.0
+    workers: Optional[int] = None
+    runtime_ms: int = 0
+    # When the final incumbent was found
+    time_to_best_ms: int = 0
+    score: float = 0.0
+    bound: Optional[float] = None
+    # [elapsedMs, score, bound] per incumbent
+    curve_json: Optional[str] = Field(default=None, sa_column=Column(Text))
+
+    def get_curve(self) -> list:
+        return json.loads(self.curve_json or "[]")
@@ -2,10 +2,13 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 import json
+import os
+import uuid
+from ..config import get_settings
 from ..database import get_session
 from ..models import ConfigModel, Dataset
 from ..schemas import ConfigSaveRequest
-from ..services.weights import build_pairwise_weights
+from ..services.weights import build_pairwise_matrix, build_pairwise_weights, save_pairwise_matrix
 
 router = APIRouter(prefix="/config", tags=["config"]) 
 
@@ -15,16 +18,35 @@ def save_config(
     payload: ConfigSaveRequest,
     session: Annotated[Session, Depends(get_session)],
 ):
-    # If pairwiseW is missing, compute it from dataset members
+    # If pairwiseW is missing, compute it from dataset members. By default the matrix
+    # goes to a float32 .npy next to the uploads; "pairwiseFormat": "json" keeps it inline.
     cfg = dict(payload.config)
+    matrix = None
     if not cfg.get("pairwiseW"):
         dataset = session.get(Dataset, payload.datasetId)
         if not dataset:
             raise HTTPException(status_code=404, detail="Dataset not found")
         members_doc = dataset.get_members()
-        cfg["pairwiseW"] = build_pairwise_weights(members_doc)
+        if cfg.get("pairwiseFormat", "npy") == "json":
+            cfg["pairwiseW"] = build_pairwise_weights(members_doc)
+        else:
+            cfg.pop("pairwiseW", None)
+            matrix = build_pairwise_matrix(members_doc)
+    path = None
+    if matrix is not None:
+        # Written before the row exists, so the name cannot use the config id
+        ids, W = matrix
+        # Absolute, so the file is found whatever directory the server is started from
+        path = os.path.abspath(os.path.join(get_settings().data_dir, "weights", f"config_{uuid.uuid4().hex}.npy"))
+        cfg["pairwiseFile"] = save_pairwise_matrix(path, W)
+        cfg["pairwiseIds"] = ids
     config = ConfigModel(dataset_id=payload.datasetId, config_json=json.dumps(cfg))
     session.add(config)
-    session.commit()
+    try:
+        session.commit()
+    except Exception:
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        raise
     session.refresh(config)
     return {"configId": config.id}
@@ -1,43 +1,304 @@
-from typing import Annotated
+from typing import Annotated, Any, Callable, Dict
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
+import asyncio
+import json
+from ..assignments import load_assignment, load_rooms, save_solution
 from ..database import get_session
 from ..models import Dataset, ConfigModel, Solution
-from ..schemas import OptimizeRequest, OptimizeResponse, RoomResponse
+from ..schemas import (
+    OptimizeRequest,
+    OptimizeResponse,
+    RoomResponse,
+    FeasibilityReport,
+    JobSubmitResponse,
+    JobStatusResponse,
+    SweepRequest,
+    TimeLimitSuggestion,
+)
 from ..services.optimize import run_optimization
+from ..services.feasibility import check_feasibility
+from ..services.jobs import Job, get_job_manager
+from ..services.result_cache import get_result_cache, result_key
+from ..services.sweep import weight_points
+from ..services.telemetry import record_run, suggest_settings
 
 router = APIRouter(prefix="/optimize", tags=["optimize"]) 
 
 
+def _store_solution(session: Session, dataset_id: int, config_id: int, result: Dict[str, Any]) -> Solution:
+    solution = save_solution(
+        session, dataset_id, config_id, result["rooms"], result["score"], result["runtimeMs"], result.get("solverParams")
+    )
+    record_run(session, result, solution.id)
+    return solution
+
+
+def _warm_start_options(session: Session, payload: OptimizeRequest, dataset_id: int) -> Dict[str, Any]:
+    if payload.solutionId is None:
+        return {}
+    base = session.get(Solution, payload.solutionId)
+    if not base:
+        raise HTTPException(status_code=404, detail="Solution not found")
+    if base.dataset_id != dataset_id:
+        raise HTTPException(status_code=400, detail="Solution belongs to a different dataset")
+    assignment = {mid: rid for mid, rid in load_assignment(session, base.id or 0).items() if rid is not None}
+    return {
+        "base_assignment": assignment,
+        "locked_room_ids": payload.lockedRoomIds,
+        "minimize_moves": payload.minimizeMoves,
+    }
+
+
+def _suggest(session: Session, payload: OptimizeRequest, members: Dict[str, Any], config: ConfigModel) -> Dict[str, Any]:
+    rooms = json.loads(config.config_json or "{}").get("rooms", [])
+    return suggest_settings(session, len(members.get("members", [])), len(rooms), payload.engine)
+
+
+def _requested_options(session: Session, payload: OptimizeRequest, dataset_id: int) -> Dict[str, Any]:
+    # As the caller sent them: unset fields stay None, which is what the cache key uses
+    return {
+        **_warm_start_options(session, payload, dataset_id),
+        "time_limit_sec": payload.timeLimitSec,
+        "engine": payload.engine,
+        "solver_params": payload.solver.model_dump(exclude_none=True),
+    }
+
+
+def _run_options(
+    session: Session, payload: OptimizeRequest, members: Dict[str, Any], config: ConfigModel, requested: Dict[str, Any]
+) -> Dict[str, Any]:
+    # An unset time limit or worker count is filled in from runs on similar cohorts
+    solver_params = dict(requested["solver_params"])
+    time_limit_sec = requested["time_limit_sec"]
+    if time_limit_sec is None or "workers" not in solver_params:
+        suggested = _suggest(session, payload, members, config)
+        if time_limit_sec is None:
+            time_limit_sec = suggested["timeLimitSec"]
+        if "workers" not in solver_params and suggested["workers"] is not None:
+            solver_params["workers"] = suggested["workers"]
+    return {**requested, "time_limit_sec": time_limit_sec, "solver_params": solver_params}
+
+
+def _cache_key(members: Dict[str, Any], config: ConfigModel, requested: Dict[str, Any]) -> str:
+    # The suggestion changes as runs are recorded; keying on it would miss identical requests
+    return result_key(members, json.loads(config.config_json or "{}"), requested)
+
+
+def _cache_entry(solution: Solution, result: Dict[str, Any]) -> Dict[str, Any]:
+    # Rooms live in the Assignment rows; the entry keeps only what the response adds
+    keys = ("score", "hardViolations", "softScores", "runtimeMs", "moved", "solverParams")
+    summary = {k: result[k] for k in keys if k in result}
+    return {"solutionId": solution.id, "version": solution.version, "result": summary}
+
+
+def _cached_solution(session: Session, entry: Dict[str, Any]) -> Solution | None:
+    # A solution edited since it was cached no longer is the optimizer's answer
+    solution = session.get(Solution, entry["solutionId"])
+    if solution is None or solution.version != entry["version"]:
+        return None
+    return solution
+
+
+def _load_inputs(session: Session, payload: OptimizeRequest | SweepRequest) -> tuple[Dataset, ConfigModel]:
+    dataset = session.get(Dataset, payload.datasetId)
+    config = session.get(ConfigModel, payload.configId)
+    if not dataset or not config:
+        raise HTTPException(status_code=404, detail="Dataset or config not found")
+    return dataset, config
+
+
+def _persist(bind: Any, dataset_id: int, config_id: int, key: str) -> Callable[[Job], None]:
+    # Runs on whichever thread finishes the job, so it opens its own session
+    def persist(job: Job) -> None:
+        with Session(bind) as s:
+            solution = _store_solution(s, dataset_id, config_id, job.result or {})
+            job.solution_id = solution.id
+            get_result_cache().put(key, _cache_entry(solution, job.result or {}))
+
+    return persist
+
+
 @router.post("", response_model=OptimizeResponse)
 def optimize(
     payload: OptimizeRequest,
     session: Annotated[Session, Depends(get_session)],
 ):
-    dataset = session.get(Dataset, payload.datasetId)
-    config = session.get(ConfigModel, payload.configId)
-    if not dataset or not config:
-        raise HTTPException(status_code=404, detail="Dataset or config not found")
+    dataset, config = _load_inputs(session, payload)
+    dataset_id, config_id = dataset.id or 0, config.id or 0
     members = dataset.get_members()
+    requested = _requested_options(session, payload, dataset_id)
+    options = _run_options(session, payload, members, config, requested)
+    key = _cache_key(members, config, requested)
+    cache = get_result_cache()
 
-    result = run_optimization(members=members, config_json=config.config_json or "{}", time_limit_sec=payload.timeLimitSec)
+    entry = cache.get(key)
+    hit = entry is not None and _cached_solution(session, entry) is not None
+    if not hit:
+        if entry is not None:
+            cache.discard(key)
 
-    solution = Solution(
-        dataset_id=dataset.id or 0,
-        config_id=config.id or 0,
-        score=result["score"],
-        runtime_ms=result["runtimeMs"],
-        rooms_json=__import__("json").dumps(result["rooms"]),
-    )
-    session.add(solution)
-    session.commit()
-    session.refresh(solution)
+        def solve(job: Job) -> Dict[str, Any]:
+            return run_optimization(
+                members=members,
+                config_json=config.config_json or "{}",
+                on_progress=lambda ev: job.add_event({"type": "progress", **ev}),
+                cancel_event=job.cancel_event,
+                **options,
+            )
+
+        # Solved on this thread, unless a job or request with the same key already is
+        job = get_job_manager().run_inline(key, solve, on_done=_persist(session.get_bind(), dataset_id, config_id, key))
+        if job.result is not None and "infeasibility" in job.result:
+            raise HTTPException(
+                status_code=422, detail={"status": job.result["status"], **job.result["infeasibility"]}
+            )
+        if job.status == "cancelled":
+            raise HTTPException(status_code=409, detail="Optimization was cancelled")
+        if job.status != "done":
+            if job.future is not None and not job.future.cancelled() and job.future.exception() is not None:
+                raise job.future.exception()
+            raise HTTPException(status_code=500, detail=job.error)
+        entry = {"solutionId": job.solution_id, "result": job.result}
 
+    solution = session.get(Solution, entry["solutionId"])
+    result = entry["result"]
     return OptimizeResponse(
-        solutionId=solution.id or 0,
-        rooms=[RoomResponse(**room) for room in result["rooms"]],
+        solutionId=entry["solutionId"],
+        rooms=[RoomResponse(**room) for room in load_rooms(session, solution)] if solution else [],
         score=result["score"],
         hardViolations=result.get("hardViolations", []),
         softScores=result.get("softScores", {}),
         runtimeMs=result["runtimeMs"],
+        moved=result.get("moved"),
+        cached=hit,
+        solverParams=result.get("solverParams", {}),
+    )
+
+
+@router.post("/check", response_model=FeasibilityReport)
+def check(
+    payload: OptimizeRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    dataset, config = _load_inputs(session, payload)
+    return check_feasibility(dataset.get_members(), json.loads(config.config_json or "{}"))
+
+
+@router.post("/suggest", response_model=TimeLimitSuggestion)
+def suggest(
+    payload: OptimizeRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    # What a run without timeLimitSec (or solver.workers) would use
+    dataset, config = _load_inputs(session, payload)
+    return _suggest(session, payload, dataset.get_members(), config)
+
+
+MAX_SWEEP_POINTS = 256
+
+
+@router.post("/sweep", response_model=JobSubmitResponse, status_code=202)
+def sweep(
+    payload: SweepRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    dataset, config = _load_inputs(session, payload)
+    config_doc = json.loads(config.config_json or "{}")
+    if payload.samples and any(len(bounds) != 2 for bounds in payload.ranges.values()):
+        raise HTTPException(status_code=400, detail="Each range must be [low, high]")
+    points = weight_points(
+        payload.points, payload.grid, payload.samples, payload.ranges, payload.seed,
+        defaults=config_doc.get("weights"),
+    )
+    if not points:
+        raise HTTPException(status_code=400, detail="No weight vectors to try")
+    if len(points) > MAX_SWEEP_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_POINTS} weight vectors per sweep")
+
+    # Follow it through the job endpoints; the runs are in the status once finished
+    job = get_job_manager().submit_sweep(
+        dataset.get_members(), config_doc, points, payload.timeLimitSec, payload.cores
     )
+    return JobSubmitResponse(jobId=job.id)
+
+
+def _job_status(job: Job) -> JobStatusResponse:
+    sweep = job.kind == "sweep" and job.result is not None and "infeasibility" not in job.result
+    return JobStatusResponse(
+        jobId=job.id,
+        status=job.status,
+        solutionId=job.solution_id,
+        score=job.result["score"] if job.status == "done" and job.result and job.kind == "optimize" else None,
+        progress=job.events[-1] if job.events else None,
+        error=job.error,
+        sweep=job.result if sweep else None,
+    )
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+def submit_job(
+    payload: OptimizeRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    dataset, config = _load_inputs(session, payload)
+    dataset_id, config_id = dataset.id or 0, config.id or 0
+    members = dataset.get_members()
+    requested = _requested_options(session, payload, dataset_id)
+    options = _run_options(session, payload, members, config, requested)
+    key = _cache_key(members, config, requested)
+    cache = get_result_cache()
+
+    entry = cache.get(key)
+    if entry is not None:
+        if _cached_solution(session, entry) is not None:
+            job = get_job_manager().completed(entry["result"], entry["solutionId"])
+            return JobSubmitResponse(jobId=job.id, cached=True)
+        cache.discard(key)
+
+    # An identical job or /optimize request that is still running is shared instead of solved twice
+    job = get_job_manager().submit(
+        members, config.config_json or "{}", on_done=_persist(session.get_bind(), dataset_id, config_id, key),
+        key=key, **options,
+    )
+    return JobSubmitResponse(jobId=job.id)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def job_status(job_id: str):
+    return _job_status(_get_job(job_id))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatusResponse)
+def cancel_job(job_id: str):
+    _get_job(job_id)
+    return _job_status(get_job_manager().cancel(job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = _get_job(job_id)
+
+    async def stream():
+        sent = 0
+        while True:
+            # Read the flag before the events so nothing appended in between is lost
+            drained = job.drained
+            # A slow reader skips events the job no longer keeps
+            events, sent = job.events_since(sent)
+            for ev in events:
+                yield f"event: progress\ndata: {json.dumps(ev)}\n\n"
+            if job.finished and drained:
+                yield f"event: {job.status}\ndata: {_job_status(job).model_dump_json()}\n\n"
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,63 +1,498 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlmodel import Session
-import csv
-import io
+from typing import Annotated, Any, Callable, Dict, Iterator, List, Literal, Optional, Set, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import Session, select
+import asyncio
+import hashlib
 import json
+from ..assignments import build_rooms, load_assignment, load_assignment_matrix, load_rooms, save_solution, set_rooms
 from ..database import get_session
-from ..models import Solution, Move
-from ..schemas import ApplyMoveRequest
-from ..services.validate import validate_solution_move
+from ..models import Solution, Dataset, ConfigModel
+from ..schemas import (
+    ApplyMoveRequest,
+    BatchMoveRequest,
+    CompareRequest,
+    CompareResponse,
+    MoveOp,
+    NeighborhoodRequest,
+    OptimizeResponse,
+    RoomResponse,
+    SolutionSummary,
+)
+from ..services.compare import compare_solutions
+from ..services.evaluate import SolutionState, forget_solution_state, get_solution_state, remember_solution_state
+from ..services.exports import (
+    cached_pdf, csv_chunks, etag, json_chunks, not_modified, open_chunks, rooms_digest, zip_chunks,
+)
+from ..services.history import append_moves, redo_moves, replay, undo_moves
+from ..services.live import delta_message, get_live_hub
+from ..services.neighborhood import reoptimize_neighborhood
+from ..services.scoring import rooms_soft_scores
 
 router = APIRouter(prefix="/solution", tags=["solution"]) 
 
 
+def _get_solution(session: Session, solution_id: int) -> Solution:
+    sol = session.get(Solution, solution_id)
+    if not sol:
+        raise HTTPException(status_code=404, detail="Solution not found")
+    return sol
+
+
+def _solution_state(session: Session, solution_id: int) -> tuple[Solution, SolutionState]:
+    sol = _get_solution(session, solution_id)
+
+    def build() -> SolutionState:
+        dataset = session.get(Dataset, sol.dataset_id)
+        config = session.get(ConfigModel, sol.config_id)
+        if not dataset or not config:
+            raise HTTPException(status_code=404, detail="Dataset or config not found")
+        members, cfg = dataset.get_members(), json.loads(config.config_json or "{}")
+        rooms = build_rooms(cfg.get("rooms", []), members, load_assignment(session, solution_id))
+        return SolutionState(members, cfg, rooms)
+
+    return sol, get_solution_state(solution_id, sol.version, build)
+
+
+def _commit_moves(
+    session: Session,
+    sol: Solution,
+    state: SolutionState,
+    result: Dict[str, Any],
+    reject_new_violations: bool = False,
+    log: bool = True,
+    breakdown: bool = True,
+) -> Dict[str, Any]:
+    # Persist a batch already applied to `state` in one transaction; the state is
+    # reverted when the batch is rejected and dropped from the cache if the write fails.
+    # Undo and redo pass log=False: they only move the head of the existing log.
+    # Connected clients get the delta; live edits skip the O(members) breakdown.
+    moves = result.pop("moves")
+    if reject_new_violations and result["newViolations"]:
+        state.revert(moves)
+        raise HTTPException(status_code=409, detail={"newViolations": result["newViolations"]})
+    try:
+        if log:
+            append_moves(session, sol, moves, state.assignment)
+        if moves:
+            set_rooms(session, sol, {mid: dst for mid, _, dst in moves})
+            sol.score = state.score
+        session.add(sol)
+        session.commit()
+    except Exception:
+        forget_solution_state(sol.id or 0)
+        raise
+    remember_solution_state(sol.id or 0, sol.version, state)
+    if moves:
+        get_live_hub().publish(
+            sol.id or 0, sol.version, [mid for mid, _, _ in moves], delta_message(sol.version, sol.head_seq, moves, result)
+        )
+
+    # Only the rooms the batch touched; clients patch their copy of the rest
+    touched = [rid for rid in dict.fromkeys(r for _, src, dst in moves for r in (src, dst)) if rid is not None]
+    out = {
+        "rooms": state.rooms(touched),
+        "version": sol.version,
+        "moveSeq": sol.head_seq,
+        "moved": len(moves),
+        **result,
+    }
+    if breakdown:
+        out["softScores"] = state.soft_scores()
+    return out
+
+
+def _check_base_version(sol: Solution, base_version: Optional[int], member_ids: Set[str]) -> None:
+    # An edit made against an older version goes through unless a later one moved the same members
+    if base_version is None or base_version == sol.version:
+        return
+    touched = None
+    if base_version < sol.version:
+        touched = get_live_hub().touched_since(sol.id or 0, base_version, sol.version)
+    if touched is None:
+        raise HTTPException(status_code=409, detail={"conflict": "stale", "version": sol.version})
+    clash = sorted(touched & member_ids)
+    if clash:
+        raise HTTPException(status_code=409, detail={"conflict": "members", "memberIds": clash, "version": sol.version})
+
+
+def _apply_batch(session: Session, solution_id: int, payload: BatchMoveRequest, breakdown: bool = True) -> Dict[str, Any]:
+    sol, state = _solution_state(session, solution_id)
+    ops = [
+        ("swap", op.memberId, op.swapWithMemberId) if op.swapWithMemberId else ("move", op.memberId, op.toRoomId)
+        for op in payload.moves
+    ]
+    with state.lock:
+        # Another request may have committed while this one waited for the lock
+        session.refresh(sol)
+        members = {mid for op in payload.moves for mid in (op.memberId, op.swapWithMemberId) if mid}
+        _check_base_version(sol, payload.baseVersion, members)
+        try:
+            result = state.apply_moves(ops)
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=exc.args[0])
+        return _commit_moves(session, sol, state, result, payload.rejectNewViolations, breakdown=breakdown)
+
+
+def _step(session: Session, solution_id: int, forward: bool, breakdown: bool = True) -> Dict[str, Any]:
+    # Undo (forward=False) or redo one batch of the move log
+    sol, state = _solution_state(session, solution_id)
+    with state.lock:
+        session.refresh(sol)
+        try:
+            if forward:
+                ops = [("move", mid, dst) for mid, _, dst in redo_moves(session, sol)]
+            else:
+                ops = [("move", mid, src) for mid, src, _ in reversed(undo_moves(session, sol))]
+            result = state.apply_moves(ops)
+        except ValueError as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=exc.args[0])
+        return _commit_moves(session, sol, state, result, log=False, breakdown=breakdown)
+
+
+MAX_COMPARE = 500
+MAX_BULK_EXPORT = 500
+
+
+@router.get("/export.zip")
+def export_zip(
+    session: Annotated[Session, Depends(get_session)],
+    ids: Annotated[List[int], Query()],
+    formats: Annotated[List[Literal["csv", "json", "pdf"]], Query()] = ["csv"],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    # Many solutions as one streamed archive; each one is hashed for the ETag up front and
+    # loaded again only when its turn comes, so one solution's rooms are in memory at a time
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BULK_EXPORT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EXPORT} solutions per export")
+    found = session.exec(select(Solution.id, Solution.version).where(Solution.id.in_(ids))).all()
+    versions = dict(found)
+    missing = [sid for sid in ids if sid not in versions]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Solutions not found: {missing}")
+    formats = list(dict.fromkeys(formats))
+    contents = [rooms_digest(load_rooms(session, session.get(Solution, sid))) for sid in ids]
+    parts = [[sid, versions[sid], content] for sid, content in zip(ids, contents)]
+    digest = hashlib.sha256(json.dumps([formats, parts]).encode()).hexdigest()
+    tag = f'"zip-{digest[:24]}"'
+    headers = {
+        "ETag": tag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": 'attachment; filename="solutions.zip"',
+    }
+    if not_modified(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+
+    # The request session is closed before the body is sent; the archive reads through its own
+    bind = session.get_bind()
+
+    def entries() -> Iterator[Tuple[str, Any]]:
+        with Session(bind) as own:
+            for sid in ids:
+                sol = own.get(Solution, sid)
+                if sol is None:
+                    continue
+                rooms = load_rooms(own, sol)
+                if "csv" in formats:
+                    yield f"solution_{sid}.csv", csv_chunks(rooms)
+                if "json" in formats:
+                    yield f"solution_{sid}.json", json_chunks(rooms)
+                if "pdf" in formats:
+                    path = cached_pdf(sid, sol.version, rooms_digest(rooms), lambda: rooms)
+                    yield f"solution_{sid}.pdf", open_chunks(path)[0]
+
+    return StreamingResponse(zip_chunks(entries()), media_type="application/zip", headers=headers)
+
+
+@router.post("/compare", response_model=CompareResponse)
+def compare(payload: CompareRequest, session: Annotated[Session, Depends(get_session)]):
+    # Many solutions of one dataset in one pass: breakdowns, ranking and move distances
+    if payload.solutionIds:
+        found = session.exec(select(Solution).where(Solution.id.in_(payload.solutionIds))).all()
+        by_id = {sol.id: sol for sol in found}
+        missing = [sid for sid in payload.solutionIds if sid not in by_id]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Solutions not found: {missing}")
+        solutions = [by_id[sid] for sid in dict.fromkeys(payload.solutionIds)]
+    elif payload.datasetId is not None:
+        solutions = session.exec(
+            select(Solution).where(Solution.dataset_id == payload.datasetId).order_by(Solution.id)
+        ).all()
+    else:
+        raise HTTPException(status_code=400, detail="Give a datasetId or solutionIds")
+    if not solutions:
+        raise HTTPException(status_code=404, detail="No solutions to compare")
+    if len(solutions) > MAX_COMPARE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE} solutions per comparison")
+    dataset_ids = {sol.dataset_id for sol in solutions}
+    if len(dataset_ids) > 1 or (payload.datasetId is not None and dataset_ids != {payload.datasetId}):
+        raise HTTPException(status_code=400, detail="Solutions must belong to one dataset")
+
+    dataset = session.get(Dataset, solutions[0].dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    configs = {}
+    for config_id in {sol.config_id for sol in solutions}:
+        config = session.get(ConfigModel, config_id)
+        if not config:
+            raise HTTPException(status_code=404, detail="Config not found")
+        configs[config_id] = json.loads(config.config_json or "{}")
+
+    member_list = dataset.get_members().get("members", [])
+    codes, room_ids = load_assignment_matrix(
+        session, [sol.id or 0 for sol in solutions], [m["id"] for m in member_list]
+    )
+    rows = [
+        {"id": sol.id, "configId": sol.config_id, "version": sol.version, "score": sol.score}
+        for sol in solutions
+    ]
+    try:
+        return compare_solutions(member_list, rows, configs, codes, room_ids, payload.sortBy, payload.descending)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/{solution_id}", response_model=SolutionSummary)
+def get_solution(solution_id: int, session: Annotated[Session, Depends(get_session)]):
+    sol, state = _solution_state(session, solution_id)
+    with state.lock:
+        breakdown = state.soft_scores()
+    return SolutionSummary(
+        id=sol.id or 0,
+        datasetId=sol.dataset_id,
+        configId=sol.config_id,
+        score=sol.score,
+        runtimeMs=sol.runtime_ms,
+        version=sol.version,
+        solverParams=sol.get_params(),
+        softScores=breakdown,
+        moveSeq=sol.head_seq,
+    )
+
+
 @router.post("/{solution_id}/apply-move")
 def apply_move(
     solution_id: int,
     payload: ApplyMoveRequest,
     session: Annotated[Session, Depends(get_session)],
 ):
-    sol = session.get(Solution, solution_id)
-    if not sol or not sol.rooms_json:
-        raise HTTPException(status_code=404, detail="Solution not found")
-    rooms = json.loads(sol.rooms_json)
+    batch = BatchMoveRequest(
+        moves=[MoveOp(memberId=payload.memberId, toRoomId=payload.toRoomId)], baseVersion=payload.baseVersion
+    )
+    return _apply_batch(session, solution_id, batch)
 
-    updated_rooms, violations = validate_solution_move(rooms, payload)
 
-    sol.rooms_json = json.dumps(updated_rooms)
-    session.add(sol)
+@router.post("/{solution_id}/moves")
+def apply_moves(
+    solution_id: int,
+    payload: BatchMoveRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    # Ordered moves and swaps applied atomically; violations are compared once at the end
+    return _apply_batch(session, solution_id, payload)
 
-    move = Move(
-        solution_id=solution_id,
-        member_id=payload.memberId,
-        from_room_id=payload.fromRoomId,
-        to_room_id=payload.toRoomId,
+
+@router.post("/{solution_id}/undo")
+def undo(solution_id: int, session: Annotated[Session, Depends(get_session)]):
+    # Reverts the last batch of moves; the log keeps it for redo
+    return _step(session, solution_id, forward=False)
+
+
+@router.post("/{solution_id}/redo")
+def redo(solution_id: int, session: Annotated[Session, Depends(get_session)]):
+    return _step(session, solution_id, forward=True)
+
+
+def _live_edit(session: Session, solution_id: int, message: Dict[str, Any]) -> Dict[str, Any]:
+    # One client message -> ack or reject; the delta itself reaches everyone through the hub
+    session.expire_all()
+    if not isinstance(message, dict):
+        return {"type": "reject", "requestId": None, "status": 400, "detail": "Expected a JSON object"}
+    request_id = message.get("requestId")
+    try:
+        kind = message.get("type")
+        if kind == "moves":
+            out = _apply_batch(session, solution_id, BatchMoveRequest.model_validate(message), breakdown=False)
+        elif kind in ("undo", "redo"):
+            out = _step(session, solution_id, forward=kind == "redo", breakdown=False)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown message type {kind!r}")
+    except ValidationError as exc:
+        return {"type": "reject", "requestId": request_id, "status": 422, "detail": exc.errors(include_url=False)}
+    except HTTPException as exc:
+        return {"type": "reject", "requestId": request_id, "status": exc.status_code, "detail": exc.detail}
+    return {"type": "ack", "requestId": request_id, "version": out["version"], "moveSeq": out["moveSeq"]}
+
+
+@router.websocket("/{solution_id}/live")
+async def live(websocket: WebSocket, solution_id: int, session: Annotated[Session, Depends(get_session)]):
+    """Shared editing channel for one solution.
+
+    Clients send {"type": "moves", "moves": [...], "baseVersion": v, "requestId": ...}
+    (same fields as POST /moves) or {"type": "undo"|"redo"} and get an ack or a
+    reject back. Every committed edit, from this channel or the REST endpoints, is
+    broadcast as a delta: version, moveSeq, moves as [memberId, fromRoomId,
+    toRoomId], scoreDelta, score and changed violations. Deltas at or below the
+    version in the hello message are already reflected in it.
+    """
+    hub = get_live_hub()
+    # Subscribe before reading the version so no edit falls in between
+    sub = hub.subscribe(solution_id, asyncio.get_running_loop())
+    try:
+        sol = session.get(Solution, solution_id)
+        if not sol:
+            await websocket.close(code=4404)
+            return
+        await websocket.accept()
+        await websocket.send_json({"type": "hello", "version": sol.version, "moveSeq": sol.head_seq, "score": sol.score})
+
+        async def forward() -> None:
+            # Deltas and replies share one queue, so a client sees them in commit order
+            while True:
+                await websocket.send_text(await sub.queue.get())
+
+        sender = asyncio.create_task(forward())
+        try:
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    message = None
+                reply = await run_in_threadpool(_live_edit, session, solution_id, message)
+                sub.deliver(json.dumps(reply))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
+    finally:
+        hub.unsubscribe(solution_id, sub)
+
+
+@router.get("/{solution_id}/history/{seq}")
+def solution_at(solution_id: int, seq: int, session: Annotated[Session, Depends(get_session)]):
+    # The assignment right after move `seq` (0 = as solved), rebuilt from the nearest snapshot
+    sol = _get_solution(session, solution_id)
+    dataset = session.get(Dataset, sol.dataset_id)
+    config = session.get(ConfigModel, sol.config_id)
+    if not dataset or not config:
+        raise HTTPException(status_code=404, detail="Dataset or config not found")
+    try:
+        assignment, depth = replay(session, sol, seq)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    members, cfg = dataset.get_members(), json.loads(config.config_json or "{}")
+    rooms = build_rooms(cfg.get("rooms", []), members, assignment)
+    return {
+        "moveSeq": seq,
+        "depth": depth,
+        "rooms": rooms,
+        "softScores": rooms_soft_scores(members.get("members", []), cfg, rooms),
+    }
+
+
+@router.post("/{solution_id}/preview-move")
+def preview_move(
+    solution_id: int,
+    payload: ApplyMoveRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    # Live feedback while dragging: the score change of a move, nothing is stored
+    _, state = _solution_state(session, solution_id)
+    with state.lock:
+        try:
+            return state.preview(payload.memberId, payload.toRoomId)
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=exc.args[0])
+
+
+@router.post("/{solution_id}/reoptimize", response_model=OptimizeResponse)
+def reoptimize(
+    solution_id: int,
+    payload: NeighborhoodRequest,
+    session: Annotated[Session, Depends(get_session)],
+):
+    sol = _get_solution(session, solution_id)
+    dataset = session.get(Dataset, sol.dataset_id)
+    config = session.get(ConfigModel, sol.config_id)
+    if not dataset or not config:
+        raise HTTPException(status_code=404, detail="Dataset or config not found")
+    if not payload.roomIds and not payload.memberIds:
+        raise HTTPException(status_code=400, detail="Select at least one room or member")
+
+    members, cfg = dataset.get_members(), json.loads(config.config_json or "{}")
+    try:
+        result = reoptimize_neighborhood(
+            members,
+            cfg,
+            build_rooms(cfg.get("rooms", []), members, load_assignment(session, solution_id)),
+            payload.roomIds,
+            payload.memberIds,
+            time_limit_sec=payload.timeLimitSec,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if "infeasibility" in result:
+        raise HTTPException(status_code=422, detail={"status": result["status"], **result["infeasibility"]})
+
+    new_sol = save_solution(
+        session,
+        sol.dataset_id,
+        sol.config_id,
+        result["rooms"],
+        sol.score + result["scoreDelta"],
+        result["runtimeMs"],
+        result.get("solverParams"),
+    )
+
+    return OptimizeResponse(
+        solutionId=new_sol.id or 0,
+        rooms=[RoomResponse(**room) for room in result["rooms"]],
+        score=new_sol.score,
+        hardViolations=result.get("hardViolations", []),
+        softScores=rooms_soft_scores(members.get("members", []), cfg, result["rooms"]),
+        runtimeMs=result["runtimeMs"],
+        moved=result.get("moved"),
+        solverParams=result.get("solverParams", {}),
     )
-    session.add(move)
-    session.commit()
 
-    return {"rooms": updated_rooms, "violations": violations}
+
+def _export(
+    session: Session,
+    solution_id: int,
+    kind: str,
+    media_type: str,
+    chunks: Callable[[List[Dict[str, Any]]], Iterator[str]],
+    if_none_match: Optional[str],
+) -> Response:
+    # Streamed; the ETag moves with the solution version and content, so unchanged exports are a 304
+    sol = _get_solution(session, solution_id)
+    rooms = load_rooms(session, sol)
+    tag = etag(kind, solution_id, sol.version, rooms_digest(rooms))
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if not_modified(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(chunks(rooms), media_type=media_type, headers=headers)
 
 
 @router.get("/{solution_id}/export.csv")
-def export_csv(solution_id: int, session: Annotated[Session, Depends(get_session)]):
-    sol = session.get(Solution, solution_id)
-    if not sol or not sol.rooms_json:
-        raise HTTPException(status_code=404, detail="Solution not found")
-    rooms = json.loads(sol.rooms_json)
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["Room", "Capacity", "Member ID", "Member Name"])  # name may require lookup in future
-    for room in rooms:
-        for m in room.get("members", []):
-            writer.writerow([room["label"], room["capacity"], m.get("id"), m.get("name", "")])
-    return Response(content=buf.getvalue(), media_type="text/csv")
+def export_csv(
+    solution_id: int,
+    session: Annotated[Session, Depends(get_session)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    return _export(session, solution_id, "csv", "text/csv", csv_chunks, if_none_match)
 
 
 @router.get("/{solution_id}/export.json")
-def export_json(solution_id: int, session: Annotated[Session, Depends(get_session)]):
-    sol = session.get(Solution, solution_id)
-    if not sol or not sol.rooms_json:
-        raise HTTPException(status_code=404, detail="Solution not found")
-    return Response(content=sol.rooms_json, media_type="application/json")
+def export_json(
+    solution_id: int,
+    session: Annotated[Session, Depends(get_session)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    return _export(session, solution_id, "json", "application/json", json_chunks, if_none_match)
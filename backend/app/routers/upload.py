@@ -1,17 +1,19 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
-import pandas as pd
 import os
+from ..config import get_settings
 from ..database import get_session
 from ..models import Dataset
 from ..schemas import UploadCSVResponse
-from ..services.preprocess import preprocess_dataframe
+from ..services.preprocess import preprocess_csv
 
 router = APIRouter(prefix="/upload", tags=["upload"]) 
 
-DATA_DIR = "app_data"
+DATA_DIR = get_settings().data_dir
 os.makedirs(DATA_DIR, exist_ok=True)
+UPLOAD_CHUNK_BYTES = 1 << 20
 
 
 @router.post("/csv", response_model=UploadCSVResponse)
@@ -21,16 +23,22 @@ async def upload_csv(
 ):
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Please upload a CSV file")
-    raw_path = os.path.join(DATA_DIR, file.filename)
+    raw_path = os.path.join(DATA_DIR, os.path.basename(file.filename))
     with open(raw_path, "wb") as f:
-        f.write(await file.read())
-    df = pd.read_csv(raw_path)
-    members = preprocess_dataframe(df)
-
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            f.write(chunk)
+    # Parsing and serializing a large export is CPU-bound; keep it off the event loop
+    members = await run_in_threadpool(preprocess_csv, raw_path)
     dataset = Dataset(label=file.filename, raw_csv_path=raw_path)
-    dataset.set_members(members)
+    await run_in_threadpool(dataset.set_members, members)
     session.add(dataset)
     session.commit()
     session.refresh(dataset)
 
-    return UploadCSVResponse(datasetId=dataset.id or 0, memberCount=len(members.get("members", [])))
+    resolution = members.get("resolution", {})
+    return UploadCSVResponse(
+        datasetId=dataset.id or 0,
+        memberCount=len(members.get("members", [])),
+        fuzzyMatches=resolution.get("fuzzy", 0),
+        unresolvedRequests=resolution.get("unresolved", 0),
+    )
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 
@@ -11,6 +11,9 @@ class Member(BaseModel):
     rankedRoomSizes: Dict[str, int] = Field(default_factory=dict)
     requestedWith: List[str] = Field(default_factory=list)
     avoidWith: List[str] = Field(default_factory=list)
+    # Member ids the names above resolved to at upload time
+    requestedIds: Optional[List[str]] = None
+    avoidIds: Optional[List[str]] = None
 
 
 class RoomTemplate(BaseModel):
@@ -40,10 +43,30 @@ class ConstraintConfig(BaseModel):
     pairwiseW: Dict[str, Dict[str, float]] = Field(default_factory=dict)
 
 
+class SolverParams(BaseModel):
+    # CP-SAT threads; default is the container's CPU quota
+    workers: Optional[int] = Field(default=None, ge=1)
+    relativeGap: Optional[float] = Field(default=None, ge=0)
+    # In score units
+    absoluteGap: Optional[float] = Field(default=None, ge=0)
+    # Stop once the best solution has not improved for this long
+    noImprovementSec: Optional[float] = Field(default=None, gt=0)
+    seed: Optional[int] = None
+    preset: Literal["default", "lns", "lnsOnly"] = "default"
+
+
 class OptimizeRequest(BaseModel):
     datasetId: int
     configId: int
-    timeLimitSec: int = 300
+    # Unset: chosen from past runs on cohorts of similar size (see /optimize/suggest)
+    timeLimitSec: Optional[float] = Field(default=None, gt=0)
+    # Warm start from a stored solution
+    solutionId: Optional[int] = None
+    lockedRoomIds: List[str] = Field(default_factory=list)
+    minimizeMoves: bool = False
+    # cpsat: exact model; heuristic: greedy + local search in about a second; hybrid: heuristic as the CP-SAT hint
+    engine: Literal["cpsat", "heuristic", "hybrid"] = "cpsat"
+    solver: SolverParams = Field(default_factory=SolverParams)
 
 
 class RoomResponse(BaseModel):
@@ -60,18 +83,164 @@ class OptimizeResponse(BaseModel):
     hardViolations: List[str]
     softScores: Dict[str, float]
     runtimeMs: int
+    # Members moved relative to the warm-start solution, if any
+    moved: Optional[int] = None
+    # Served from the result cache (or by joining an identical in-flight run)
+    cached: bool = False
+    solverParams: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TimeLimitSuggestion(BaseModel):
+    timeLimitSec: float
+    workers: Optional[int] = None
+    # "history" when enough similar runs exist, else "size" ("default" for the heuristic)
+    basis: str
+    runs: int
+
+
+class SolutionSummary(BaseModel):
+    id: int
+    datasetId: int
+    configId: int
+    score: float
+    runtimeMs: int
+    version: int
+    # Engine, time limit and solver settings the solution was produced with
+    solverParams: Dict[str, Any] = Field(default_factory=dict)
+    # Breakdown of the current assignment (see services.scoring)
+    softScores: Dict[str, float] = Field(default_factory=dict)
+    # Move number the current assignment ends at; 0 before any manual move
+    moveSeq: int = 0
+
+
+class SweepRequest(BaseModel):
+    datasetId: int
+    configId: int
+    # Weight vectors: explicit points, a grid (cartesian product) and/or random samples
+    points: List[Dict[str, float]] = Field(default_factory=list)
+    grid: Dict[str, List[float]] = Field(default_factory=dict)
+    samples: int = Field(default=0, ge=0, le=256)
+    ranges: Dict[str, List[float]] = Field(default_factory=lambda: {"alpha": [0.0, 1.0], "beta": [0.0, 1.0]})
+    seed: int = 0
+    timeLimitSec: float = Field(default=5.0, gt=0)
+    # Solver threads for this sweep, capped by the server-wide sweep budget
+    cores: Optional[int] = Field(default=None, ge=1)
+
+
+class SweepMetrics(BaseModel):
+    requestsMet: float
+    rankSatisfaction: float
+    emptyBeds: float
+
+
+class SweepRun(BaseModel):
+    weights: Dict[str, float]
+    status: str
+    score: Optional[float] = None
+    metrics: Optional[SweepMetrics] = None
+    runtimeMs: int = 0
+
+
+class SweepResponse(BaseModel):
+    runs: List[SweepRun]
+    # Indices into runs
+    paretoFront: List[int]
+    cores: int = 0
+    processes: int = 0
+    runtimeMs: int = 0
+
+
+class JobSubmitResponse(BaseModel):
+    jobId: str
+    cached: bool = False
+
+
+class JobStatusResponse(BaseModel):
+    jobId: str
+    status: str
+    solutionId: Optional[int] = None
+    score: Optional[float] = None
+    progress: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # Sweep jobs: the runs so far once finished (cancelled points have status CANCELLED)
+    sweep: Optional[SweepResponse] = None
+
+
+class FeasibilityIssue(BaseModel):
+    code: str
+    message: str
+    members: List[str] = Field(default_factory=list)
+    rooms: List[str] = Field(default_factory=list)
+
+
+class FeasibilityReport(BaseModel):
+    feasible: bool
+    issues: List[FeasibilityIssue] = Field(default_factory=list)
+    elapsedMs: int = 0
 
 
 class UploadCSVResponse(BaseModel):
     datasetId: int
     memberCount: int
+    fuzzyMatches: int = 0
+    unresolvedRequests: int = 0
 
 
 class ApplyMoveRequest(BaseModel):
-    roomId: Optional[str]
+    roomId: Optional[str] = None
     memberId: str
     fromRoomId: Optional[str] = None
     toRoomId: Optional[str] = None
+    # As in BatchMoveRequest
+    baseVersion: Optional[int] = None
+
+
+class MoveOp(BaseModel):
+    memberId: str
+    toRoomId: Optional[str] = None
+    # Swap rooms with this member instead of moving to toRoomId
+    swapWithMemberId: Optional[str] = None
+
+
+class BatchMoveRequest(BaseModel):
+    moves: List[MoveOp]
+    # Roll the whole batch back if it ends with a hard violation that was not there before
+    rejectNewViolations: bool = False
+    # Version the client last saw; the batch is rejected if someone moved one of its members since
+    baseVersion: Optional[int] = None
+
+
+class NeighborhoodRequest(BaseModel):
+    roomIds: List[str] = Field(default_factory=list)
+    memberIds: List[str] = Field(default_factory=list)
+    timeLimitSec: float = 1.0
+
+
+class CompareRequest(BaseModel):
+    # Every solution of the dataset, or just the listed ones
+    datasetId: Optional[int] = None
+    solutionIds: List[int] = Field(default_factory=list)
+    # "score" or a softScores key; direction defaults to best first for that key
+    sortBy: str = "score"
+    descending: Optional[bool] = None
+
+
+class CompareRow(BaseModel):
+    id: int
+    configId: int
+    version: int
+    score: float
+    rank: int
+    softScores: Dict[str, float]
+    movesFromBest: int
+
+
+class CompareResponse(BaseModel):
+    sortBy: str
+    descending: bool
+    solutions: List[CompareRow]
+    # Members placed differently, in the order of `solutions`
+    moveDistance: List[List[int]]
 
 
 class ConfigSaveRequest(BaseModel):
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from .weights import load_pairwise
+
+
+def pair_coefficients(
+    member_ids: List[str],
+    pairwiseW: Dict[str, Dict[str, float]],
+    threshold: float = 0.0,
+) -> Dict[Tuple[int, int], int]:
+    # Symmetric x100 coefficients keyed by (i, j) with i < j. Only the stored rows of
+    # the given members are visited; pairs below the threshold or truncating to 0 are dropped.
+    # Rounding before truncation keeps 2.6 at 260 instead of 259 from float noise.
+    id_to_idx = {mid: idx for idx, mid in enumerate(member_ids)}
+    totals: Dict[Tuple[int, int], float] = {}
+    for i, mi in enumerate(member_ids):
+        row = pairwiseW.get(mi)
+        if not row:
+            continue
+        for mj, wij in row.items():
+            if not wij:
+                continue
+            j = id_to_idx.get(mj)
+            if j is None or j == i:
+                continue
+            key = (i, j) if i < j else (j, i)
+            totals[key] = totals.get(key, 0.0) + float(wij)
+
+    coefs: Dict[Tuple[int, int], int] = {}
+    for key, total in totals.items():
+        if abs(round(total, 6)) < threshold:
+            continue
+        c = int(round(100 * total, 4))
+        if c:
+            coefs[key] = c
+    return coefs
+
+
+def _matrix_coefficient_block(
+    member_ids: List[str],
+    matrix_ids: List[str],
+    W: np.ndarray,
+    threshold: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (positions of members found in the matrix, symmetric x100 coefficients among them)
+    pos = {mid: k for k, mid in enumerate(matrix_ids)}
+    rows = np.array([pos.get(mid, -1) for mid in member_ids], dtype=np.intp)
+    present = np.flatnonzero(rows >= 0)
+    sub = np.asarray(W[np.ix_(rows[present], rows[present])], dtype=np.float64)
+    total = sub + sub.T
+    coef = np.trunc(np.round(100 * total, 4)).astype(np.int64)
+    coef[np.abs(np.round(total, 6)) < threshold] = 0
+    np.fill_diagonal(coef, 0)
+    return present, coef
+
+
+def matrix_pair_coefficients(
+    member_ids: List[str],
+    matrix_ids: List[str],
+    W: np.ndarray,
+    threshold: float = 0.0,
+) -> Dict[Tuple[int, int], int]:
+    # Same contract as pair_coefficients for a dense (possibly memory-mapped) matrix;
+    # the rounding also absorbs float32 storage error.
+    present, coef = _matrix_coefficient_block(member_ids, matrix_ids, W, threshold)
+    if len(present) < 2:
+        return {}
+    ii, jj = np.nonzero(np.triu(coef != 0, 1))
+    return {
+        (int(present[i]), int(present[j])): int(c)
+        for i, j, c in zip(ii.tolist(), jj.tolist(), coef[ii, jj].tolist())
+    }
+
+
+def config_pair_coefficients(member_ids: List[str], config: Dict[str, Any]) -> Dict[Tuple[int, int], int]:
+    # Pair coefficients from whichever pairwise format the config carries
+    threshold = float(config.get("pairwiseThreshold", 0.0))
+    matrix = load_pairwise(config)
+    if matrix is not None:
+        return matrix_pair_coefficients(member_ids, matrix[0], matrix[1], threshold)
+    return pair_coefficients(member_ids, config.get("pairwiseW", {}), threshold)
+
+
+def pair_coefficient_matrix(member_ids: List[str], config: Dict[str, Any]) -> np.ndarray:
+    # config_pair_coefficients as a dense symmetric P×P int32 matrix; the binary
+    # format never goes through a dict of pairs
+    P = len(member_ids)
+    C = np.zeros((P, P), dtype=np.int32)
+    threshold = float(config.get("pairwiseThreshold", 0.0))
+    matrix = load_pairwise(config)
+    if matrix is not None:
+        present, coef = _matrix_coefficient_block(member_ids, matrix[0], matrix[1], threshold)
+        C[np.ix_(present, present)] = coef
+        return C
+    pairs = pair_coefficients(member_ids, config.get("pairwiseW", {}), threshold)
+    if pairs:
+        ij = np.array(list(pairs), dtype=np.intp)
+        c = np.fromiter(pairs.values(), dtype=np.int32, count=len(pairs))
+        C[ij[:, 0], ij[:, 1]] = c
+        C[ij[:, 1], ij[:, 0]] = c
+    return C
+
+
+def rank_coefficient(member: Dict[str, Any], capacity: int, alpha: float) -> int:
+    # x100 objective bonus for putting this member in a room of the given size
+    rank = member.get("rankedRoomSizes", {}).get(str(capacity))
+    if rank is None:
+        return 0
+    # Smaller rank better; convert to positive bonus via inverse
+    bonus = max(0, 5 - int(rank))  # crude mapping
+    return int(100 * alpha * bonus)
+
+
+def pair_coefficient_arrays(member_ids: List[str], config: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # config_pair_coefficients as parallel (i, j, c) arrays with i < j, for vectorized scoring
+    threshold = float(config.get("pairwiseThreshold", 0.0))
+    matrix = load_pairwise(config)
+    if matrix is not None:
+        present, coef = _matrix_coefficient_block(member_ids, matrix[0], matrix[1], threshold)
+        ii, jj = np.nonzero(np.triu(coef, 1))
+        return present[ii], present[jj], coef[ii, jj]
+    pairs = pair_coefficients(member_ids, config.get("pairwiseW", {}), threshold)
+    ij = np.array(list(pairs), dtype=np.intp).reshape(-1, 2)
+    return ij[:, 0], ij[:, 1], np.fromiter(pairs.values(), dtype=np.int64, count=len(pairs))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+import numpy as np
+from .scoring import ScoringContext, soft_scores_many
+
+# Breakdown keys where a smaller value ranks higher
+LOWER_IS_BETTER = {
+    "requestsUnmet", "avoidHits", "sleepClash", "temperatureClash", "roomUseClash",
+    "messinessSpread", "messinessSpreadMax", "emptyBeds", "unassigned",
+}
+# Solutions × solutions × members compared at once
+_BLOCK = 1 << 24
+
+
+def move_distances(codes: np.ndarray) -> np.ndarray:
+    # S×S number of members placed differently in each two solutions; being
+    # unassigned (-1) counts as a place
+    S, P = codes.shape
+    out = np.zeros((S, S), dtype=np.int64)
+    step = max(1, _BLOCK // max(1, S * P))
+    for s in range(0, S, step):
+        out[s:s + step] = (codes[s:s + step, None, :] != codes[None, :, :]).sum(axis=2)
+    return out
+
+
+def compare_solutions(
+    member_list: List[Dict[str, Any]],
+    solutions: List[Dict[str, Any]],
+    configs: Dict[int, Dict[str, Any]],
+    codes: np.ndarray,
+    room_ids: List[str],
+    sort_by: str = "score",
+    descending: bool | None = None,
+) -> Dict[str, Any]:
+    """Rank stored solutions of one dataset and measure how far apart they are.
+
+    ``solutions`` are dicts with id, configId, version and score, in the row order
+    of ``codes`` (as from load_assignment_matrix). Each config's solutions are
+    scored in one batch against that config's room layout. The table is sorted by
+    ``sort_by`` ("score" or a breakdown key), best first; ``moveDistance`` follows
+    the table's order.
+    """
+    breakdowns: List[Dict[str, float]] = [{} for _ in solutions]
+    by_config: Dict[int, List[int]] = {}
+    for s, sol in enumerate(solutions):
+        by_config.setdefault(sol["configId"], []).append(s)
+    for config_id, rows in by_config.items():
+        config = configs[config_id]
+        layout = {room.get("id"): r for r, room in enumerate(config.get("rooms", []))}
+        # Global room code -> this layout's room index; rooms the layout lacks read as
+        # unassigned, and the trailing -1 maps unassigned (-1) to itself
+        lut = np.array([layout.get(rid, -1) for rid in room_ids] + [-1], dtype=np.int64)
+        ctx = ScoringContext(member_list, config, [int(room.get("capacity", 0)) for room in config.get("rooms", [])])
+        for s, scores in zip(rows, soft_scores_many(ctx, lut[codes[rows]])):
+            breakdowns[s] = scores
+
+    if sort_by != "score" and any(sort_by not in b for b in breakdowns):
+        raise ValueError(f"Unknown sort key {sort_by!r}")
+    if descending is None:
+        descending = sort_by not in LOWER_IS_BETTER
+
+    def value(s: int) -> float:
+        return solutions[s]["score"] if sort_by == "score" else breakdowns[s][sort_by]
+
+    # Stable: ties keep the caller's order
+    order = sorted(range(len(solutions)), key=lambda s: -value(s) if descending else value(s))
+    distances = move_distances(codes[order])
+    table = [
+        {
+            **solutions[s],
+            "rank": k + 1,
+            "softScores": breakdowns[s],
+            "movesFromBest": int(distances[0, k]),
+        }
+        for k, s in enumerate(order)
+    ]
+    return {
+        "sortBy": sort_by,
+        "descending": descending,
+        "solutions": table,
+        "moveDistance": distances.tolist(),
+    }
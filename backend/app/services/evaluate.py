@@ -0,0 +1,273 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple, Callable
+from collections import OrderedDict
+import threading
+import numpy as np
+from .coefficients import config_pair_coefficients, rank_coefficient
+from .presolve import index_pairs
+from .scoring import ScoringContext, soft_scores
+
+ViolationKey = Tuple[Any, ...]
+
+
+class SolutionState:
+    """In-memory view of a stored solution that scores single moves incrementally.
+
+    Keeps a member -> room index, per-room occupants and each room's cached
+    objective contribution (pairs inside it, rank bonuses, empty-bed penalty) on the
+    x100 integer scale of the optimizer, plus the set of current hard violations.
+    A move only looks at the two rooms involved and the moved member's constraint
+    partners, so its cost is O(size of the affected rooms).
+    """
+
+    def __init__(self, members: Dict[str, Any], config: Dict[str, Any], rooms: List[Dict[str, Any]]) -> None:
+        member_list: List[Dict[str, Any]] = list(members.get("members", []))
+        self._member_obj = list(member_list)
+        self._idx = {m["id"]: p for p, m in enumerate(member_list)}
+        # Occupants unknown to the dataset still take a bed
+        for room in rooms:
+            for m in room.get("members", []):
+                if m.get("id") not in self._idx:
+                    self._idx[m["id"]] = len(self._member_obj)
+                    self._member_obj.append(m)
+        P = len(self._member_obj)
+
+        self._rooms = [{k: v for k, v in room.items() if k != "members"} for room in rooms]
+        self._room_idx = {room.get("id"): r for r, room in enumerate(rooms)}
+        self._capacity = [int(room.get("capacity", 0)) for room in rooms]
+
+        self._adj: List[Dict[int, int]] = [{} for _ in range(P)]
+        for (i, j), c in config_pair_coefficients([m["id"] for m in member_list], config).items():
+            self._adj[i][j] = c
+            self._adj[j][i] = c
+        weights = config.get("weights", {"alpha": 0.2, "beta": 0.1, "gamma": 0.1})
+        self._alpha = weights.get("alpha", 0.2)
+        beta = weights.get("beta", 0.1)
+        self._bed_penalty = int(-100 * beta) if config.get("allowEmptyBeds", True) and beta else 0
+
+        hard = config.get("hard", {})
+        self._apart: List[set[int]] = [set() for _ in range(P)]
+        for key in ("mustApartPairs", "mutualDislikePairs"):
+            for i, j in index_pairs(hard.get(key, []), self._idx):
+                self._apart[i].add(j)
+                self._apart[j].add(i)
+        self._together: List[set[int]] = [set() for _ in range(P)]
+        for i, j in index_pairs(hard.get("mustTogetherPairs", []), self._idx):
+            self._together[i].add(j)
+            self._together[j].add(i)
+        self._fixed: Dict[int, Any] = {
+            self._idx[mid]: rid for mid, rid in hard.get("fixedRoomAssignments", {}).items() if mid in self._idx
+        }
+
+        self.room_of: List[int | None] = [None] * P
+        self._occupants: List[List[int]] = [[] for _ in rooms]
+        for r, room in enumerate(rooms):
+            for m in room.get("members", []):
+                p = self._idx[m["id"]]
+                self._member_obj[p] = m
+                self.room_of[p] = r
+                self._occupants[r].append(p)
+
+        self._config = config
+        self._scoring: ScoringContext | None = None
+
+        self._room_score = [self._score_room(r) for r in range(len(rooms))]
+        self.total = sum(self._room_score)
+        self.violations: Dict[ViolationKey, str] = {}
+        for r in range(len(rooms)):
+            self._check_capacity(r)
+        for p in range(P):
+            self._check_member(p)
+        self.lock = threading.Lock()
+
+    @property
+    def score(self) -> float:
+        return self.total / 100.0
+
+    def _rank(self, p: int, r: int | None) -> int:
+        if r is None or not self._alpha:
+            return 0
+        return rank_coefficient(self._member_obj[p], self._capacity[r], self._alpha)
+
+    def _score_room(self, r: int) -> int:
+        occ = self._occupants[r]
+        total = sum(self._adj[p].get(q, 0) for k, p in enumerate(occ) for q in occ[k + 1 :])
+        total += sum(self._rank(p, r) for p in occ)
+        return total + self._bed_penalty * (self._capacity[r] - len(occ))
+
+    def _label(self, r: int) -> Any:
+        return self._rooms[r].get("label", self._rooms[r].get("id"))
+
+    def _check_capacity(self, r: int) -> None:
+        key = ("capacity", r)
+        if len(self._occupants[r]) > self._capacity[r]:
+            self.violations[key] = f"Room {self._label(r)} over capacity"
+        else:
+            self.violations.pop(key, None)
+
+    def _check_member(self, p: int) -> None:
+        # Re-evaluate every hard constraint that involves member p
+        mid = self._member_obj[p]["id"]
+        for q in self._apart[p]:
+            key = ("mustApart",) + (min(p, q), max(p, q))
+            if self.room_of[p] is not None and self.room_of[p] == self.room_of[q]:
+                a, b = sorted((p, q))
+                self.violations[key] = f"{self._member_obj[a]['id']} and {self._member_obj[b]['id']} must be apart"
+            else:
+                self.violations.pop(key, None)
+        for q in self._together[p]:
+            key = ("mustTogether",) + (min(p, q), max(p, q))
+            if self.room_of[p] is None or self.room_of[p] != self.room_of[q]:
+                a, b = sorted((p, q))
+                self.violations[key] = f"{self._member_obj[a]['id']} and {self._member_obj[b]['id']} must be together"
+            else:
+                self.violations.pop(key, None)
+        if p in self._fixed:
+            key = ("fixed", p)
+            r = self.room_of[p]
+            if r is None or self._rooms[r].get("id") != self._fixed[p]:
+                self.violations[key] = f"{mid} is pinned to room {self._fixed[p]}"
+            else:
+                self.violations.pop(key, None)
+
+    def _resolve(self, member_id: str, to_room_id: str | None) -> Tuple[int, int | None]:
+        if member_id not in self._idx:
+            raise KeyError(f"Member {member_id} not found")
+        if to_room_id is not None and to_room_id not in self._room_idx:
+            raise KeyError(f"Room {to_room_id} not found")
+        return self._idx[member_id], None if to_room_id is None else self._room_idx[to_room_id]
+
+    def _delta(self, p: int, src: int | None, dst: int | None) -> Tuple[int, int]:
+        # (change of src's contribution, change of dst's contribution)
+        if src == dst:
+            return 0, 0
+        d_src = d_dst = 0
+        if src is not None:
+            d_src = -sum(self._adj[p].get(q, 0) for q in self._occupants[src] if q != p)
+            d_src += -self._rank(p, src) + self._bed_penalty
+        if dst is not None:
+            d_dst = sum(self._adj[p].get(q, 0) for q in self._occupants[dst])
+            d_dst += self._rank(p, dst) - self._bed_penalty
+        return d_src, d_dst
+
+    def preview(self, member_id: str, to_room_id: str | None) -> Dict[str, Any]:
+        # Score change of a move without applying it
+        p, dst = self._resolve(member_id, to_room_id)
+        d_src, d_dst = self._delta(p, self.room_of[p], dst)
+        return {"scoreDelta": (d_src + d_dst) / 100.0, "score": (self.total + d_src + d_dst) / 100.0}
+
+    def _relocate(self, p: int, dst: int | None) -> int:
+        # Apply one move to the cached state and return its x100 score change
+        src = self.room_of[p]
+        d_src, d_dst = self._delta(p, src, dst)
+        if src == dst:
+            return 0
+        if src is not None:
+            self._occupants[src].remove(p)
+            self._room_score[src] += d_src
+            self._check_capacity(src)
+        if dst is not None:
+            self._occupants[dst].append(p)
+            self._room_score[dst] += d_dst
+            self._check_capacity(dst)
+        self.room_of[p] = dst
+        self.total += d_src + d_dst
+        self._check_member(p)
+        return d_src + d_dst
+
+    def _room_id(self, r: int | None) -> Any:
+        return None if r is None else self._rooms[r].get("id")
+
+    def apply_moves(self, ops: List[Tuple[str, str, Any]]) -> Dict[str, Any]:
+        """Apply ("move", member_id, room_id) and ("swap", member_id, other_id) in order.
+
+        Every id is checked before anything changes, so a bad op leaves the state
+        untouched. Violations are compared once, between the start and the end of the
+        batch. "moves" lists each member relocation as (member_id, from_room, to_room);
+        pass it to revert() to undo the batch.
+        """
+        resolved = []
+        for kind, member_id, target in ops:
+            if kind == "swap":
+                p, _ = self._resolve(member_id, None)
+                q, _ = self._resolve(target, None)
+                resolved.append((kind, p, q))
+            else:
+                resolved.append((kind, *self._resolve(member_id, target)))
+
+        before = dict(self.violations)
+        delta = 0
+        moves: List[Tuple[str, Any, Any]] = []
+        for kind, p, target in resolved:
+            steps = [(p, self.room_of[target]), (target, self.room_of[p])] if kind == "swap" else [(p, target)]
+            for member, dst in steps:
+                src = self.room_of[member]
+                if src != dst:
+                    delta += self._relocate(member, dst)
+                    moves.append((self._member_obj[member]["id"], self._room_id(src), self._room_id(dst)))
+        return {
+            "scoreDelta": delta / 100.0,
+            "score": self.score,
+            "violations": list(self.violations.values()),
+            "newViolations": [msg for key, msg in self.violations.items() if key not in before],
+            "resolvedViolations": [msg for key, msg in before.items() if key not in self.violations],
+            "moves": moves,
+        }
+
+    def move(self, member_id: str, to_room_id: str | None) -> Dict[str, Any]:
+        """Move a member (to_room_id None = staging) and report what changed."""
+        result = self.apply_moves([("move", member_id, to_room_id)])
+        del result["moves"]
+        return result
+
+    def revert(self, moves: List[Tuple[str, Any, Any]]) -> None:
+        for member_id, src, _ in reversed(moves):
+            p, r = self._resolve(member_id, src)
+            self._relocate(p, r)
+
+    def soft_scores(self) -> Dict[str, float]:
+        # Full breakdown of the current assignment; the scoring arrays are built on first use
+        if self._scoring is None:
+            self._scoring = ScoringContext(self._member_obj, self._config, self._capacity)
+        return soft_scores(self._scoring, np.array([-1 if r is None else r for r in self.room_of], dtype=np.int64))
+
+    def rooms(self, room_ids: List[Any] | None = None) -> List[Dict[str, Any]]:
+        picked = range(len(self._rooms)) if room_ids is None else [self._room_idx[rid] for rid in room_ids]
+        return [{**self._rooms[r], "members": [self._member_obj[p] for p in self._occupants[r]]} for r in picked]
+
+    def assignment(self) -> Dict[str, Any]:
+        # member id -> room id (None = unassigned) for everyone the state knows
+        return {m["id"]: self._room_id(r) for m, r in zip(self._member_obj, self.room_of)}
+
+    def room_id_of(self, member_id: str) -> Any:
+        return self._room_id(self.room_of[self._idx[member_id]]) if member_id in self._idx else None
+
+
+_CACHE_SIZE = 32
+_states: "OrderedDict[int, Tuple[int, SolutionState]]" = OrderedDict()
+_states_lock = threading.Lock()
+
+
+def get_solution_state(solution_id: int, version: int, build: Callable[[], SolutionState]) -> SolutionState:
+    # Cached per solution; a newer version (edited by another process) rebuilds the state
+    with _states_lock:
+        cached = _states.get(solution_id)
+        if cached is not None and cached[0] == version:
+            _states.move_to_end(solution_id)
+            return cached[1]
+    state = build()
+    remember_solution_state(solution_id, version, state)
+    return state
+
+
+def forget_solution_state(solution_id: int) -> None:
+    with _states_lock:
+        _states.pop(solution_id, None)
+
+
+def remember_solution_state(solution_id: int, version: int, state: SolutionState) -> None:
+    with _states_lock:
+        _states[solution_id] = (version, state)
+        _states.move_to_end(solution_id)
+        while len(_states) > _CACHE_SIZE:
+            _states.popitem(last=False)
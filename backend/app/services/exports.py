@@ -0,0 +1,173 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from ..config import get_settings
+
+# Rooms per yielded CSV chunk
+_CSV_ROOMS = 64
+# Bytes per read when streaming a cached file
+_FILE_CHUNK = 1 << 16
+
+_render_locks: Dict[Tuple[int, int], threading.Lock] = {}
+_render_locks_lock = threading.Lock()
+
+
+def rooms_digest(rooms: List[Dict[str, Any]]) -> str:
+    # Ids and versions restart when the database is recreated; the content does not repeat
+    return hashlib.sha256(json.dumps(rooms, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+def etag(kind: str, solution_id: int, version: int, digest: str) -> str:
+    return f'"{kind}-{solution_id}-v{version}-{digest}"'
+
+
+def not_modified(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or tag in tags
+
+
+def csv_chunks(rooms: List[Dict[str, Any]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["Room", "Capacity", "Member ID", "Member Name"])  # name may require lookup in future
+    for k, room in enumerate(rooms, 1):
+        for m in room.get("members", []):
+            writer.writerow([room["label"], room["capacity"], m.get("id"), m.get("name", "")])
+        if k % _CSV_ROOMS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def json_chunks(rooms: List[Dict[str, Any]]) -> Iterator[str]:
+    # Same bytes as json.dumps(rooms), one room at a time
+    yield "["
+    for k, room in enumerate(rooms):
+        yield (", " if k else "") + json.dumps(room)
+    yield "]"
+
+
+def render_pdf(path: str, solution_id: int, rooms: List[Dict[str, Any]]) -> None:
+    c = canvas.Canvas(path, pagesize=letter)
+    width, height = letter
+
+    y = height - 50
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(50, y, f"Room Wizard Assignment #{solution_id}")
+    y -= 30
+
+    c.setFont("Helvetica", 11)
+    for room in rooms:
+        if y < 100:
+            c.showPage()
+            y = height - 50
+            c.setFont("Helvetica", 11)
+        c.drawString(50, y, f"Room {room.get('label')} (cap {room.get('capacity')})")
+        y -= 18
+        for m in room.get("members", []):
+            c.drawString(70, y, f"- {m.get('name', m.get('id'))}")
+            y -= 14
+        y -= 8
+
+    c.showPage()
+    c.save()
+
+
+def _pdf_dir() -> str:
+    return os.path.join(get_settings().data_dir, "exports")
+
+
+def cached_pdf(solution_id: int, version: int, digest: str, load_rooms: Callable[[], List[Dict[str, Any]]]) -> str:
+    """Path of the solution's PDF at this version and content, rendered on the first request.
+
+    Concurrent requests for the same version wait for one render. Files are written
+    under a temporary name and renamed, so readers never see a partial PDF; older
+    versions of the solution, and files left by an earlier database with the same
+    solution id, are removed once the new one is in place.
+    """
+    directory = _pdf_dir()
+    path = os.path.join(directory, f"solution_{solution_id}_v{version}_{digest}.pdf")
+    if os.path.exists(path):
+        return path
+    with _render_locks_lock:
+        lock = _render_locks.setdefault((solution_id, version), threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                render_pdf(tmp, solution_id, load_rooms())
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            prefix = os.path.join(directory, f"solution_{solution_id}_v")
+            for old in glob.glob(f"{prefix}*.pdf"):
+                stale = old[len(prefix):-len(".pdf")].split("_")[0]
+                if old != path and stale.isdigit() and int(stale) <= version:
+                    try:
+                        os.remove(old)
+                    except OSError:
+                        pass
+    with _render_locks_lock:
+        _render_locks.pop((solution_id, version), None)
+    return path
+
+
+def open_chunks(path: str) -> Tuple[Iterator[bytes], int]:
+    # Opened now, read later: a newer version replacing the file in between does not matter
+    f = open(path, "rb")
+
+    def chunks() -> Iterator[bytes]:
+        with f:
+            yield from iter(lambda: f.read(_FILE_CHUNK), b"")
+
+    return chunks(), os.fstat(f.fileno()).st_size
+
+
+class _Sink(io.RawIOBase):
+    # Write-only, unseekable: zipfile then streams entries with data descriptors
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def zip_chunks(entries: Iterable[Tuple[str, Iterable[Any]]]) -> Iterator[bytes]:
+    """Stream a ZIP of (name, chunks) entries; chunks may be str or bytes.
+
+    Entries are produced lazily, so only one chunk of one file is in memory at a time.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, chunks in entries:
+            with zf.open(name, "w") as f:
+                for chunk in chunks:
+                    f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
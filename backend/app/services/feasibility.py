@@ -0,0 +1,157 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+import time
+from ortools.sat.python import cp_model
+from .presolve import presolve, index_pairs
+
+
+def _issue(code: str, message: str, members: List[str] | None = None, rooms: List[Any] | None = None) -> Dict[str, Any]:
+    return {"code": code, "message": message, "members": members or [], "rooms": rooms or []}
+
+
+def check_feasibility(members: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Cheap structural checks that prove infeasibility without calling CP-SAT.
+
+    Returns {"feasible", "issues", "elapsedMs"}; an empty issue list does not prove
+    the instance feasible, it only means none of the quick checks fired.
+    """
+    t0 = time.perf_counter()
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    allow_empty_beds: bool = config.get("allowEmptyBeds", True)
+    empty_bed_budget: int | None = config.get("emptyBedBudget")
+    hard = config.get("hard", {})
+    member_ids = [m["id"] for m in members.get("members", [])]
+    capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    head_count, total_capacity = len(member_ids), sum(capacities)
+    issues: List[Dict[str, Any]] = []
+
+    if head_count > total_capacity:
+        issues.append(_issue(
+            "capacityShortfall",
+            f"{head_count} members but only {total_capacity} beds",
+        ))
+    elif not allow_empty_beds and head_count != total_capacity:
+        issues.append(_issue(
+            "emptyBedsNotAllowed",
+            f"Empty beds are not allowed but {total_capacity} beds are available for {head_count} members",
+        ))
+    elif allow_empty_beds and empty_bed_budget is not None and total_capacity - head_count > empty_bed_budget:
+        issues.append(_issue(
+            "emptyBedBudget",
+            f"At least {total_capacity - head_count} beds stay empty but the budget is {empty_bed_budget}",
+        ))
+
+    pre = presolve(member_ids, rooms_spec, hard, {})
+    issues.extend(pre["conflicts"])
+
+    largest = max(capacities, default=0)
+    for u, group in enumerate(pre["units"]):
+        if len(group) > largest:
+            issues.append(_issue(
+                "groupTooLarge",
+                f"mustTogether group of {len(group)} does not fit in the largest room ({largest} beds)",
+                members=[member_ids[p] for p in group],
+            ))
+
+    for r, load in enumerate(pre["roomLoad"]):
+        if load > capacities[r]:
+            room = rooms_spec[r]
+            pinned_here = [
+                member_ids[p] for u, pr in pre["pinned"].items() if pr == r for p in pre["units"][u]
+            ]
+            issues.append(_issue(
+                "pinnedOverflow",
+                f"{load} members are pinned to room {room.get('label', room.get('id'))} with capacity {capacities[r]}",
+                members=pinned_here,
+                rooms=[room.get("id")],
+            ))
+
+    return {
+        "feasible": not issues,
+        "issues": issues,
+        "elapsedMs": int(1000 * (time.perf_counter() - t0)),
+    }
+
+
+def explain_infeasibility(members: Dict[str, Any], config: Dict[str, Any], time_limit_sec: float = 10.0) -> List[Dict[str, Any]]:
+    # Rebuild the hard constraints with one assumption literal per constraint, take
+    # the core CP-SAT reports and shrink it with a deletion filter so every remaining
+    # constraint is needed for the conflict.
+    deadline = time.perf_counter() + time_limit_sec
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    allow_empty_beds: bool = config.get("allowEmptyBeds", True)
+    empty_bed_budget: int | None = config.get("emptyBedBudget")
+    hard = config.get("hard", {})
+    member_ids = [m["id"] for m in members.get("members", [])]
+    id_to_idx = {mid: idx for idx, mid in enumerate(member_ids)}
+    room_id_to_idx = {room.get("id"): idx for idx, room in enumerate(rooms_spec)}
+    capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    P, R = len(member_ids), len(rooms_spec)
+
+    model = cp_model.CpModel()
+    x = {(p, r): model.NewBoolVar(f"x_{p}_{r}") for p in range(P) for r in range(R)}
+    for p in range(P):
+        model.AddExactlyOne(x[p, r] for r in range(R))
+
+    labelled: List[Tuple[Any, Dict[str, Any]]] = []
+
+    def guarded(issue: Dict[str, Any]) -> Any:
+        lit = model.NewBoolVar(f"a_{len(labelled)}")
+        labelled.append((lit, issue))
+        return lit
+
+    for r, room in enumerate(rooms_spec):
+        filled = sum(x[p, r] for p in range(P))
+        if allow_empty_beds:
+            lit = guarded(_issue("capacity", f"Room {room.get('label', room.get('id'))} holds at most {capacities[r]}", rooms=[room.get("id")]))
+            model.Add(filled <= capacities[r]).OnlyEnforceIf(lit)
+        else:
+            lit = guarded(_issue("exactFill", f"Room {room.get('label', room.get('id'))} must be filled to {capacities[r]}", rooms=[room.get("id")]))
+            model.Add(filled == capacities[r]).OnlyEnforceIf(lit)
+    if allow_empty_beds and empty_bed_budget is not None:
+        lit = guarded(_issue("emptyBedBudget", f"At most {empty_bed_budget} empty beds"))
+        model.Add(sum(x.values()) >= sum(capacities) - empty_bed_budget).OnlyEnforceIf(lit)
+
+    for key in ("mustApartPairs", "mutualDislikePairs"):
+        for i, j in index_pairs(hard.get(key, []), id_to_idx):
+            lit = guarded(_issue("mustApart", f"{member_ids[i]} and {member_ids[j]} must be apart", members=[member_ids[i], member_ids[j]]))
+            for r in range(R):
+                model.Add(x[i, r] + x[j, r] <= 1).OnlyEnforceIf(lit)
+    for i, j in index_pairs(hard.get("mustTogetherPairs", []), id_to_idx):
+        lit = guarded(_issue("mustTogether", f"{member_ids[i]} and {member_ids[j]} must be together", members=[member_ids[i], member_ids[j]]))
+        for r in range(R):
+            model.Add(x[i, r] == x[j, r]).OnlyEnforceIf(lit)
+    for mid, rid in hard.get("fixedRoomAssignments", {}).items():
+        i, r = id_to_idx.get(mid), room_id_to_idx.get(rid)
+        if i is None or r is None:
+            continue
+        lit = guarded(_issue("fixedAssignment", f"{mid} is pinned to room {rid}", members=[mid], rooms=[rid]))
+        model.AddImplication(lit, x[i, r])
+
+    index_of = {lit.Index(): k for k, (lit, _) in enumerate(labelled)}
+
+    def core_of(candidates: List[int]) -> List[int] | None:
+        # Indices of a sufficient infeasible subset of candidates, or None if feasible/unknown
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        model.ClearAssumptions()
+        model.AddAssumptions([labelled[k][0] for k in candidates])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = remaining
+        solver.parameters.num_search_workers = 1
+        if solver.Solve(model) != cp_model.INFEASIBLE:
+            return None
+        core = [index_of[i] for i in solver.SufficientAssumptionsForInfeasibility() if i in index_of]
+        return core or candidates
+
+    core = core_of(list(range(len(labelled))))
+    if core is None:
+        return []
+    for k in list(core):
+        if k not in core:
+            continue
+        trial = core_of([c for c in core if c != k])
+        if trial is not None:
+            core = trial
+    return [labelled[k][1] for k in sorted(core)]
@@ -0,0 +1,262 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+import time
+import numpy as np
+from .coefficients import pair_coefficient_matrix, rank_coefficient
+from .presolve import presolve
+
+# Stand-in coefficient for a mustApart pair sharing a room; large enough that no
+# combination of soft terms makes a violation look attractive
+APART_PENALTY = 10**6
+_NEVER = np.iinfo(np.int64).min // 2
+
+
+class _Search:
+    """Unit-level assignment with incremental gains.
+
+    H[u, r] is L[u, r] plus the summed pair coefficient between unit u and the units
+    now in room r, so moving u from a to b changes the objective by H[u, b] - H[u, a],
+    and a move updates two columns of H. H is column-major since both the updates
+    and the swap evaluation read whole columns.
+    """
+
+    def __init__(self, W: np.ndarray, L: np.ndarray, sizes: np.ndarray, allowed: np.ndarray, free_beds: np.ndarray) -> None:
+        self.W, self.sizes = W, sizes
+        U, R = L.shape
+        self.H = np.asfortranarray(L, dtype=np.int64).copy(order="F")
+        self.allowed = np.asfortranarray(allowed)
+        self.room = np.full(U, -1, dtype=np.intp)
+        self.free_beds = free_beds.astype(np.int64)
+        # Equal unit sizes: a swap never changes room loads
+        self._uniform = bool(U == 0 or (sizes == sizes[0]).all())
+        # H[v, room[v]] for every placed unit
+        self.own = np.zeros(U, dtype=np.int64)
+
+    def place(self, u: int, r: int) -> None:
+        a = self.room[u]
+        w = self.W[:, u]
+        if a >= 0:
+            self.H[:, a] -= w
+            self.free_beds[a] += self.sizes[u]
+            self.own[self.room == a] -= w[self.room == a]
+        self.H[:, r] += w
+        self.free_beds[r] -= self.sizes[u]
+        self.room[u] = r
+        in_r = self.room == r
+        self.own[in_r] += w[in_r]
+        self.own[u] = self.H[u, r]
+
+    def greedy(self, order: List[int], hint: Dict[int, int]) -> bool:
+        # Each unit takes its hinted room if it still fits, else the best-fitting room
+        for u in order:
+            fits = self.allowed[u] & (self.free_beds >= self.sizes[u])
+            if not fits.any():
+                return False
+            r = hint.get(u, -1)
+            if r < 0 or not fits[r]:
+                r = int(np.argmax(np.where(fits, self.H[u], _NEVER)))
+            self.place(u, r)
+        return True
+
+    def best_step(self, u: int) -> Tuple[int, int, int]:
+        # (gain, target room, swap partner or -1) of the best move or swap for unit u
+        a, s = self.room[u], self.sizes[u]
+        stay = self.own[u]
+        fits = self.allowed[u] & (self.free_beds >= s)
+        fits[a] = False
+        gains = np.where(fits, self.H[u] - stay, _NEVER)
+        b = int(np.argmax(gains))
+        best = (int(gains[b]), b, -1)
+
+        rooms = self.room
+        swap = self.H[u, rooms] + self.H[:, a] - self.own - 2 * self.W[u] - stay
+        ok = (rooms != a) & self.allowed[u, rooms] & self.allowed[:, a]
+        if not self._uniform:
+            ok &= (self.free_beds[rooms] + self.sizes - s >= 0) & (self.free_beds[a] + s - self.sizes >= 0)
+        swap[~ok] = _NEVER
+        v = int(np.argmax(swap))
+        if swap[v] > best[0]:
+            best = (int(swap[v]), int(rooms[v]), v)
+        return best
+
+    def step(self, u: int, b: int, v: int, log: List[Tuple[int, int]]) -> None:
+        log.append((u, int(self.room[u])))
+        if v >= 0:
+            log.append((v, int(self.room[v])))
+            a = int(self.room[u])
+            self.place(u, b)
+            self.place(v, a)
+        else:
+            self.place(u, b)
+
+    def descend(self, rng: np.random.Generator, deadline: float, log: List[Tuple[int, int]]) -> int:
+        # Improving moves/swaps, unit by unit in random order, until a pass finds none
+        gained = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for u in rng.permutation(len(self.room)).tolist():
+                gain, b, v = self.best_step(u)
+                if gain > 0:
+                    self.step(u, b, v, log)
+                    gained += gain
+                    improved = True
+                if time.perf_counter() >= deadline:
+                    break
+        return gained
+
+    def kick(self, rng: np.random.Generator, count: int, log: List[Tuple[int, int]]) -> int:
+        # Random feasible moves, taken whatever they cost; returns the summed gain
+        gained = 0
+        for u in rng.choice(len(self.room), size=min(count, len(self.room)), replace=False).tolist():
+            a = self.room[u]
+            fits = self.allowed[u] & (self.free_beds >= self.sizes[u])
+            fits[a] = False
+            targets = np.flatnonzero(fits)
+            if len(targets):
+                b = int(rng.choice(targets))
+                gained += int(self.H[u, b] - self.own[u])
+                self.step(u, b, -1, log)
+        return gained
+
+    def undo(self, log: List[Tuple[int, int]]) -> None:
+        for u, r in reversed(log):
+            self.place(u, r)
+
+
+def solve_heuristic(
+    member_list: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    closed_rooms: set[int] | None = None,
+    base_room: Dict[int, int] | None = None,
+    time_limit_sec: float = 1.0,
+    seed: int = 0,
+    max_stall: int = 8,
+) -> Dict[str, Any] | None:
+    """Greedy placement plus move/swap local search on the presolved units.
+
+    Optimizes the same objective as build_model: units are seeded largest first
+    (mustTogether groups, then members with the fewest usable rooms), into their
+    ``base_room`` when given, then improved by best-improvement moves and swaps and
+    random kicks that are kept only if the following descent ends higher. Stops
+    after ``max_stall`` kicks without improvement or at the time limit. Returns None
+    when the greedy pass cannot place every unit or a mustApart pair stays violated.
+    """
+    started = time.perf_counter()
+    deadline = started + max(0.05, float(time_limit_sec))
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    weights = config.get("weights", {"alpha": 0.2, "beta": 0.1, "gamma": 0.1})
+    R = len(rooms_spec)
+    P = len(member_list)
+
+    C = pair_coefficient_matrix([m["id"] for m in member_list], config)
+    pre = presolve([m["id"] for m in member_list], rooms_spec, config.get("hard", {}), {})
+    if pre["conflicts"]:
+        return None
+    units: List[List[int]] = pre["units"]
+    free: List[int] = pre["free"]
+    pinned: Dict[int, int] = pre["pinned"]
+    unit_of = np.asarray(pre["unitOf"], dtype=np.intp)
+    capacities = np.array([int(room.get("capacity", 0)) for room in rooms_spec], dtype=np.int64)
+    U = len(free)
+
+    # Unit-level pair coefficients: sum member blocks when mustTogether groups exist
+    if len(units) == P:
+        Wg = C.astype(np.int64)
+    else:
+        order = np.argsort(unit_of, kind="stable")
+        starts = np.searchsorted(unit_of[order], np.arange(len(units)))
+        Wg = np.add.reduceat(np.add.reduceat(C[order][:, order].astype(np.int64), starts, axis=0), starts, axis=1)
+    constant = int(np.trace(Wg)) // 2
+
+    pinned_units = np.array(sorted(pinned), dtype=np.intp)
+    pinned_rooms = np.array([pinned[g] for g in pinned_units.tolist()], dtype=np.intp)
+    free_idx = np.asarray(free, dtype=np.intp)
+    W = Wg[np.ix_(free_idx, free_idx)].copy()
+    np.fill_diagonal(W, 0)
+    L = np.zeros((U, R), dtype=np.int64)
+    if len(pinned_units):
+        onehot = np.zeros((len(pinned_units), R), dtype=np.int64)
+        onehot[np.arange(len(pinned_units)), pinned_rooms] = 1
+        # Pairs with a pinned unit are linear in the free unit's room
+        L += Wg[np.ix_(free_idx, pinned_units)] @ onehot
+        block = Wg[np.ix_(pinned_units, pinned_units)]
+        same = pinned_rooms[:, None] == pinned_rooms[None, :]
+        constant += int((block * same).sum() - np.trace(block)) // 2
+    # presolve got no pair dict (the matrices above replace it), so count its pair stats here
+    pre["stats"] = {
+        **pre["stats"],
+        "pairsBefore": int(np.count_nonzero(np.triu(C, 1))),
+        "pairsAfter": int(np.count_nonzero(np.triu(W, 1))),
+        "foldedLinearTerms": int(np.count_nonzero(L)),
+    }
+
+    # Size rank bonus, as in weighted_objective
+    alpha = weights.get("alpha", 0.2)
+    if alpha:
+        caps = sorted(set(capacities.tolist()))
+        col_of_cap = np.array([caps.index(c) for c in capacities.tolist()], dtype=np.intp)
+        bonus = np.array(
+            [[sum(rank_coefficient(member_list[p], cap, alpha) for p in group) for cap in caps] for group in units],
+            dtype=np.int64,
+        )
+        L += bonus[free_idx][:, col_of_cap]
+        constant += int(sum(bonus[g, col_of_cap[r]] for g, r in pinned.items()))
+    beta = weights.get("beta", 0.1)
+    if config.get("allowEmptyBeds", True) and beta:
+        # Everyone gets a bed, so the empty-bed total is the same for every assignment
+        constant += int(-100 * beta) * int(capacities.sum() - P)
+
+    allowed = np.ones((U, R), dtype=bool)
+    for u, r in pre["forbidden"]:
+        allowed[u, r] = False
+    for r in closed_rooms or ():
+        allowed[:, r] = False
+    apart = np.array(sorted(pre["apart"]), dtype=np.intp).reshape(-1, 2)
+    W_search = W.copy()
+    if len(apart):
+        W_search[apart[:, 0], apart[:, 1]] -= APART_PENALTY
+        W_search[apart[:, 1], apart[:, 0]] -= APART_PENALTY
+
+    sizes = np.array([len(units[g]) for g in free], dtype=np.int64)
+    free_beds = capacities - np.asarray(pre["roomLoad"], dtype=np.int64)
+    search = _Search(W_search, L, sizes, allowed, free_beds)
+    hint = {}
+    for u, g in enumerate(free):
+        r = (base_room or {}).get(units[g][0])
+        if r is not None:
+            hint[u] = r
+    strength = np.maximum(W, 0).sum(axis=1)
+    seed_order = sorted(range(U), key=lambda u: (-sizes[u], int(allowed[u].sum()), -int(strength[u])))
+    if not search.greedy(seed_order, hint):
+        return None
+
+    rng = np.random.default_rng(seed)
+    kicks = 0
+    search.descend(rng, deadline, [])
+    stall = 0
+    while stall < max_stall and time.perf_counter() < deadline:
+        log: List[Tuple[int, int]] = []
+        gain = search.kick(rng, max(2, U // 50), log)
+        gain += search.descend(rng, deadline, log)
+        kicks += 1
+        if gain > 0:
+            stall = 0
+        else:
+            search.undo(log)
+            stall += 1
+
+    room = search.room
+    if len(apart) and (room[apart[:, 0]] == room[apart[:, 1]]).any():
+        return None
+    same = room[:, None] == room[None, :]
+    objective = constant + int(L[np.arange(U), room].sum()) + int((W * same).sum()) // 2
+
+    room_of_unit: Dict[int, int] = dict(pinned)
+    room_of_unit.update({g: int(room[u]) for u, g in enumerate(free)})
+    return {
+        "roomOfUnit": room_of_unit,
+        "objective": objective,
+        "pre": pre,
+        "stats": {"units": U, "kicks": kicks, "elapsedMs": int(1000 * (time.perf_counter() - started))},
+    }
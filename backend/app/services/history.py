@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import zlib
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from ..assignments import load_assignment
+from ..models import Move, Solution, SolutionSnapshot
+
+# A snapshot is written once the current move is this many moves past the last one,
+# so replay to any move reads at most about this many rows
+SNAPSHOT_EVERY = 100
+
+MoveTuple = Tuple[str, Optional[str], Optional[str]]
+
+
+def _pack(assignment: Dict[str, Optional[str]]) -> bytes:
+    rooms: Dict[str, List[str]] = {}
+    for mid, rid in assignment.items():
+        if rid is not None:
+            rooms.setdefault(rid, []).append(mid)
+    return zlib.compress(json.dumps(rooms, separators=(",", ":")).encode())
+
+
+def _unpack(data: bytes) -> Dict[str, Optional[str]]:
+    rooms = json.loads(zlib.decompress(data))
+    return {mid: rid for rid, mids in rooms.items() for mid in mids}
+
+
+def _move(session: Session, solution_id: int, seq: int) -> Optional[Move]:
+    return session.exec(select(Move).where(Move.solution_id == solution_id, Move.seq == seq)).first()
+
+
+def _snapshot(session: Session, solution_id: int, seq: int) -> Optional[SolutionSnapshot]:
+    return session.exec(
+        select(SolutionSnapshot).where(SolutionSnapshot.solution_id == solution_id, SolutionSnapshot.seq == seq)
+    ).first()
+
+
+def _batch(session: Session, solution_id: int, batch: int) -> List[MoveTuple]:
+    rows = session.exec(
+        select(Move.member_id, Move.from_room_id, Move.to_room_id)
+        .where(Move.solution_id == solution_id, Move.batch == batch)
+        .order_by(Move.seq)
+    )
+    return [tuple(row) for row in rows]
+
+
+def append_moves(
+    session: Session, sol: Solution, moves: List[MoveTuple], current: Callable[[], Dict[str, Optional[str]]]
+) -> None:
+    """Log a batch after the current move and make its last move the head.
+
+    Call before the batch is written to the Assignment rows: the first batch of a
+    solution snapshots those rows as move 0. ``current`` returns the assignment
+    after the batch and is only called when a snapshot is due. The caller commits.
+    """
+    sid = sol.id or 0
+    if not moves:
+        return
+    if sol.move_seq == 0 and _snapshot(session, sid, 0) is None:
+        session.add(SolutionSnapshot(solution_id=sid, seq=0, depth=0, data=_pack(load_assignment(session, sid))))
+
+    head = _move(session, sid, sol.head_seq) if sol.head_seq else None
+    depth = head.depth if head else 0
+    if head is None or _snapshot(session, sid, head.seq or 0) is not None:
+        base, base_depth = sol.head_seq, depth
+    else:
+        base = head.base or 0
+        base_depth = session.exec(
+            select(SolutionSnapshot.depth).where(SolutionSnapshot.solution_id == sid, SolutionSnapshot.seq == base)
+        ).one()
+
+    first = sol.move_seq + 1
+    session.execute(insert(Move), [
+        {
+            "solution_id": sid, "member_id": mid, "from_room_id": src, "to_room_id": dst,
+            "seq": first + k, "prev": first + k - 1 if k else sol.head_seq, "depth": depth + k + 1,
+            "batch": first, "base": base,
+        }
+        for k, (mid, src, dst) in enumerate(moves)
+    ])
+    sol.move_seq = sol.head_seq = first + len(moves) - 1
+    depth += len(moves)
+    if depth - base_depth >= SNAPSHOT_EVERY:
+        session.add(SolutionSnapshot(solution_id=sid, seq=sol.head_seq, depth=depth, data=_pack(current())))
+    session.add(sol)
+
+
+def undo_moves(session: Session, sol: Solution) -> List[MoveTuple]:
+    # The batch that ends at the head, in applied order; the head moves to before it
+    sid = sol.id or 0
+    head = _move(session, sid, sol.head_seq) if sol.head_seq else None
+    if head is None or head.batch is None:
+        raise ValueError("Nothing to undo")
+    first = head if head.seq == head.batch else _move(session, sid, head.batch)
+    sol.head_seq = (first.prev if first else None) or 0
+    session.add(sol)
+    return _batch(session, sid, head.batch)
+
+
+def redo_moves(session: Session, sol: Solution) -> List[MoveTuple]:
+    # The most recent batch applied after the head (the last one undone from here)
+    sid = sol.id or 0
+    batch = session.exec(
+        select(Move.batch)
+        .where(Move.solution_id == sid, Move.prev == sol.head_seq, Move.seq == Move.batch)
+        .order_by(Move.seq.desc())
+        .limit(1)
+    ).first()
+    if batch is None:
+        raise ValueError("Nothing to redo")
+    moves = _batch(session, sid, batch)
+    sol.head_seq = batch + len(moves) - 1
+    session.add(sol)
+    return moves
+
+
+def replay(session: Session, sol: Solution, seq: int) -> Tuple[Dict[str, Optional[str]], int]:
+    """Assignment right after move ``seq`` (0 = before the first move) and its depth.
+
+    Starts from the nearest snapshot on the move's own branch, so the cost is
+    bounded by SNAPSHOT_EVERY plus one batch, not by the length of the log.
+    Raises KeyError for a move number the solution does not have.
+    """
+    sid = sol.id or 0
+    if seq == 0:
+        snap = _snapshot(session, sid, 0)
+        return (_unpack(snap.data) if snap else load_assignment(session, sid)), 0
+    target = _move(session, sid, seq)
+    if target is None:
+        raise KeyError(f"Move {seq} not found")
+    snap = _snapshot(session, sid, seq)
+    if snap is not None:
+        return _unpack(snap.data), snap.depth
+    base = target.base or 0
+    snap = _snapshot(session, sid, base)
+    if snap is None:
+        raise KeyError(f"Snapshot {base} not found")
+
+    # Rows replaying from the same snapshot; other branches are skipped by walking prev links
+    rows = session.exec(
+        select(Move.seq, Move.prev, Move.member_id, Move.to_room_id)
+        .where(Move.solution_id == sid, Move.base == base, Move.seq <= seq)
+    ).all()
+    by_seq = {row[0]: row for row in rows}
+    chain = []
+    at = seq
+    while at != base:
+        row = by_seq[at]
+        chain.append(row)
+        at = row[1]
+    assignment = _unpack(snap.data)
+    for _, _, mid, rid in reversed(chain):
+        assignment[mid] = rid
+    return assignment, target.depth
@@ -0,0 +1,300 @@
+from __future__ import annotations
+from typing import Deque, Dict, Any, List, Callable, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+import multiprocessing as mp
+import threading
+import time
+import uuid
+from ..config import get_settings
+from .optimize import run_optimization
+from .sweep import get_core_budget, run_sweep
+
+FINISHED = ("done", "failed", "cancelled")
+# Progress events kept per job; older ones are dropped, the latest is always kept
+MAX_EVENTS = 256
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    events: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_EVENTS))
+    # Events ever added, so readers can resume from an absolute position
+    event_count: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    solution_id: Optional[int] = None
+    future: Optional[Future] = None
+    cancel_event: Any = None
+    # Set once every progress event of the run has been collected
+    drained: bool = False
+    # Result cache key; unfinished jobs with the same key are shared
+    key: Optional[str] = None
+    # "optimize" or "sweep"
+    kind: str = "optimize"
+    # Set once the job is finished and on_done has run
+    done: threading.Event = field(default_factory=threading.Event)
+    _events_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        with self._events_lock:
+            self.events.append(event)
+            self.event_count += 1
+
+    def events_since(self, position: int) -> Tuple[List[Dict[str, Any]], int]:
+        # Events after absolute position `position` that are still kept, and the new position
+        with self._events_lock:
+            missed = self.event_count - position
+            return list(self.events)[-missed:] if missed > 0 else [], self.event_count
+
+
+def _solve(
+    job_id: str,
+    members: Dict[str, Any],
+    config_json: str,
+    time_limit_sec: float,
+    queue: Any,
+    cancel_event: Any,
+    options: Dict[str, Any],
+) -> Dict[str, Any]:
+    # Runs in a pool process; incumbents go back to the parent through the manager queue
+    queue.put((job_id, {"type": "started"}))
+    try:
+        return run_optimization(
+            members,
+            config_json,
+            time_limit_sec=time_limit_sec,
+            on_progress=lambda ev: queue.put((job_id, {"type": "progress", **ev})),
+            cancel_event=cancel_event,
+            **options,
+        )
+    finally:
+        queue.put((job_id, {"type": "drained"}))
+
+
+class JobManager:
+    """Runs optimizations in a bounded process pool and tracks their progress.
+
+    Weight sweeps run on threads instead: each waits for the shared core budget and
+    then starts its own solver processes, so the pool is not the limit for them.
+    """
+
+    def __init__(self, max_workers: int = 2, keep_finished: int = 200) -> None:
+        ctx = mp.get_context("spawn")
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx)
+        self._sweeps = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sweep")
+        self._mp = ctx.Manager()
+        self._queue = self._mp.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._running_by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._keep_finished = keep_finished
+        self._drain = threading.Thread(target=self._drain_events, daemon=True)
+        self._drain.start()
+
+    def submit(
+        self,
+        members: Dict[str, Any],
+        config_json: str,
+        time_limit_sec: float,
+        on_done: Callable[[Job], None] | None = None,
+        key: str | None = None,
+        **options: Any,
+    ) -> Job:
+        job = Job(id=uuid.uuid4().hex, cancel_event=self._mp.Event(), key=key)
+        with self._lock:
+            running = self._jobs.get(self._running_by_key.get(key, "")) if key else None
+            if running is not None and not running.finished and not running.cancel_event.is_set():
+                return running
+            self._jobs[job.id] = job
+            if key:
+                self._running_by_key[key] = job.id
+            self._evict()
+        job.future = self._pool.submit(
+            _solve, job.id, members, config_json, time_limit_sec, self._queue, job.cancel_event, options
+        )
+        job.future.add_done_callback(lambda fut: self._finish(job, fut, on_done))
+        return job
+
+    def run_inline(
+        self,
+        key: str,
+        solve: Callable[[Job], Dict[str, Any]],
+        on_done: Callable[[Job], None] | None = None,
+    ) -> Job:
+        """Run ``solve(job)`` on the calling thread as a job with this key, and return it finished.
+
+        Shares the registry with ``submit``: an unfinished job with the same key is
+        waited for instead, and jobs submitted meanwhile join this run. ``solve``
+        should honor ``job.cancel_event`` and may report progress with ``job.add_event``.
+        """
+        job = Job(id=uuid.uuid4().hex, status="running", cancel_event=self._mp.Event(), key=key)
+        with self._lock:
+            running = self._jobs.get(self._running_by_key.get(key, ""))
+            if running is None or running.finished or running.cancel_event.is_set():
+                self._jobs[job.id] = job
+                self._running_by_key[key] = job.id
+                self._evict()
+                running = None
+        if running is not None:
+            running.done.wait()
+            return running
+        job.future = Future()
+        try:
+            job.future.set_result(solve(job))
+        except BaseException as exc:
+            job.future.set_exception(exc)
+        job.drained = True
+        self._finish(job, job.future, on_done)
+        return job
+
+    def submit_sweep(
+        self,
+        members: Dict[str, Any],
+        config: Dict[str, Any],
+        points: List[Dict[str, float]],
+        time_limit_sec: float,
+        cores: int | None = None,
+    ) -> Job:
+        job = Job(id=uuid.uuid4().hex, cancel_event=self._mp.Event(), kind="sweep")
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        job.future = self._sweeps.submit(self._sweep, job, members, config, points, time_limit_sec, cores)
+        job.future.add_done_callback(lambda fut: self._finish(job, fut, None))
+        return job
+
+    def _sweep(
+        self,
+        job: Job,
+        members: Dict[str, Any],
+        config: Dict[str, Any],
+        points: List[Dict[str, float]],
+        time_limit_sec: float,
+        cores: int | None,
+    ) -> Dict[str, Any]:
+        # Events go through the same queue as pool jobs, so "drained" stays last
+        self._queue.put((job.id, {"type": "started"}))
+        try:
+            budget = get_core_budget()
+            return run_sweep(
+                members, config, points, time_limit_sec, budget, cores or budget.cores,
+                cancel_event=job.cancel_event, queue=self._queue, job_id=job.id,
+            )
+        finally:
+            self._queue.put((job.id, {"type": "drained"}))
+
+    def completed(self, result: Dict[str, Any], solution_id: int | None) -> Job:
+        # A job that is already done, for requests answered from the result cache
+        job = Job(id=uuid.uuid4().hex, status="done", result=result, solution_id=solution_id, drained=True)
+        job.done.set()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        if job.future is not None:
+            # Succeeds only if the job never started; a running one stops via the event
+            job.future.cancel()
+        return job
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            if not job.finished:
+                job.cancel_event.set()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._sweeps.shutdown(wait=True, cancel_futures=True)
+        self._queue.put(None)
+        self._drain.join(timeout=5)
+        self._mp.shutdown()
+
+    def _drain_events(self) -> None:
+        while True:
+            try:
+                item = self._queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event = item
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            if event["type"] == "started":
+                if not job.finished:
+                    job.status = "running"
+            elif event["type"] == "drained":
+                job.drained = True
+            else:
+                job.add_event(event)
+
+    def _finish(self, job: Job, fut: Future, on_done: Callable[[Job], None] | None) -> None:
+        try:
+            if fut.cancelled():
+                job.status = "cancelled"
+                job.drained = True
+                return
+            job.result = fut.result()
+            if job.cancel_event.is_set():
+                job.status = "cancelled"
+            elif "infeasibility" in job.result:
+                job.status = "failed"
+                job.error = "; ".join(job.result["hardViolations"])
+            else:
+                if on_done is not None:
+                    on_done(job)
+                job.status = "done"
+        except Exception as exc:  # surfaced through the status endpoint
+            job.status = "failed"
+            job.error = str(exc)
+            job.drained = True
+        finally:
+            # Released only after on_done, so the result is cached before new requests miss
+            if job.key:
+                with self._lock:
+                    if self._running_by_key.get(job.key) == job.id:
+                        del self._running_by_key[job.key]
+            job.done.set()
+
+    def _evict(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        if len(finished) <= self._keep_finished:
+            return
+        finished.sort(key=lambda j: j.created_at)
+        for job in finished[: len(finished) - self._keep_finished]:
+            self._jobs.pop(job.id, None)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(max_workers=get_settings().optimize_workers)
+        return _manager
+
+
+def shutdown_job_manager() -> None:
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
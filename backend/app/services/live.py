@@ -0,0 +1,126 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict, deque
+import asyncio
+import json
+import threading
+
+# Versions remembered per solution for conflict checks; older bases must resync
+HISTORY = 256
+# Solutions with history kept at once, least recently edited dropped first
+MAX_SOLUTIONS = 256
+# Deltas a slow client may have queued before it is told to resync instead
+MAX_PENDING = 512
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[str] = asyncio.Queue(MAX_PENDING)
+
+    def deliver(self, text: str) -> None:
+        # Must run on the subscriber's loop
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(json.dumps({"type": "resync"}))
+
+
+class _Channel:
+    def __init__(self) -> None:
+        self.subscribers: Set[Subscriber] = set()
+        # (version, members it moved), oldest first
+        self.history: deque[Tuple[int, FrozenSet[str]]] = deque(maxlen=HISTORY)
+
+
+class LiveHub:
+    """Per-solution fan-out of move deltas to connected clients.
+
+    Edits arrive on worker threads, clients wait on their event loops: a delta is
+    encoded once and handed to each subscriber's loop. Also remembers which members
+    each recent version moved, so an edit made against an older version can be
+    rebased when it touches other members and rejected when it does not.
+    """
+
+    def __init__(self) -> None:
+        self._channels: "OrderedDict[int, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, solution_id: int) -> _Channel:
+        channel = self._channels.get(solution_id)
+        if channel is None:
+            channel = self._channels[solution_id] = _Channel()
+        self._channels.move_to_end(solution_id)
+        while len(self._channels) > MAX_SOLUTIONS:
+            oldest = next(iter(self._channels))
+            if self._channels[oldest].subscribers or oldest == solution_id:
+                break
+            del self._channels[oldest]
+        return channel
+
+    def subscribe(self, solution_id: int, loop: asyncio.AbstractEventLoop) -> Subscriber:
+        sub = Subscriber(loop)
+        with self._lock:
+            self._channel(solution_id).subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, solution_id: int, sub: Subscriber) -> None:
+        with self._lock:
+            channel = self._channels.get(solution_id)
+            if channel is not None:
+                channel.subscribers.discard(sub)
+
+    def subscribers(self, solution_id: int) -> int:
+        with self._lock:
+            channel = self._channels.get(solution_id)
+            return len(channel.subscribers) if channel else 0
+
+    def publish(self, solution_id: int, version: int, members: Iterable[str], message: Dict[str, Any]) -> None:
+        text = json.dumps(message, separators=(",", ":"))
+        with self._lock:
+            channel = self._channel(solution_id)
+            channel.history.append((version, frozenset(members)))
+            subs = list(channel.subscribers)
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, text)
+            except RuntimeError:
+                # Loop already closed; the connection is gone
+                self.unsubscribe(solution_id, sub)
+
+    def touched_since(self, solution_id: int, base: int, current: int) -> Optional[Set[str]]:
+        # Members moved by versions base+1..current, or None when some of them are unknown
+        with self._lock:
+            channel = self._channels.get(solution_id)
+            entries = [(v, m) for v, m in channel.history if base < v <= current] if channel else []
+        if len({v for v, _ in entries}) != current - base:
+            return None
+        return set().union(*(m for _, m in entries))
+
+
+_hub: Optional[LiveHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_live_hub() -> LiveHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = LiveHub()
+        return _hub
+
+
+def delta_message(version: int, move_seq: int, moves: List[Tuple[str, Any, Any]], result: Dict[str, Any]) -> Dict[str, Any]:
+    # Only what changed: size depends on the moves, not on the cohort
+    return {
+        "type": "delta",
+        "version": version,
+        "moveSeq": move_seq,
+        "moves": [list(move) for move in moves],
+        "scoreDelta": result.get("scoreDelta", 0.0),
+        "score": result.get("score"),
+        "newViolations": result.get("newViolations", []),
+        "resolvedViolations": result.get("resolvedViolations", []),
+    }
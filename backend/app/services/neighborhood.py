@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Dict, Any, List
+from .optimize import run_optimization, score_assignment
+from .presolve import UnionFind, index_pairs
+
+
+def reoptimize_neighborhood(
+    members: Dict[str, Any],
+    config: Dict[str, Any],
+    rooms: List[Dict[str, Any]],
+    room_ids: List[str],
+    member_ids: List[str],
+    time_limit_sec: float = 1.0,
+) -> Dict[str, Any]:
+    """Re-solve a few rooms of an existing solution and leave everyone else in place.
+
+    ``rooms`` is the stored solution (rooms with member objects). Everyone in
+    ``room_ids`` and every member in ``member_ids`` is free; other occupants of the
+    touched rooms keep their bed. Only the touched rooms and their occupants enter
+    the model: members outside can never share a room with a free member, so they
+    only add a constant to the objective. mustTogether partners and pinned rooms of
+    free members pull their rooms into the neighborhood. Raises ValueError when a
+    touched room of ``rooms`` is missing from the config.
+    """
+    member_list: List[Dict[str, Any]] = members.get("members", [])
+    by_id = {m["id"]: m for m in member_list}
+    base = {m["id"]: room["id"] for room in rooms for m in room.get("members", [])}
+    spec_by_id = {room.get("id"): room for room in config.get("rooms", [])}
+    hard = config.get("hard", {})
+    fixed: Dict[str, str] = dict(hard.get("fixedRoomAssignments", {}))
+
+    free = {mid for mid in member_ids if mid in by_id}
+    free |= {mid for mid, rid in base.items() if rid in set(room_ids)}
+    touched = {rid for rid in room_ids if rid in spec_by_id}
+    touched |= {base[mid] for mid in free if mid in base}
+
+    # mustTogether partners of free members have to be reachable in the sub-model
+    ids = [m["id"] for m in member_list]
+    uf = UnionFind(len(ids))
+    for i, j in index_pairs(hard.get("mustTogetherPairs", []), {mid: k for k, mid in enumerate(ids)}):
+        uf.union(i, j)
+    free_roots = {uf.find(k) for k, mid in enumerate(ids) if mid in free}
+    for k, mid in enumerate(ids):
+        if uf.find(k) in free_roots and mid not in free:
+            if mid in base:
+                touched.add(base[mid])
+            else:
+                free.add(mid)
+    touched |= {fixed[mid] for mid in free if fixed.get(mid) in spec_by_id}
+
+    sub_ids = [mid for mid in ids if mid in free or base.get(mid) in touched]
+    sub_members = [by_id[mid] for mid in sub_ids]
+    unknown = [room["id"] for room in rooms if room["id"] in touched and room["id"] not in spec_by_id]
+    if unknown:
+        raise ValueError(f"Room {unknown[0]} is not in the config")
+    sub_rooms = [spec_by_id[room["id"]] for room in rooms if room["id"] in touched]
+    sub_fixed = {mid: rid for mid, rid in fixed.items() if mid in free}
+    sub_fixed.update({mid: base[mid] for mid in sub_ids if mid not in free})
+    sub_hard = {**hard, "fixedRoomAssignments": sub_fixed}
+    sub_config = {**config, "rooms": sub_rooms, "hard": sub_hard}
+
+    room_idx = {room.get("id"): r for r, room in enumerate(sub_rooms)}
+    before = score_assignment(
+        sub_members, sub_config, {p: room_idx[base[mid]] for p, mid in enumerate(sub_ids) if base.get(mid) in room_idx}
+    )
+
+    result = run_optimization(
+        {"members": sub_members},
+        sub_config,
+        time_limit_sec=time_limit_sec,
+        base_assignment={mid: rid for mid, rid in base.items() if rid in touched},
+    )
+    if "infeasibility" in result:
+        return result
+
+    new_rooms = {room["id"]: room for room in result["rooms"]}
+    merged = []
+    for room in rooms:
+        if room["id"] in new_rooms:
+            merged.append({**room, "members": new_rooms[room["id"]]["members"]})
+        else:
+            merged.append(room)
+
+    result["scoreDelta"] = result["score"] - before
+    result["rooms"] = merged
+    result["neighborhood"] = {"rooms": len(sub_rooms), "members": len(sub_ids), "freeMembers": len(free)}
+    return result
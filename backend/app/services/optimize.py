@@ -1,139 +1,405 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Callable
 import json
+import threading
+import time
+import numpy as np
 from ortools.sat.python import cp_model
+from ..config import available_cpus, get_settings
+from .coefficients import config_pair_coefficients, rank_coefficient
+from .presolve import presolve
+from .feasibility import check_feasibility, explain_infeasibility
+from .heuristic import solve_heuristic
+from .scoring import ScoringContext, soft_scores
 
 
-def run_optimization(members: Dict[str, Any], config_json: str, time_limit_sec: int = 300) -> Dict[str, Any]:
-    config = json.loads(config_json or "{}")
+ENGINES = ("cpsat", "heuristic", "hybrid")
+# Hybrid runs give the heuristic 10% of the time limit, at most this many seconds
+HYBRID_HEURISTIC_SEC = 2.0
+
+
+def score_assignment(
+    member_list: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    room_of_member: Dict[int, int],
+) -> float:
+    # Objective value of a concrete assignment (member index -> room index), on the
+    # same scale as run_optimization's score. Unassigned members contribute nothing.
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    weights = config.get("weights", {"alpha": 0.2, "beta": 0.1, "gamma": 0.1})
+    pairs = config_pair_coefficients([m["id"] for m in member_list], config)
+    total = sum(c for (i, j), c in pairs.items() if i in room_of_member and room_of_member[i] == room_of_member.get(j))
+    capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    alpha = weights.get("alpha", 0.2)
+    if alpha:
+        total += sum(rank_coefficient(member_list[p], capacities[r], alpha) for p, r in room_of_member.items())
+    beta = weights.get("beta", 0.1)
+    if config.get("allowEmptyBeds", True) and beta:
+        filled = [0] * len(rooms_spec)
+        for r in room_of_member.values():
+            filled[r] += 1
+        total += sum(int(-100 * beta) * (capacities[r] - filled[r]) for r in range(len(rooms_spec)))
+    return total / 100.0
+
+
+def room_classes(rooms_spec: List[Dict[str, Any]], exclude: set[int] | None = None) -> List[List[int]]:
+    # Groups of interchangeable room indices: same capacity and same extra attributes.
+    # id/label never affect the model, so they are ignored. Singleton groups are dropped.
+    exclude = exclude or set()
+    groups: Dict[str, List[int]] = {}
+    for r, room in enumerate(rooms_spec):
+        if r in exclude:
+            continue
+        attrs = {k: v for k, v in room.items() if k not in ("id", "label")}
+        attrs["capacity"] = int(room.get("capacity", 0))
+        key = json.dumps(attrs, sort_keys=True, default=str)
+        groups.setdefault(key, []).append(r)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def add_symmetry_breaking(model: cp_model.CpModel, x: Dict[Tuple[int, int], Any], P: int, classes: List[List[int]]) -> None:
+    # Bin-packing style: within a class, member p may only use the first p + 1 rooms.
+    # Relabelling rooms by their smallest member index turns any assignment into one
+    # that satisfies this, so no optimum is lost and the fixed literals vanish in presolve.
+    for cls in classes:
+        for p in range(min(P, len(cls))):
+            for r in cls[p + 1:]:
+                model.Add(x[p, r] == 0)
+
+
+# CP-SAT parameter sets selectable by name. "lns" keeps one full-search worker and
+# gives every other thread to neighborhood search; "lnsOnly" runs nothing but LNS,
+# which suits big models started from a hint (warm start or hybrid engine).
+SOLVER_PRESETS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "lns": {"num_full_subsolvers": 1, "diversify_lns_params": True},
+    "lnsOnly": {"use_lns_only": True},
+}
+
+
+def solver_settings(params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Fill in defaults for the solver parameters a caller may set.
+
+    Keys: workers (CP-SAT threads; default SOLVER_WORKERS or the cgroup CPU quota),
+    relativeGap, absoluteGap (score units), noImprovementSec (stop once the best
+    solution has not improved for that long), seed and preset (see SOLVER_PRESETS).
+    Unset limits stay None. The returned dict is what gets stored with a solution.
+    """
+    params = dict(params or {})
+    preset = params.get("preset") or "default"
+    if preset not in SOLVER_PRESETS:
+        raise ValueError(f"Unknown solver preset {preset!r}")
+    workers = params.get("workers") or get_settings().solver_workers or available_cpus()
+    return {
+        "workers": int(workers),
+        "relativeGap": params.get("relativeGap"),
+        "absoluteGap": params.get("absoluteGap"),
+        "noImprovementSec": params.get("noImprovementSec"),
+        "seed": params.get("seed"),
+        "preset": preset,
+    }
+
+
+class _ProgressCallback(cp_model.CpSolverSolutionCallback):
+    # Reports every incumbent; scores use the same /100 scale as the final score.
+    # Also notes when the last one arrived, for the no-improvement stop.
+    def __init__(self, on_progress: Callable[[Dict[str, Any]], None] | None) -> None:
+        super().__init__()
+        self._on_progress = on_progress
+        self.last_improvement: float | None = None
+
+    def OnSolutionCallback(self) -> None:
+        self.last_improvement = time.perf_counter()
+        if self._on_progress is None:
+            return
+        score = self.ObjectiveValue() / 100.0
+        bound = self.BestObjectiveBound() / 100.0
+        self._on_progress({
+            "score": score,
+            "bound": bound,
+            "gap": abs(bound - score) / max(1.0, abs(score)),
+            "elapsedMs": int(1000 * self.WallTime()),
+        })
+
+
+def _watch(
+    solver: cp_model.CpSolver,
+    done: threading.Event,
+    cancel_event: Any,
+    callback: _ProgressCallback | None,
+    stall_sec: float | None,
+) -> None:
+    # cancel_event may be a multiprocessing proxy, so poll instead of waiting on it
+    while not done.wait(0.2):
+        if cancel_event is not None and cancel_event.is_set():
+            solver.StopSearch()
+            return
+        last = callback.last_improvement if callback is not None else None
+        if stall_sec is not None and last is not None and time.perf_counter() - last >= stall_sec:
+            solver.StopSearch()
+            return
+
+
+def _unsolved(status: str, rooms: List[Dict[str, Any]], report: Dict[str, Any], runtime_ms: int) -> Dict[str, Any]:
+    return {
+        "status": status,
+        "rooms": rooms,
+        "score": 0.0,
+        "hardViolations": [issue["message"] for issue in report["issues"]],
+        "softScores": {},
+        "runtimeMs": runtime_ms,
+        "infeasibility": report,
+    }
+
+
+def build_model(
+    member_list: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    closed_rooms: set[int] | None = None,
+    symmetry_breaking: bool | None = None,
+) -> Dict[str, Any]:
+    # Builds the CP-SAT model over presolved units. Free units may not enter closed rooms.
     rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
     allow_empty_beds: bool = config.get("allowEmptyBeds", True)
     empty_bed_budget: int | None = config.get("emptyBedBudget")
     weights = config.get("weights", {"alpha": 0.2, "beta": 0.1, "gamma": 0.1})
-    pairwiseW: Dict[str, Dict[str, float]] = config.get("pairwiseW", {})
+    if symmetry_breaking is None:
+        symmetry_breaking = bool(config.get("symmetryBreaking", False))
     hard = config.get("hard", {})
-
-    member_list: List[Dict[str, Any]] = members.get("members", [])
-    P = len(member_list)
     R = len(rooms_spec)
 
-    id_to_idx = {m["id"]: idx for idx, m in enumerate(member_list)}
+    # Objective: pairwise terms, only for pairs with a nonzero weight
+    pairs = config_pair_coefficients([m["id"] for m in member_list], config)
+
+    # Collapse mustTogether groups into units and take pinned units out of the model
+    pre = presolve([m["id"] for m in member_list], rooms_spec, hard, pairs)
+    sizes: List[int] = pre["sizes"]
+    free: List[int] = pre["free"]
+    U = len(free)
 
     model = cp_model.CpModel()
 
-    # Variables: x[p,r]
+    # Variables: x[u,r] for free units only
     x = {}
-    for p in range(P):
+    for u in range(U):
         for r in range(R):
-            x[p, r] = model.NewBoolVar(f"x_{p}_{r}")
+            x[u, r] = model.NewBoolVar(f"x_{u}_{r}")
+
+    # Constraint: exactly one room per unit
+    for u in range(U):
+        model.Add(sum(x[u, r] for r in range(R)) == 1)
+
+    # Rooms a unit cannot use (too small, closed, or holding someone it must avoid)
+    for u, r in pre["forbidden"]:
+        model.Add(x[u, r] == 0)
+    for r in closed_rooms or ():
+        for u in range(U):
+            model.Add(x[u, r] == 0)
 
-    # Constraint: exactly one room per person
-    for p in range(P):
-        model.Add(sum(x[p, r] for r in range(R)) == 1)
+    # Contradictory pins / pairs make the model infeasible, as before presolve
+    if pre["conflicts"]:
+        model.AddBoolOr([])
 
-    # Room capacity
+    # Room capacity, counting members pinned there
     capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    room_load: List[int] = pre["roomLoad"]
+    filled = [sum(sizes[free[u]] * x[u, r] for u in range(U)) + room_load[r] for r in range(R)]
     if allow_empty_beds:
         for r in range(R):
-            model.Add(sum(x[p, r] for p in range(P)) <= capacities[r])
+            model.Add(filled[r] <= capacities[r])
         if empty_bed_budget is not None:
-            total_assigned = sum(x[p, r] for p in range(P) for r in range(R))
+            total_assigned = sum(filled)
             total_capacity = sum(capacities)
             # total empty = total_capacity - total_assigned
             # Enforce budget: total_empty <= budget => total_assigned >= total_capacity - budget
             model.Add(total_assigned >= total_capacity - empty_bed_budget)
     else:
         for r in range(R):
-            model.Add(sum(x[p, r] for p in range(P)) == capacities[r])
-
-    # Hard constraints: mustApart/mutualDislikePairs
-    def idx_of(member_id: str) -> int | None:
-        return id_to_idx.get(member_id)
-
-    for pair_list_key in ("mustApartPairs", "mutualDislikePairs"):
-        for pair in hard.get(pair_list_key, []):
-            if len(pair) != 2:
-                continue
-            i = idx_of(pair[0])
-            j = idx_of(pair[1])
-            if i is None or j is None:
-                continue
-            for r in range(R):
-                model.Add(x[i, r] + x[j, r] <= 1)
-
-    # MustTogether
-    for pair in hard.get("mustTogetherPairs", []):
-        if len(pair) != 2:
-            continue
-        i = idx_of(pair[0])
-        j = idx_of(pair[1])
-        if i is None or j is None:
-            continue
+            model.Add(filled[r] == capacities[r])
+
+    # Hard constraints: mustApart/mutualDislikePairs between free units
+    for u, v in pre["apart"]:
         for r in range(R):
-            # x[i,r] == x[j,r] across all r ensures they are in the same room
-            model.Add(x[i, r] == x[j, r])
+            model.Add(x[u, r] + x[v, r] <= 1)
 
-    # Fixed room assignments: member_id -> room_id
-    room_id_to_idx = {room.get("id"): idx for idx, room in enumerate(rooms_spec)}
-    for mid, rid in hard.get("fixedRoomAssignments", {}).items():
-        i = idx_of(mid)
-        r = room_id_to_idx.get(rid)
-        if i is not None and r is not None:
-            # Force assignment
-            model.Add(x[i, r] == 1)
-
-    # Objective: pairwise terms
-    def w(i: int, j: int) -> float:
-        mi = member_list[i]["id"]
-        mj = member_list[j]["id"]
-        wi = pairwiseW.get(mi, {}).get(mj, 0.0)
-        wj = pairwiseW.get(mj, {}).get(mi, 0.0)
-        return wi + wj
-
-    objective_terms: List[cp_model.LinearExpr] = []
-
-    # Both[i,j,r] = AND(x[i,r], x[j,r])
-    for r in range(R):
-        for i in range(P):
-            for j in range(i + 1, P):
-                both = model.NewBoolVar(f"both_{i}_{j}_{r}")
-                model.Add(both <= x[i, r])
-                model.Add(both <= x[j, r])
-                model.Add(both >= x[i, r] + x[j, r] - 1)
-                wij = w(i, j)
-                if wij != 0:
-                    objective_terms.append(int(100 * wij) * both)
+    # Identical rooms are interchangeable unless someone is pinned to one of them
+    fixed_rooms = set(pre["pinned"].values()) | set(closed_rooms or ())
+    classes = room_classes(rooms_spec, exclude=fixed_rooms) if symmetry_breaking else []
+    add_symmetry_breaking(model, x, U, classes)
+
+    # Constant part: pairs inside a unit and between units pinned to the same room
+    pair_terms: List[cp_model.LinearExpr] = [pre["constant"]]
+
+    # Both[u,v,r] = AND(x[u,r], x[v,r]). Since we maximize, a positive weight only
+    # needs the upper bounds and a negative weight only needs the lower bound.
+    both = {}
+    for (u, v), c in pre["pairs"].items():
+        for r in range(R):
+            b = model.NewBoolVar(f"both_{u}_{v}_{r}")
+            if c > 0:
+                model.Add(b <= x[u, r])
+                model.Add(b <= x[v, r])
+            else:
+                model.Add(b >= x[u, r] + x[v, r] - 1)
+            both[u, v, r] = b
+            pair_terms.append(c * b)
+
+    # Pairs with a pinned member become linear terms on the free unit
+    for (u, r), c in pre["linear"].items():
+        pair_terms.append(c * x[u, r])
+
+    built = {
+        "model": model,
+        "x": x,
+        "both": both,
+        "pre": pre,
+        "pairObjective": sum(pair_terms),
+        "filled": filled,
+        "capacities": capacities,
+        "classes": classes,
+        "rooms": R,
+    }
+    built["objective"] = weighted_objective(built, member_list, config, weights)
+    model.Maximize(built["objective"])
+    return built
+
+
+def weighted_objective(
+    built: Dict[str, Any],
+    member_list: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    weights: Dict[str, float],
+) -> cp_model.LinearExpr:
+    # Pair terms plus the alpha/beta parts. Only these depend on the weights, so a
+    # built model can be re-targeted with model.Maximize(weighted_objective(...)).
+    pre, x = built["pre"], built["x"]
+    units: List[List[int]] = pre["units"]
+    free_pos = {g: u for u, g in enumerate(pre["free"])}
+    capacities: List[int] = built["capacities"]
+    objective_terms: List[cp_model.LinearExpr] = [built["pairObjective"]]
 
     # Size rank bonus
     # Expect config to include a map room_id -> size (capacity)
     rank_bonus = weights.get("alpha", 0.2)
     if rank_bonus:
-        for r, room in enumerate(rooms_spec):
-            cap = int(room.get("capacity", 0))
-            for p, m in enumerate(member_list):
-                rank = m.get("rankedRoomSizes", {}).get(str(cap))
-                if rank is not None:
-                    # Smaller rank better; convert to positive bonus via inverse
-                    bonus = max(0, 5 - int(rank))  # crude mapping
-                    if bonus:
-                        objective_terms.append(int(100 * rank_bonus * bonus) * x[p, r])
+        for g, group in enumerate(units):
+            coef_by_cap: Dict[int, int] = {}
+            for r, cap in enumerate(capacities):
+                if g not in free_pos and pre["pinned"][g] != r:
+                    continue
+                if cap not in coef_by_cap:
+                    coef_by_cap[cap] = sum(rank_coefficient(member_list[p], cap, rank_bonus) for p in group)
+                coef = coef_by_cap[cap]
+                if coef:
+                    objective_terms.append(coef * x[free_pos[g], r] if g in free_pos else coef)
 
     # Empty bed penalty (encourage filling rooms if allowed)
     beta = weights.get("beta", 0.1)
-    if allow_empty_beds and beta:
-        for r in range(R):
-            filled = sum(x[p, r] for p in range(P))
-            empty = capacities[r] - filled
+    if config.get("allowEmptyBeds", True) and beta:
+        for r, cap in enumerate(capacities):
+            empty = cap - built["filled"][r]
             # Penalty => subtract from objective
             objective_terms.append(int(-100 * beta) * empty)
 
-    model.Maximize(sum(objective_terms))
+    return sum(objective_terms)
 
+
+def solve_model(
+    model: cp_model.CpModel,
+    time_limit_sec: float,
+    on_progress: Callable[[Dict[str, Any]], None] | None = None,
+    cancel_event: Any = None,
+    params: Dict[str, Any] | None = None,
+) -> Tuple[cp_model.CpSolver, int]:
+    # params as returned by solver_settings; missing keys keep CP-SAT's defaults
+    params = params if params is not None else solver_settings()
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = float(time_limit_sec)
-    solver.parameters.num_search_workers = 8
+    solver.parameters.num_search_workers = int(params.get("workers") or available_cpus())
+    if params.get("relativeGap") is not None:
+        solver.parameters.relative_gap_limit = float(params["relativeGap"])
+    if params.get("absoluteGap") is not None:
+        # The objective is on the x100 integer scale
+        solver.parameters.absolute_gap_limit = 100.0 * float(params["absoluteGap"])
+    if params.get("seed") is not None:
+        solver.parameters.random_seed = int(params["seed"])
+    for name, value in SOLVER_PRESETS[params.get("preset") or "default"].items():
+        setattr(solver.parameters, name, value)
+
+    stall_sec = params.get("noImprovementSec")
+    callback = _ProgressCallback(on_progress) if on_progress or stall_sec else None
+    done = threading.Event()
+    if cancel_event is not None or stall_sec:
+        threading.Thread(target=_watch, args=(solver, done, cancel_event, callback, stall_sec), daemon=True).start()
+    try:
+        status = solver.Solve(model, callback)
+    finally:
+        done.set()
+    return solver, status
+
+
+def _add_assignment_hint(built: Dict[str, Any], room_of_member: Dict[int, int]) -> None:
+    # Hint every free unit into the room its first member held, plus the matching
+    # co-location literals, so CP-SAT starts from a complete assignment.
+    model, x, pre = built["model"], built["x"], built["pre"]
+    hinted: Dict[int, int] = {}
+    for u, g in enumerate(pre["free"]):
+        r0 = room_of_member.get(pre["units"][g][0])
+        if r0 is None:
+            continue
+        hinted[u] = r0
+        for r in range(built["rooms"]):
+            model.AddHint(x[u, r], r == r0)
+    for (u, v, r), b in built["both"].items():
+        if u in hinted and v in hinted:
+            model.AddHint(b, hinted[u] == r and hinted[v] == r)
 
-    status = solver.Solve(model)
+
+def run_optimization(
+    members: Dict[str, Any],
+    config_json: str | Dict[str, Any],
+    time_limit_sec: float = 300,
+    on_progress: Callable[[Dict[str, Any]], None] | None = None,
+    cancel_event: Any = None,
+    base_assignment: Dict[str, str] | None = None,
+    locked_room_ids: List[str] | None = None,
+    minimize_moves: bool = False,
+    engine: str = "cpsat",
+    solver_params: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Solve the room assignment.
+
+    With ``base_assignment`` (member id -> room id, e.g. from a stored Solution) the
+    search is warm-started from it. Members of ``locked_room_ids`` stay where they
+    are and nobody else may enter those rooms. ``minimize_moves`` runs a second
+    phase that keeps the best score found and minimizes members moved off their
+    base room.
+
+    ``engine`` picks the search: "cpsat" (exact model), "heuristic" (greedy plus
+    local search, for previews and cohorts too large for the model) or "hybrid"
+    (the heuristic's answer as the CP-SAT hint). ``solver_params`` is described in
+    solver_settings; the settings actually used come back as "solverParams".
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}")
+    params = solver_settings(solver_params)
+    used = {"engine": engine, "timeLimitSec": time_limit_sec, **params}
+
+    # Every incumbent, for the run's telemetry; still forwarded to the caller
+    curve: List[List[float]] = []
+
+    def track(event: Dict[str, Any]) -> None:
+        curve.append([event["elapsedMs"], event["score"], event["bound"]])
+        if on_progress is not None:
+            on_progress(event)
+
+    config = json.loads(config_json or "{}") if isinstance(config_json, str) else config_json
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+
+    member_list: List[Dict[str, Any]] = members.get("members", [])
+    P = len(member_list)
+    R = len(rooms_spec)
+    room_id_to_idx = {room.get("id"): idx for idx, room in enumerate(rooms_spec)}
 
     assigned_rooms: List[Dict[str, Any]] = [
         {
@@ -145,10 +411,176 @@ def run_optimization(members: Dict[str, Any], config_json: str, time_limit_sec:
         for room in rooms_spec
     ]
 
-    for p, m in enumerate(member_list):
+    # Base room per member index; locked rooms pin their occupants and close the room
+    base_room: Dict[int, int] = {}
+    closed_rooms: set[int] = set()
+    if base_assignment:
+        for p, m in enumerate(member_list):
+            r = room_id_to_idx.get(base_assignment.get(m["id"]))
+            if r is not None:
+                base_room[p] = r
+        closed_rooms = {room_id_to_idx[rid] for rid in locked_room_ids or [] if rid in room_id_to_idx}
+        if closed_rooms:
+            hard = dict(config.get("hard", {}))
+            fixed = dict(hard.get("fixedRoomAssignments", {}))
+            for p, r in base_room.items():
+                if r in closed_rooms:
+                    fixed[member_list[p]["id"]] = rooms_spec[r].get("id")
+            hard["fixedRoomAssignments"] = fixed
+            config = {**config, "hard": hard}
+
+    # Cheap structural checks first: no point spending the time limit on a lost cause
+    report = check_feasibility(members, config)
+    if not report["feasible"]:
+        return _unsolved("INFEASIBLE", assigned_rooms, report, report["elapsedMs"])
+
+    # The CP-SAT hint: the base solution, or in hybrid mode the heuristic's answer
+    hint_room = base_room
+    heuristic: Dict[str, Any] | None = None
+    heuristic_ms = 0
+    if engine in ("heuristic", "hybrid"):
+        started = time.perf_counter()
+        budget = float(time_limit_sec) if engine == "heuristic" else min(HYBRID_HEURISTIC_SEC, 0.1 * time_limit_sec)
+        heuristic = solve_heuristic(
+            member_list, config, closed_rooms, base_room, time_limit_sec=budget, seed=params["seed"] or 0
+        )
+        heuristic_ms = int(1000 * (time.perf_counter() - started))
+        if engine == "heuristic":
+            if heuristic is None:
+                report["issues"] = [{
+                    "code": "noSolution",
+                    "message": "The heuristic could not place everyone without breaking a hard constraint",
+                    "members": [],
+                    "rooms": [],
+                }]
+                return _unsolved("UNKNOWN", assigned_rooms, report, heuristic_ms)
+            model_stats = {"engine": "heuristic", "members": P, "rooms": R, **heuristic["stats"]}
+            result = _assemble_result(
+                "FEASIBLE", member_list, config, assigned_rooms, heuristic["pre"], heuristic["roomOfUnit"],
+                heuristic["objective"], heuristic_ms, model_stats, base_assignment, used,
+            )
+            result["telemetry"] = {"curve": [], "timeToBestMs": heuristic_ms, "bound": None}
+            return result
+        if heuristic is not None:
+            unit_of_h = heuristic["pre"]["unitOf"]
+            room_of_unit_h = heuristic["roomOfUnit"]
+            hint_room = {p: room_of_unit_h[unit_of_h[p]] for p in range(P) if unit_of_h[p] in room_of_unit_h}
+
+    # Symmetry breaking would fight the hint and the move count, which name concrete rooms
+    built = build_model(
+        member_list,
+        config,
+        closed_rooms=closed_rooms,
+        symmetry_breaking=False if hint_room else None,
+    )
+    model, x, pre = built["model"], built["x"], built["pre"]
+    free: List[int] = pre["free"]
+    if hint_room:
+        _add_assignment_hint(built, hint_room)
+    time_limit_sec = max(1.0, time_limit_sec - heuristic_ms / 1000.0) if heuristic_ms else time_limit_sec
+
+    # Leave room for the move-minimizing phase
+    phase1_limit = 0.6 * time_limit_sec if minimize_moves and base_room else float(time_limit_sec)
+    solver, status = solve_model(model, phase1_limit, track, cancel_event, params)
+    runtime_ms = heuristic_ms + int(1000 * solver.WallTime())
+
+    if status == cp_model.INFEASIBLE:
+        # The quick checks passed, so ask CP-SAT which constraints clash
+        report["feasible"] = False
+        report["issues"] = explain_infeasibility(members, config, time_limit_sec=min(10.0, float(time_limit_sec))) or [{
+            "code": "infeasible",
+            "message": "The hard constraints cannot all be satisfied",
+            "members": [],
+            "rooms": [],
+        }]
+        return _unsolved("INFEASIBLE", assigned_rooms, report, runtime_ms)
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    if heuristic is not None and (not solved or int(solver.ObjectiveValue()) < heuristic["objective"]):
+        # CP-SAT can lose the hint in presolve on big models; never return less than it was given
+        model_stats = {"engine": engine, "members": P, "rooms": R, "keptHeuristic": True, **heuristic["stats"]}
+        result = _assemble_result(
+            "FEASIBLE", member_list, config, assigned_rooms, heuristic["pre"], heuristic["roomOfUnit"],
+            heuristic["objective"], runtime_ms, model_stats, base_assignment, used,
+        )
+        result["telemetry"] = {"curve": curve, "timeToBestMs": heuristic_ms, "bound": None}
+        return result
+    if not solved:
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        report["issues"] = [{
+            "code": "cancelled" if cancelled else "noSolution",
+            "message": "Search cancelled before a solution was found" if cancelled else f"No feasible assignment found within {time_limit_sec}s",
+            "members": [],
+            "rooms": [],
+        }]
+        return _unsolved(solver.StatusName(status), assigned_rooms, report, runtime_ms)
+
+    score_value = int(solver.ObjectiveValue())
+    values = {key: solver.BooleanValue(var) for key, var in x.items()}
+
+    cancelled = cancel_event is not None and cancel_event.is_set()
+    if minimize_moves and base_room and not cancelled:
+        # Phase 2: keep the score, move as few members off their base room as possible
+        unit_of: List[int] = pre["unitOf"]
+        free_pos = {g: u for u, g in enumerate(free)}
+        stays = [x[free_pos[unit_of[p]], r] for p, r in base_room.items() if unit_of[p] in free_pos]
+        model.Add(built["objective"] >= score_value)
+        model.Minimize(len(stays) - sum(stays))
+        model.ClearHints()
+        for key, var in x.items():
+            model.AddHint(var, values[key])
+        solver2, status2 = solve_model(model, max(1.0, time_limit_sec - solver.WallTime()), None, cancel_event, params)
+        runtime_ms += int(1000 * solver2.WallTime())
+        if status2 in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            score_value = int(solver2.Value(built["objective"]))
+            values = {key: solver2.BooleanValue(var) for key, var in x.items()}
+
+    room_of_unit: Dict[int, int] = dict(pre["pinned"])
+    for u, g in enumerate(free):
         for r in range(R):
-            if solver.BooleanValue(x[p, r]):
-                assigned_rooms[r]["members"].append(m)
+            if values[u, r]:
+                room_of_unit[g] = r
+    model_stats = {
+        "engine": engine,
+        "members": P,
+        "rooms": R,
+        "pairs": len(pre["pairs"]),
+        "roomClasses": len(built["classes"]),
+        "variables": len(model.Proto().variables),
+        "constraints": len(model.Proto().constraints),
+    }
+    result = _assemble_result(
+        solver.StatusName(status), member_list, config, assigned_rooms, pre, room_of_unit,
+        score_value, runtime_ms, model_stats, base_assignment, used,
+    )
+    result["telemetry"] = {
+        "curve": curve,
+        "timeToBestMs": heuristic_ms + (int(curve[-1][0]) if curve else int(1000 * solver.WallTime())),
+        "bound": solver.BestObjectiveBound() / 100.0,
+    }
+    return result
+
+
+def _assemble_result(
+    status: str,
+    member_list: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    assigned_rooms: List[Dict[str, Any]],
+    pre: Dict[str, Any],
+    room_of_unit: Dict[int, int],
+    score_value: int,
+    runtime_ms: int,
+    model_stats: Dict[str, Any],
+    base_assignment: Dict[str, str] | None,
+    solver_params: Dict[str, Any],
+) -> Dict[str, Any]:
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    unit_of = pre["unitOf"]
+    room_of = np.full(len(member_list), -1, dtype=np.int64)
+    for p, m in enumerate(member_list):
+        r = room_of_unit.get(unit_of[p])
+        if r is not None:
+            assigned_rooms[r]["members"].append(m)
+            room_of[p] = r
 
     # Basic hard violation reporting (post-hoc)
     hard_violations: List[str] = []
@@ -157,12 +589,22 @@ def run_optimization(members: Dict[str, Any], config_json: str, time_limit_sec:
         if len(room["members"]) > room["capacity"]:
             hard_violations.append(f"Room {room['label']} over capacity")
 
-    score = solver.ObjectiveValue() / 100.0
-
-    return {
+    result = {
+        "status": status,
         "rooms": assigned_rooms,
-        "score": score,
+        "score": score_value / 100.0,
         "hardViolations": hard_violations,
-        "softScores": {},
-        "runtimeMs": int(1000 * solver.WallTime()),
+        "softScores": soft_scores(ScoringContext(member_list, config, [r["capacity"] for r in assigned_rooms]), room_of),
+        "runtimeMs": runtime_ms,
+        "modelStats": model_stats,
+        "presolve": pre["stats"],
+        "solverParams": solver_params,
     }
+    if base_assignment:
+        result["moved"] = sum(
+            1 for p, m in enumerate(member_list)
+            if base_assignment.get(m["id"]) is not None
+            and room_of_unit.get(unit_of[p]) is not None
+            and rooms_spec[room_of_unit[unit_of[p]]].get("id") != base_assignment[m["id"]]
+        )
+    return result
@@ -1,7 +1,11 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator
+import numpy as np
 import pandas as pd
 import re
+from .resolve import resolve_requests
+
+CSV_CHUNK_ROWS = 10_000
 
 
 def _title_case_name(name: str) -> str:
@@ -34,6 +38,45 @@ def _coerce_int(value: Any, default: int | None = None) -> int | None:
         return default
 
 
+def _text(df: pd.DataFrame, col: str | None) -> pd.Series:
+    # str() of every cell, like row.get(col, "") did; a missing column reads as ""
+    if col is None or col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(str)
+
+
+def _title_case(s: pd.Series) -> pd.Series:
+    # Vectorized _title_case_name: collapse whitespace, capitalize each word. Request
+    # columns repeat the same names, so only distinct values are normalized.
+    codes, uniques = pd.factorize(s)
+    normalized = (
+        pd.Series(uniques, dtype=object)
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.replace(r"\S+", lambda m: m.group(0).capitalize(), regex=True)
+    )
+    return pd.Series(normalized.to_numpy()[codes], index=s.index, dtype=object)
+
+
+def _split_multi_lists(s: pd.Series) -> Dict[Any, List[str]]:
+    # Vectorized _split_multi; rows without any entry are absent from the result
+    parts = s.str.split(r"[;,\n]", regex=True).explode()
+    parts = parts[parts.notna() & (parts.str.strip() != "")]
+    lists: Dict[Any, List[str]] = {}
+    for row, name in zip(parts.index.tolist(), _title_case(parts).tolist()):
+        names = lists.setdefault(row, [])
+        if name not in names:
+            names.append(name)
+    return lists
+
+
+def _coerce_ints(s: pd.Series, default: int | None = None) -> List[int | None]:
+    # _coerce_int over the distinct values only; columns like ranks have a handful
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    lookup = np.array([_coerce_int(u, default) for u in uniques] + [default], dtype=object)
+    return lookup[codes].tolist()
+
+
 def preprocess_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     # Normalize columns using best-effort matching
     cols = {c.lower().strip(): c for c in df.columns}
@@ -59,54 +102,68 @@ def preprocess_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     rank3_col = pick("3p rank", "rank 3")
     rank4_col = pick("4p rank", "rank 4")
 
-    members: List[Dict[str, Any]] = []
+    name_raw = _text(df, name_col).str.strip()
+    df = df.loc[(name_raw != "").to_numpy()]
+    if df.empty:
+        return {"members": []}
+    df = df.reset_index(drop=True)
+    names = _title_case(name_raw[name_raw != ""].reset_index(drop=True))
+    member_ids = names.str.lower().str.replace(r"[^a-z0-9]", "", regex=True)
+
+    requested = _split_multi_lists(_text(df, req_col)) if req_col else {}
+    avoid_with = _split_multi_lists(_text(df, dislike_col)) if dislike_col else {}
+    ranks = [
+        (size, _coerce_ints(df[col]))
+        for size, col in (("2", rank2_col), ("3", rank3_col), ("4", rank4_col))
+        if col
+    ]
 
-    for _, row in df.iterrows():
-        name_raw = str(row.get(name_col, "")).strip()
-        if not name_raw:
-            continue
-        name = _title_case_name(name_raw)
-        member_id = re.sub(r"[^a-z0-9]", "", name.lower())
-        requested = _split_multi(str(row.get(req_col, ""))) if req_col else []
-        avoid_with = _split_multi(str(row.get(dislike_col, ""))) if dislike_col else []
-        ranked_sizes = {}
-        r2 = _coerce_int(row.get(rank2_col)) if rank2_col else None
-        r3 = _coerce_int(row.get(rank3_col)) if rank3_col else None
-        r4 = _coerce_int(row.get(rank4_col)) if rank4_col else None
-        if r2 is not None:
-            ranked_sizes["2"] = r2
-        if r3 is not None:
-            ranked_sizes["3"] = r3
-        if r4 is not None:
-            ranked_sizes["4"] = r4
-
-        attributes = {}
-        if year_col:
-            attributes["year"] = str(row.get(year_col, "")).strip()
-        if messiness_col:
-            attributes["messiness"] = _coerce_int(row.get(messiness_col), default=3) or 3
-        if bother_col:
-            attributes["bother"] = str(row.get(bother_col, "")).strip()
-        if sleep_col:
-            attributes["sleep"] = str(row.get(sleep_col, "")).strip().title()
-        if temp_col:
-            attributes["temperature"] = str(row.get(temp_col, "")).strip().title()
-        if room_use_col:
-            attributes["room_use"] = str(row.get(room_use_col, "")).strip().title()
-        if enforce_col:
-            val = str(row.get(enforce_col, "")).strip().lower()
-            attributes["enforce"] = val in ("yes", "true", "1")
+    # Attribute columns in the order the per-row code inserted them
+    attr_columns: List[tuple[str, list]] = []
+    if year_col:
+        attr_columns.append(("year", _text(df, year_col).str.strip().tolist()))
+    if messiness_col:
+        attr_columns.append(("messiness", [v or 3 for v in _coerce_ints(df[messiness_col], default=3)]))
+    if bother_col:
+        attr_columns.append(("bother", _text(df, bother_col).str.strip().tolist()))
+    if sleep_col:
+        attr_columns.append(("sleep", _text(df, sleep_col).str.strip().str.title().tolist()))
+    if temp_col:
+        attr_columns.append(("temperature", _text(df, temp_col).str.strip().str.title().tolist()))
+    if room_use_col:
+        attr_columns.append(("room_use", _text(df, room_use_col).str.strip().str.title().tolist()))
+    if enforce_col:
+        enforce = _text(df, enforce_col).str.strip().str.lower().isin(("yes", "true", "1"))
+        attr_columns.append(("enforce", enforce.tolist()))
 
+    members: List[Dict[str, Any]] = []
+    for i, (member_id, name) in enumerate(zip(member_ids.tolist(), names.tolist())):
+        attributes = {key: values[i] for key, values in attr_columns}
         members.append(
             {
                 "id": member_id,
                 "name": name,
                 "year": attributes.get("year"),
                 "attributes": attributes,
-                "rankedRoomSizes": ranked_sizes,
-                "requestedWith": requested,
-                "avoidWith": avoid_with,
+                "rankedRoomSizes": {size: values[i] for size, values in ranks if values[i] is not None},
+                "requestedWith": requested.get(i, []),
+                "avoidWith": avoid_with.get(i, []),
             }
         )
 
     return {"members": members}
+
+
+def iter_csv_chunks(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    # Every column as text with blanks kept as "": no per-chunk dtype inference, ranks
+    # stay "2" instead of turning into 2.0 next to a blank, and empty cells never read as "nan"
+    with pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def preprocess_csv(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Dict[str, Any]:
+    members: List[Dict[str, Any]] = []
+    for chunk in iter_csv_chunks(path, chunk_rows):
+        members.extend(preprocess_dataframe(chunk)["members"])
+    # Requests can name anyone in the file, so ids are resolved once every chunk is in
+    return resolve_requests({"members": members})
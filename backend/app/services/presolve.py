@@ -0,0 +1,184 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+
+
+class UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Keep the smaller index as root so unit order follows member order
+            if rj < ri:
+                ri, rj = rj, ri
+            self.parent[rj] = ri
+
+
+def index_pairs(pair_lists: List[List[str]], id_to_idx: Dict[str, int]) -> List[Tuple[int, int]]:
+    out: List[Tuple[int, int]] = []
+    for pair in pair_lists:
+        if len(pair) != 2:
+            continue
+        i, j = id_to_idx.get(pair[0]), id_to_idx.get(pair[1])
+        if i is None or j is None:
+            continue
+        out.append((i, j))
+    return out
+
+
+def presolve(
+    member_ids: List[str],
+    rooms_spec: List[Dict[str, Any]],
+    hard: Dict[str, Any],
+    pairs: Dict[Tuple[int, int], int],
+) -> Dict[str, Any]:
+    """Contract must-together groups into units and take pinned units out of the model.
+
+    Returns the units (member indices, in member order) with their sizes, the room
+    each pinned unit occupies, pair coefficients between free units, per-(unit, room)
+    linear coefficients coming from pinned partners, mustApart pairs between free
+    units, rooms each free unit may not use, the pinned load per room, the objective
+    constant and reduction stats. Contradictions are listed in "conflicts" as
+    {"code", "message", "members", "rooms"} records.
+    """
+    P, R = len(member_ids), len(rooms_spec)
+    id_to_idx = {mid: idx for idx, mid in enumerate(member_ids)}
+    room_id_to_idx = {room.get("id"): idx for idx, room in enumerate(rooms_spec)}
+    capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    conflicts: List[Dict[str, Any]] = []
+
+    together = index_pairs(hard.get("mustTogetherPairs", []), id_to_idx)
+    uf = UnionFind(P)
+    for i, j in together:
+        uf.union(i, j)
+
+    root_to_unit: Dict[int, int] = {}
+    units: List[List[int]] = []
+    unit_of = [0] * P
+    for p in range(P):
+        root = uf.find(p)
+        if root not in root_to_unit:
+            root_to_unit[root] = len(units)
+            units.append([])
+        u = root_to_unit[root]
+        units[u].append(p)
+        unit_of[p] = u
+    sizes = [len(g) for g in units]
+
+    # A pin on any member pins its whole unit
+    pinned: Dict[int, int] = {}
+    for mid, rid in hard.get("fixedRoomAssignments", {}).items():
+        i, r = id_to_idx.get(mid), room_id_to_idx.get(rid)
+        if i is None or r is None:
+            continue
+        u = unit_of[i]
+        if pinned.get(u, r) != r:
+            conflicts.append({
+                "code": "conflictingPins",
+                "message": f"Member {mid} is pinned to {rid} but its mustTogether group is pinned to {rooms_spec[pinned[u]].get('id')}",
+                "members": [member_ids[p] for p in units[u]],
+                "rooms": [rid, rooms_spec[pinned[u]].get("id")],
+            })
+            continue
+        pinned[u] = r
+
+    room_load = [0] * R
+    for u, r in pinned.items():
+        room_load[r] += sizes[u]
+
+    free = [u for u in range(len(units)) if u not in pinned]
+    free_pos = {u: k for k, u in enumerate(free)}
+
+    forbidden: set[Tuple[int, int]] = set()
+    for k, u in enumerate(free):
+        for r in range(R):
+            if sizes[u] > capacities[r] - room_load[r]:
+                forbidden.add((k, r))
+
+    apart: set[Tuple[int, int]] = set()
+    for key in ("mustApartPairs", "mutualDislikePairs"):
+        for i, j in index_pairs(hard.get(key, []), id_to_idx):
+            u, v = unit_of[i], unit_of[j]
+            if u == v:
+                conflicts.append({
+                    "code": "apartInGroup",
+                    "message": f"{member_ids[i]} and {member_ids[j]} must be apart but are in the same mustTogether group",
+                    "members": [member_ids[i], member_ids[j]],
+                    "rooms": [],
+                })
+            elif u in pinned and v in pinned:
+                if pinned[u] == pinned[v]:
+                    conflicts.append({
+                        "code": "pinnedApart",
+                        "message": f"{member_ids[i]} and {member_ids[j]} must be apart but are pinned to the same room",
+                        "members": [member_ids[i], member_ids[j]],
+                        "rooms": [rooms_spec[pinned[u]].get("id")],
+                    })
+            elif u in pinned:
+                forbidden.add((free_pos[v], pinned[u]))
+            elif v in pinned:
+                forbidden.add((free_pos[u], pinned[v]))
+            else:
+                a, b = free_pos[u], free_pos[v]
+                apart.add((a, b) if a < b else (b, a))
+
+    constant = 0
+    unit_pairs: Dict[Tuple[int, int], int] = {}
+    linear: Dict[Tuple[int, int], int] = {}
+    for (i, j), c in pairs.items():
+        u, v = unit_of[i], unit_of[j]
+        if u == v:
+            constant += c
+        elif u in pinned and v in pinned:
+            if pinned[u] == pinned[v]:
+                constant += c
+        elif u in pinned or v in pinned:
+            fu, r = (v, pinned[u]) if u in pinned else (u, pinned[v])
+            key = (free_pos[fu], r)
+            linear[key] = linear.get(key, 0) + c
+        else:
+            a, b = free_pos[u], free_pos[v]
+            key = (a, b) if a < b else (b, a)
+            unit_pairs[key] = unit_pairs.get(key, 0) + c
+    unit_pairs = {k: c for k, c in unit_pairs.items() if c}
+    linear = {k: c for k, c in linear.items() if c}
+
+    pinned_members = sum(sizes[u] for u in pinned)
+    stats = {
+        "members": P,
+        "units": len(units),
+        "mergedGroups": sum(1 for s in sizes if s > 1),
+        "pinnedMembers": pinned_members,
+        "freeUnits": len(free),
+        "pairsBefore": len(pairs),
+        "pairsAfter": len(unit_pairs),
+        "foldedLinearTerms": len(linear),
+        "assignmentVarsBefore": P * R,
+        "assignmentVarsAfter": len(free) * R,
+    }
+
+    return {
+        "units": units,
+        "sizes": sizes,
+        "unitOf": unit_of,
+        "pinned": pinned,
+        "free": free,
+        "pairs": unit_pairs,
+        "linear": linear,
+        "apart": apart,
+        "forbidden": forbidden,
+        "roomLoad": room_load,
+        "constant": constant,
+        "conflicts": conflicts,
+        "stats": stats,
+    }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+import re
+import numpy as np
+
+# Fuzzy matches need this Dice similarity over name trigrams and must beat the
+# runner-up by MIN_MARGIN, otherwise the name is reported as unresolved
+MIN_SIMILARITY = 0.6
+MIN_MARGIN = 0.1
+
+REQUEST_FIELDS = (("requestedWith", "requestedIds"), ("avoidWith", "avoidIds"))
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    # Case, punctuation and spacing never distinguish two people
+    return " ".join(_PUNCTUATION.sub("", name.casefold()).split())
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Exact and trigram lookup from free-text names to member ids."""
+
+    def __init__(self, members: List[Dict[str, Any]]) -> None:
+        self._exact: Dict[str, List[str]] = {}
+        for m in members:
+            ids = self._exact.setdefault(normalize_name(m.get("name", "")), [])
+            if m["id"] not in ids:
+                ids.append(m["id"])
+        # Single words ("Eve") resolve when exactly one person has that first or last name
+        self._words: Dict[str, List[str]] = {}
+        for key, ids in self._exact.items():
+            parts = key.split()
+            for word in {parts[0], parts[-1]} if parts else ():
+                self._words.setdefault(word, []).extend(ids)
+        self._keys = list(self._exact)
+        self._key_of = {mid: k for k, key in enumerate(self._keys) for mid in self._exact[key]}
+        # Trigram postings are built on the first fuzzy lookup; clean exports never need them
+        self._postings: Dict[str, np.ndarray] | None = None
+        self._gram_counts = np.zeros(0)
+
+    def _build_trigrams(self) -> None:
+        postings: Dict[str, List[int]] = {}
+        counts = []
+        for k, key in enumerate(self._keys):
+            grams = _trigrams(key)
+            counts.append(len(grams))
+            for g in grams:
+                postings.setdefault(g, []).append(k)
+        self._postings = {g: np.asarray(ks, dtype=np.int32) for g, ks in postings.items()}
+        self._gram_counts = np.asarray(counts, dtype=np.float64)
+
+    def lookup(self, name: str, exclude: str | None = None) -> Tuple[str, List[str], float]:
+        # (method, ids, score) with method "exact", "fuzzy" or "unresolved"
+        key = normalize_name(name)
+        ids = [mid for mid in self._exact.get(key, []) if mid != exclude]
+        if ids:
+            return "exact", ids, 1.0
+        if key and " " not in key:
+            ids = [mid for mid in self._words.get(key, []) if mid != exclude]
+            if len(ids) == 1:
+                return "fuzzy", ids, 1.0
+
+        if self._postings is None:
+            self._build_trigrams()
+        grams = _trigrams(key)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return "unresolved", [], 0.0
+        # Dice similarity against every key at once: one bincount over the postings
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._keys))
+        dice = 2 * shared / (len(grams) + self._gram_counts)
+        own = self._key_of.get(exclude) if exclude is not None else None
+        if own is not None and self._exact[self._keys[own]] == [exclude]:
+            dice[own] = 0.0
+        top = np.argpartition(dice, -2)[-2:] if len(dice) > 2 else np.arange(len(dice))
+        top = top[np.argsort(dice[top])[::-1]]
+        best, k = float(dice[top[0]]), int(top[0])
+        if best < MIN_SIMILARITY:
+            return "unresolved", [], best
+        if len(top) > 1 and dice[top[1]] > best - MIN_MARGIN:
+            return "unresolved", [], best
+        return "fuzzy", [mid for mid in self._exact[self._keys[k]] if mid != exclude], best
+
+
+def resolve_requests(members_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach requestedIds / avoidIds to every member and report how names resolved.
+
+    Names are matched exactly (after normalize_name) first, then as a unique first
+    or last name, then by trigram similarity for typos and short forms. Returns a new members document whose
+    "resolution" entry lists the fuzzy matches and the names nobody matched.
+    """
+    members: List[Dict[str, Any]] = members_doc.get("members", [])
+    index = NameIndex(members)
+    name_of = {m["id"]: m.get("name", "") for m in members}
+    counts = {"exact": 0, "fuzzy": 0, "unresolved": 0}
+    fuzzy: List[Dict[str, Any]] = []
+    unresolved: List[Dict[str, Any]] = []
+
+    resolved_members = []
+    for m in members:
+        out = dict(m)
+        for names_key, ids_key in REQUEST_FIELDS:
+            ids: List[str] = []
+            for name in m.get(names_key, []):
+                method, matched, score = index.lookup(name, exclude=m["id"])
+                counts[method] += 1
+                if method == "fuzzy":
+                    fuzzy.append({
+                        "memberId": m["id"], "field": names_key, "name": name,
+                        "matchedId": matched[0], "matchedName": name_of[matched[0]], "score": round(score, 3),
+                    })
+                elif method == "unresolved":
+                    unresolved.append({"memberId": m["id"], "field": names_key, "name": name})
+                ids.extend(mid for mid in matched if mid not in ids)
+            out[ids_key] = ids
+        resolved_members.append(out)
+
+    return {
+        **members_doc,
+        "members": resolved_members,
+        "resolution": {**counts, "fuzzyMatches": fuzzy, "unresolvedNames": unresolved},
+    }
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+import hashlib
+import json
+import threading
+import time
+from ..config import get_settings
+
+_FILE_CHUNK = 1 << 20
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_FILE_CHUNK), b""):
+                h.update(block)
+    except OSError:
+        return f"missing:{path}"
+    return h.hexdigest()
+
+
+def result_key(members: Dict[str, Any], config: Dict[str, Any], params: Dict[str, Any]) -> str:
+    """Canonical hash of everything that determines an optimization result.
+
+    Dicts are serialized with sorted keys, so key order in the stored JSON does not
+    matter. A binary weights file enters by content, not by path, so two configs
+    with the same matrix share entries.
+    """
+    config = dict(config)
+    if config.get("pairwiseFile"):
+        config["pairwiseFile"] = _file_digest(config["pairwiseFile"])
+    h = hashlib.sha256()
+    for part in (members, config, params):
+        h.update(json.dumps(part, sort_keys=True, separators=(",", ":"), default=str).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """LRU of finished results with a maximum age, plus coalescing of in-flight runs.
+
+    Entries are whatever the caller stores (here a solution id, its version and the
+    result summary). ``run`` makes identical concurrent requests wait for the first
+    one instead of solving again.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_sec: float = 3600.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: str) -> Optional[Any]:
+        # Caller holds the lock
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if self._clock() - item[0] > self.ttl_sec:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._fresh(key)
+
+    def _store(self, key: str, value: Any) -> None:
+        # Caller holds the lock
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        valid: Callable[[Any], bool] = lambda _: True,
+        cacheable: Callable[[Any], bool] = lambda _: True,
+    ) -> Tuple[Any, bool]:
+        """Return (value, hit). A stale or invalid entry is dropped and recomputed.
+
+        While ``compute`` runs, other callers with the same key block on its result
+        (and count as hits); an exception reaches all of them. Values for which
+        ``cacheable`` is false are shared with the waiters but not stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            if valid(value):
+                return value, True
+            self.discard(key)
+        with self._lock:
+            # Another caller may have finished the same key in the meantime
+            value = self._fresh(key)
+            if value is not None:
+                return value, True
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                future: Future = Future()
+                self._inflight[key] = future
+        if waiting is not None:
+            return waiting.result(), True
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if cacheable(value):
+                self._store(key, value)
+        future.set_result(value)
+        return value, False
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = ResultCache(settings.result_cache_size, settings.result_cache_ttl_sec)
+        return _cache
@@ -0,0 +1,190 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+import numpy as np
+from .coefficients import pair_coefficient_arrays, pair_coefficient_matrix, rank_coefficient
+from .weights import ATTR_KEYS, _categorical, _request_edges, load_pairwise
+
+# Response keys for the attribute columns
+ATTR_LABELS = {"sleep": "sleep", "temperature": "temperature", "room_use": "roomUse"}
+# Solutions × pairs compared at once; bounds the temporary boolean block
+_PAIR_BLOCK = 1 << 24
+
+
+class ScoringContext:
+    """Everything about a cohort and room layout the breakdown needs, as arrays.
+
+    Built once per (members, config, rooms) and reused for any number of
+    assignments. Pair coefficients are the optimizer's x100 integers, so the
+    objective terms of a breakdown add up to the solution's score. They are only
+    looked up for roommates: a dense matrix for the binary weights format, sorted
+    pair keys for the (usually sparse) dict format.
+    """
+
+    def __init__(self, member_list: List[Dict[str, Any]], config: Dict[str, Any], capacities: List[int]) -> None:
+        self.P = len(member_list)
+        self.capacities = np.asarray(capacities, dtype=np.int64)
+        self.R = len(self.capacities)
+
+        ids = [m["id"] for m in member_list]
+        self.pair_matrix: np.ndarray | None = None
+        if load_pairwise(config) is not None:
+            self.pair_matrix = pair_coefficient_matrix(ids, config)
+        else:
+            i, j, c = pair_coefficient_arrays(ids, config)
+            keys = i.astype(np.int64) * self.P + j
+            order = np.argsort(keys)
+            self.pair_keys, self.pair_vals = keys[order], c[order]
+
+        by_name: Dict[str, List[int]] = {}
+        by_id: Dict[str, List[int]] = {}
+        for p, m in enumerate(member_list):
+            by_name.setdefault(m.get("name", ""), []).append(p)
+            by_id.setdefault(m["id"], []).append(p)
+        self.requests = _request_edges(member_list, "requestedWith", "requestedIds", by_name, by_id)
+        self.avoids = _request_edges(member_list, "avoidWith", "avoidIds", by_name, by_id)
+
+        self.codes = {key: _categorical(member_list, key) for key in ATTR_KEYS}
+        mess = [m.get("attributes", {}).get("messiness") for m in member_list]
+        self.mess_valid = np.array([isinstance(v, int) for v in mess], dtype=bool)
+        self.mess = np.array([v if isinstance(v, int) else 0 for v in mess], dtype=np.int64)
+
+        # Rank bonus per member and distinct room size, then per room through cap_col
+        weights = config.get("weights", {"alpha": 0.2, "beta": 0.1, "gamma": 0.1})
+        alpha = weights.get("alpha", 0.2)
+        caps = sorted(set(self.capacities.tolist()))
+        self.cap_col = np.array([caps.index(c) for c in self.capacities.tolist()], dtype=np.intp)
+        self.rank = np.array(
+            [[rank_coefficient(m, cap, alpha) if alpha else 0 for cap in caps] for m in member_list],
+            dtype=np.int64,
+        ).reshape(self.P, len(caps))
+        beta = weights.get("beta", 0.1)
+        self.bed_penalty = int(-100 * beta) if config.get("allowEmptyBeds", True) and beta else 0
+
+    def room_vector(self, rooms: List[Dict[str, Any]], index_of: Dict[str, int]) -> np.ndarray:
+        # Assignment array (room index per member, -1 unassigned) from a rooms list
+        # in layout order; occupants missing from index_of are ignored
+        out = np.full(self.P, -1, dtype=np.int64)
+        for r, room in enumerate(rooms):
+            for m in room.get("members", []):
+                p = index_of.get(m["id"])
+                if p is not None:
+                    out[p] = r
+        return out
+
+    def coefficients(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # x100 pair coefficient of each (a[k], b[k])
+        if self.pair_matrix is not None:
+            return self.pair_matrix[a, b].astype(np.int64)
+        if not len(self.pair_keys):
+            return np.zeros(len(a), dtype=np.int64)
+        keys = np.minimum(a, b).astype(np.int64) * self.P + np.maximum(a, b)
+        pos = np.searchsorted(self.pair_keys, keys).clip(max=len(self.pair_keys) - 1)
+        return np.where(self.pair_keys[pos] == keys, self.pair_vals[pos], 0)
+
+
+def _roommates(cell: np.ndarray, spare: int, most: int) -> tuple[np.ndarray, np.ndarray]:
+    # Flat positions (x, y) of every two entries sharing a cell, from one sort;
+    # entries in the spare cell are skipped. `most` bounds the occupants per cell.
+    order = np.argsort(cell, kind="stable")
+    sorted_cells = cell[order]
+    xs, ys = [], []
+    for d in range(1, most):
+        same = (sorted_cells[d:] == sorted_cells[:-d]) & (sorted_cells[d:] != spare)
+        xs.append(order[:-d][same])
+        ys.append(order[d:][same])
+    if not xs:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+def _same_room(A: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    a = A[:, i]
+    return (a >= 0) & (a == A[:, j])
+
+
+def _pair_counts(A: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    # Per solution: how many of the (i, j) pairs share a room, in blocks of solutions
+    out = np.zeros(len(A), dtype=np.int64)
+    if not len(i):
+        return out
+    step = max(1, _PAIR_BLOCK // len(i))
+    for s in range(0, len(A), step):
+        out[s:s + step] = _same_room(A[s:s + step], i, j).sum(axis=1)
+    return out
+
+
+def _pairs_within(n: np.ndarray) -> np.ndarray:
+    return n * (n - 1) // 2
+
+
+def soft_scores_many(ctx: ScoringContext, assignments: np.ndarray) -> List[Dict[str, float]]:
+    """Breakdown for each row of an S×P assignment array (room index, -1 unassigned).
+
+    Objective terms (score units): pairwise, rankBonus, emptyBedPenalty; with
+    everyone placed they sum to the optimizer's score. Quality counts:
+    requestsMet/requestsUnmet (directed requests), avoidHits, <attribute>Agree and
+    <attribute>Clash (roommate pairs where both have the attribute), messinessSpread
+    (mean max-min over rooms with two rated occupants) and messinessSpreadMax,
+    emptyBeds and unassigned.
+    """
+    A = np.atleast_2d(np.asarray(assignments, dtype=np.int64))
+    S, R = len(A), ctx.R
+    assigned = A >= 0
+    # Flat (solution, room) cell per member; unassigned members go to a spare cell
+    cell = np.where(assigned, A + R * np.arange(S)[:, None], S * R)
+    counts = np.bincount(cell.ravel(), minlength=S * R + 1)[: S * R].reshape(S, R)
+    free_beds = ctx.capacities[None, :] - counts
+
+    x, y = _roommates(cell.ravel(), S * R, int(counts.max(initial=0)))
+    coef = ctx.coefficients(x % ctx.P, y % ctx.P)
+    # With no rooms nobody is assigned, and cap_col has nothing to index
+    rank = ctx.rank[np.arange(ctx.P), ctx.cap_col[A.clip(0)]] if R else np.zeros_like(A)
+    out: Dict[str, np.ndarray] = {
+        "pairwise": np.bincount(x // ctx.P, weights=coef, minlength=S) / 100.0,
+        "rankBonus": np.where(assigned, rank, 0).sum(axis=1) / 100.0,
+        "emptyBedPenalty": ctx.bed_penalty * free_beds.sum(axis=1) / 100.0,
+    }
+    met = _pair_counts(A, *ctx.requests)
+    out["requestsMet"] = met
+    out["requestsUnmet"] = len(ctx.requests[0]) - met
+    out["avoidHits"] = _pair_counts(A, *ctx.avoids)
+
+    for key, codes in ctx.codes.items():
+        K = int(codes.max()) + 1 if len(codes) else 0
+        rated = assigned & (codes >= 0)[None, :]
+        if not K or not rated.any():
+            out[f"{ATTR_LABELS[key]}Agree"] = out[f"{ATTR_LABELS[key]}Clash"] = np.zeros(S)
+            continue
+        by_value = np.bincount((cell * K + codes[None, :])[rated], minlength=S * R * K).reshape(S, R * K)
+        by_room = np.bincount(cell[rated], minlength=S * R).reshape(S, R)
+        agree = _pairs_within(by_value).sum(axis=1)
+        out[f"{ATTR_LABELS[key]}Agree"] = agree
+        out[f"{ATTR_LABELS[key]}Clash"] = _pairs_within(by_room).sum(axis=1) - agree
+
+    rated = assigned & ctx.mess_valid[None, :]
+    levels = np.broadcast_to(ctx.mess, A.shape)[rated]
+    hi = np.full(S * R, np.iinfo(np.int64).min)
+    lo = np.full(S * R, np.iinfo(np.int64).max)
+    np.maximum.at(hi, cell[rated], levels)
+    np.minimum.at(lo, cell[rated], levels)
+    n_rated = np.bincount(cell[rated], minlength=S * R)
+    spread = np.where(n_rated >= 2, hi - lo, 0).reshape(S, R)
+    rooms_rated = (n_rated >= 2).reshape(S, R).sum(axis=1)
+    out["messinessSpread"] = spread.sum(axis=1) / np.maximum(rooms_rated, 1)
+    out["messinessSpreadMax"] = spread.max(axis=1, initial=0)
+
+    out["emptyBeds"] = np.maximum(free_beds, 0).sum(axis=1)
+    out["unassigned"] = (~assigned).sum(axis=1)
+    return [{k: round(float(v[s]), 4) for k, v in out.items()} for s in range(S)]
+
+
+def soft_scores(ctx: ScoringContext, room_of: np.ndarray) -> Dict[str, float]:
+    return soft_scores_many(ctx, np.asarray(room_of)[None, :])[0]
+
+
+def rooms_soft_scores(
+    member_list: List[Dict[str, Any]], config: Dict[str, Any], rooms: List[Dict[str, Any]]
+) -> Dict[str, float]:
+    # One-off breakdown of a rooms list (layout order, member objects inside)
+    ctx = ScoringContext(member_list, config, [int(room.get("capacity", 0)) for room in rooms])
+    return soft_scores(ctx, ctx.room_vector(rooms, {m["id"]: p for p, m in enumerate(member_list)}))
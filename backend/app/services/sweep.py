@@ -0,0 +1,253 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import multiprocessing as mp
+import random
+import threading
+import time
+from ortools.sat.python import cp_model
+from ..config import get_settings
+from .feasibility import check_feasibility
+from .optimize import build_model, solve_model, solver_settings, weighted_objective
+
+WEIGHT_KEYS = ("alpha", "beta", "gamma")
+
+
+def weight_points(
+    points: List[Dict[str, float]] | None = None,
+    grid: Dict[str, List[float]] | None = None,
+    samples: int = 0,
+    ranges: Dict[str, List[float]] | None = None,
+    seed: int = 0,
+    defaults: Dict[str, float] | None = None,
+) -> List[Dict[str, float]]:
+    # Explicit points, then the grid's cartesian product, then uniform samples in ranges
+    defaults = {"alpha": 0.2, "beta": 0.1, "gamma": 0.1, **(defaults or {})}
+    out = [{**defaults, **p} for p in points or []]
+    if grid:
+        keys = [k for k in WEIGHT_KEYS if k in grid]
+        for values in itertools.product(*(grid[k] for k in keys)):
+            out.append({**defaults, **dict(zip(keys, values))})
+    if samples:
+        rng = random.Random(seed)
+        ranges = ranges or {"alpha": [0.0, 1.0], "beta": [0.0, 1.0]}
+        for _ in range(samples):
+            out.append({**defaults, **{k: round(rng.uniform(*ranges[k]), 3) for k in WEIGHT_KEYS if k in ranges}})
+    return out
+
+
+def _effective(weights: Dict[str, float]) -> Tuple[float, float]:
+    # The model reads alpha and beta only; gamma is carried through untouched
+    return float(weights.get("alpha", 0.0)), float(weights.get("beta", 0.0))
+
+
+def sweep_metrics(
+    member_list: List[Dict[str, Any]],
+    rooms_spec: List[Dict[str, Any]],
+    room_of_member: Dict[int, int],
+) -> Dict[str, float]:
+    """Objective-independent quality of an assignment, for comparing weight vectors.
+
+    requestsMet: share of roommate requests (resolved ids, else exact names) honored.
+    rankSatisfaction: share of members with size ranks placed in their first choice.
+    emptyBeds: beds left empty.
+    """
+    positions: Dict[str, List[int]] = {}
+    for p, m in enumerate(member_list):
+        positions.setdefault(m["id"], []).append(p)
+        positions.setdefault(f"name:{m.get('name', '')}", []).append(p)
+    requests = met = 0
+    for a, m in enumerate(member_list):
+        if "requestedIds" in m:
+            targets = [b for mid in set(m["requestedIds"]) for b in positions.get(mid, ())]
+        else:
+            targets = [b for name in set(m.get("requestedWith", [])) for b in positions.get(f"name:{name}", ())]
+        for b in targets:
+            if b != a:
+                requests += 1
+                met += a in room_of_member and room_of_member[a] == room_of_member.get(b)
+
+    ranked = first = 0
+    capacities = [int(room.get("capacity", 0)) for room in rooms_spec]
+    for p, m in enumerate(member_list):
+        ranks = m.get("rankedRoomSizes") or {}
+        if not ranks:
+            continue
+        ranked += 1
+        best = min(int(v) for v in ranks.values())
+        r = room_of_member.get(p)
+        first += r is not None and ranks.get(str(capacities[r])) is not None and int(ranks[str(capacities[r])]) == best
+
+    filled = [0] * len(rooms_spec)
+    for r in room_of_member.values():
+        filled[r] += 1
+    return {
+        "requestsMet": met / requests if requests else 1.0,
+        "rankSatisfaction": first / ranked if ranked else 1.0,
+        "emptyBeds": float(sum(max(0, c - f) for c, f in zip(capacities, filled))),
+    }
+
+
+def pareto_front(runs: List[Dict[str, Any]]) -> List[int]:
+    # Indices of solved runs no other run beats on every metric (more requests and
+    # rank satisfaction, fewer empty beds) while being strictly better on one
+    solved = [(k, run["metrics"]) for k, run in enumerate(runs) if run.get("metrics")]
+    vectors = [(k, (m["requestsMet"], m["rankSatisfaction"], -m["emptyBeds"])) for k, m in solved]
+    front = []
+    for k, v in vectors:
+        dominated = any(
+            all(o >= s for o, s in zip(other, v)) and any(o > s for o, s in zip(other, v))
+            for _, other in vectors
+        )
+        if not dominated:
+            front.append(k)
+    return front
+
+
+def _sweep_worker(
+    members: Dict[str, Any],
+    config: Dict[str, Any],
+    points: List[Dict[str, float]],
+    time_limit_sec: float,
+    threads: int,
+    cancel_event: Any = None,
+    queue: Any = None,
+    job_id: str = "",
+) -> List[Dict[str, Any]]:
+    # Runs in a pool process: the constraints are built once, then each point only
+    # replaces the objective. Every solve is hinted with the previous point's answer.
+    # Finished points are reported as (job_id, event) on `queue` when one is given.
+    member_list: List[Dict[str, Any]] = members.get("members", [])
+    rooms_spec: List[Dict[str, Any]] = config.get("rooms", [])
+    built = build_model(member_list, config)
+    model, x, pre = built["model"], built["x"], built["pre"]
+    unit_of: List[int] = pre["unitOf"]
+    runs: List[Dict[str, Any]] = []
+    values: Dict[Tuple[int, int], bool] | None = None
+    for weights in points:
+        if cancel_event is not None and cancel_event.is_set():
+            runs.append({"weights": weights, "status": "CANCELLED", "runtimeMs": 0})
+            continue
+        objective = weighted_objective(built, member_list, config, weights)
+        model.Maximize(objective)
+        model.ClearHints()
+        if values is not None:
+            for key, var in x.items():
+                model.AddHint(var, values[key])
+        solver, status = solve_model(
+            model, time_limit_sec, cancel_event=cancel_event, params=solver_settings({"workers": threads})
+        )
+        run: Dict[str, Any] = {
+            "weights": weights,
+            "status": solver.StatusName(status),
+            "runtimeMs": int(1000 * solver.WallTime()),
+        }
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            values = {key: solver.BooleanValue(var) for key, var in x.items()}
+            room_of_unit: Dict[int, int] = dict(pre["pinned"])
+            for u, g in enumerate(pre["free"]):
+                for r in range(built["rooms"]):
+                    if values[u, r]:
+                        room_of_unit[g] = r
+            room_of_member = {p: room_of_unit[unit_of[p]] for p in range(len(member_list)) if unit_of[p] in room_of_unit}
+            run["score"] = solver.ObjectiveValue() / 100.0
+            run["metrics"] = sweep_metrics(member_list, rooms_spec, room_of_member)
+        runs.append(run)
+        if queue is not None:
+            queue.put((job_id, {"type": "progress", **{k: run[k] for k in ("weights", "status", "score") if k in run}}))
+    return runs
+
+
+class CoreBudget:
+    """Counting limit on solver threads shared by every sweep in this process."""
+
+    def __init__(self, cores: int) -> None:
+        self.cores = max(1, cores)
+        self._free = self.cores
+        self._cond = threading.Condition()
+
+    def acquire(self, wanted: int) -> int:
+        # Waits for at least one core and takes up to `wanted` of the free ones
+        with self._cond:
+            self._cond.wait_for(lambda: self._free > 0)
+            granted = min(max(1, wanted), self._free)
+            self._free -= granted
+            return granted
+
+    def release(self, cores: int) -> None:
+        with self._cond:
+            self._free += cores
+            self._cond.notify_all()
+
+
+def run_sweep(
+    members: Dict[str, Any],
+    config: Dict[str, Any],
+    points: List[Dict[str, float]],
+    time_limit_sec: float,
+    budget: CoreBudget,
+    cores: int,
+    cancel_event: Any = None,
+    queue: Any = None,
+    job_id: str = "",
+) -> Dict[str, Any]:
+    """Solve one short run per weight vector on a process pool within `cores` threads.
+
+    Points with the same alpha and beta share one run. The cores granted by
+    ``budget`` are split between worker processes, each owning a slice of the points
+    and one prebuilt model; leftover cores become extra CP-SAT threads per process.
+    Blocks while the budget has no free core, so call it off the request thread;
+    points not started before ``cancel_event`` is set come back as CANCELLED.
+    """
+    started = time.perf_counter()
+    report = check_feasibility(members, config)
+    if not report["feasible"]:
+        return {
+            "runs": [], "paretoFront": [], "infeasibility": report, "runtimeMs": report["elapsedMs"],
+            "hardViolations": [issue["message"] for issue in report["issues"]],
+        }
+
+    distinct: Dict[Tuple[float, float], Dict[str, float]] = {}
+    for weights in points:
+        distinct.setdefault(_effective(weights), weights)
+    unique = list(distinct.values())
+
+    granted = budget.acquire(cores)
+    try:
+        processes = max(1, min(granted, len(unique)))
+        threads = max(1, granted // processes)
+        chunks = [unique[k::processes] for k in range(processes)]
+        if processes == 1:
+            results = [_sweep_worker(members, config, unique, time_limit_sec, threads, cancel_event, queue, job_id)]
+        else:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=mp.get_context("spawn")) as pool:
+                futures = [
+                    pool.submit(_sweep_worker, members, config, c, time_limit_sec, threads, cancel_event, queue, job_id)
+                    for c in chunks
+                ]
+                results = [f.result() for f in futures]
+    finally:
+        budget.release(granted)
+
+    by_key = {_effective(run["weights"]): run for chunk in results for run in chunk}
+    runs = [{**by_key[_effective(w)], "weights": w} for w in points]
+    return {
+        "runs": runs,
+        "paretoFront": pareto_front(runs),
+        "cores": granted,
+        "processes": processes,
+        "runtimeMs": int(1000 * (time.perf_counter() - started)),
+    }
+
+
+_budget: CoreBudget | None = None
+_budget_lock = threading.Lock()
+
+
+def get_core_budget() -> CoreBudget:
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = CoreBudget(get_settings().sweep_cores)
+        return _budget
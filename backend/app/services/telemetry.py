@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import json
+import math
+import statistics
+from sqlmodel import Session, select
+from ..config import available_cpus, get_settings
+from ..models import SolveRun
+
+# Bounds for an automatically chosen time limit
+MIN_TIME_LIMIT_SEC = 5.0
+MAX_TIME_LIMIT_SEC = 600.0
+# Headroom over the similar runs' time to their final incumbent. A run that was
+# still improving when its limit hit reports roughly its limit, so repeated auto
+# runs on such instances grow the limit by this factor each time.
+TIME_LIMIT_MARGIN = 1.5
+# Without history: a base plus this much per member
+SIZE_SEC_PER_MEMBER = 0.1
+# The heuristic engine stops by itself once kicks stop paying off, so its limit is
+# only a cap: its own 1 s default without history, and never more than a minute
+HEURISTIC_MIN_TIME_LIMIT_SEC = 1.0
+HEURISTIC_MAX_TIME_LIMIT_SEC = 60.0
+# Nearest runs considered, and how many a suggestion (or a worker count) needs
+HISTORY_NEIGHBORS = 20
+MIN_HISTORY = 3
+
+
+def record_run(session: Session, result: Dict[str, Any], solution_id: Optional[int] = None) -> SolveRun:
+    # Runs with a base assignment (they report "moved") are kept but not used for suggestions
+    stats = result.get("modelStats", {})
+    used = result.get("solverParams", {})
+    telemetry = result.get("telemetry", {})
+    run = SolveRun(
+        solution_id=solution_id,
+        engine=used.get("engine") or stats.get("engine", "cpsat"),
+        status=result.get("status", ""),
+        warm_start="moved" in result,
+        members=int(stats.get("members", 0)),
+        rooms=int(stats.get("rooms", 0)),
+        pairs=stats.get("pairs"),
+        variables=stats.get("variables"),
+        time_limit_sec=float(used.get("timeLimitSec") or 0.0),
+        workers=used.get("workers"),
+        runtime_ms=int(result.get("runtimeMs", 0)),
+        time_to_best_ms=int(telemetry.get("timeToBestMs", result.get("runtimeMs", 0))),
+        score=float(result.get("score", 0.0)),
+        bound=telemetry.get("bound"),
+        curve_json=json.dumps(telemetry.get("curve", [])),
+    )
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    return run
+
+
+def similar_runs(session: Session, members: int, rooms: int, engine: str, limit: int = HISTORY_NEIGHBORS) -> List[SolveRun]:
+    # Cold runs of the same engine within a factor of two in cohort size, nearest
+    # first by log-distance in members and rooms
+    stmt = (
+        select(SolveRun)
+        .where(
+            SolveRun.engine == engine,
+            SolveRun.warm_start == False,  # noqa: E712
+            SolveRun.members >= members // 2,
+            SolveRun.members <= members * 2,
+        )
+        .order_by(SolveRun.id.desc())  # type: ignore[union-attr]
+        .limit(500)
+    )
+
+    def distance(run: SolveRun) -> float:
+        return abs(math.log((run.members + 1) / (members + 1))) + abs(math.log((run.rooms + 1) / (rooms + 1)))
+
+    return sorted(session.exec(stmt).all(), key=distance)[:limit]
+
+
+def suggest_settings(session: Session, members: int, rooms: int, engine: str = "cpsat") -> Dict[str, Any]:
+    """Time limit and worker count for a new run, from runs on similar cohorts.
+
+    The limit is TIME_LIMIT_MARGIN times the 90th percentile of the similar runs'
+    time to their final incumbent, clamped to [MIN_TIME_LIMIT_SEC,
+    MAX_TIME_LIMIT_SEC]; with fewer than MIN_HISTORY such runs it falls back to a
+    size rule. The heuristic engine uses the HEURISTIC_* bounds and, without
+    history, its 1 s default instead. Workers are the count whose runs reached their best soonest (median),
+    when at least two counts have enough runs and SOLVER_WORKERS is not set;
+    otherwise None, i.e. the default.
+    """
+    runs = similar_runs(session, members, rooms, engine)
+    workers: Optional[int] = None
+    if len(runs) >= MIN_HISTORY:
+        times = sorted(run.time_to_best_ms for run in runs)
+        p90 = times[min(len(times) - 1, int(0.9 * len(times)))]
+        limit = TIME_LIMIT_MARGIN * p90 / 1000.0
+        basis = "history"
+
+        by_workers: Dict[int, List[int]] = {}
+        for run in runs:
+            if run.workers and run.workers <= available_cpus():
+                by_workers.setdefault(run.workers, []).append(run.time_to_best_ms)
+        counted = {w: t for w, t in by_workers.items() if len(t) >= MIN_HISTORY}
+        if len(counted) >= 2 and get_settings().solver_workers is None:
+            workers = min(counted, key=lambda w: (statistics.median(counted[w]), w))
+    elif engine == "heuristic":
+        limit = HEURISTIC_MIN_TIME_LIMIT_SEC
+        basis = "default"
+    else:
+        limit = MIN_TIME_LIMIT_SEC + SIZE_SEC_PER_MEMBER * members
+        basis = "size"
+    if engine == "heuristic":
+        low, high = HEURISTIC_MIN_TIME_LIMIT_SEC, HEURISTIC_MAX_TIME_LIMIT_SEC
+    else:
+        low, high = MIN_TIME_LIMIT_SEC, MAX_TIME_LIMIT_SEC
+    return {
+        "timeLimitSec": round(min(high, max(low, limit)), 1),
+        "workers": workers,
+        "basis": basis,
+        "runs": len(runs),
+    }
@@ -1,56 +1,134 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import itertools
+from typing import Any, Dict, List, Tuple
+import os
+import numpy as np
 
 # Simple heuristic weights; can be tuned later
 LIKE_SCORE = 3.0
 DISLIKE_SCORE = -3.0
 ATTR_MATCH = 0.5
 ATTR_CLASH = -0.5
+MESSINESS_CLOSE = 0.3
+MESSINESS_FAR = -0.3
 
+ATTR_KEYS = ("sleep", "temperature", "room_use")
 
-def build_pairwise_weights(members_doc: Dict) -> Dict[str, Dict[str, float]]:
+
+def _request_edges(
+    members: List[Dict],
+    names_key: str,
+    ids_key: str,
+    positions_by_name: Dict[str, List[int]],
+    positions_by_id: Dict[str, List[int]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (a, b) position pairs where a requested b; O(number of requests). Resolved ids
+    # are used when preprocessing attached them, exact names otherwise.
+    rows: List[int] = []
+    cols: List[int] = []
+    for a, m in enumerate(members):
+        if ids_key in m:
+            targets = (b for mid in set(m[ids_key]) for b in positions_by_id.get(mid, ()))
+        else:
+            targets = (b for name in set(m.get(names_key, [])) for b in positions_by_name.get(name, ()))
+        for b in targets:
+            if b != a:
+                rows.append(a)
+                cols.append(b)
+    return np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+
+
+def _categorical(members: List[Dict], key: str) -> np.ndarray:
+    # Integer code per member for attribute `key`; -1 when missing or empty
+    codes: Dict = {}
+    out = np.full(len(members), -1, dtype=np.int64)
+    for p, m in enumerate(members):
+        v = m.get("attributes", {}).get(key)
+        if v:
+            out[p] = codes.setdefault(v, len(codes))
+    return out
+
+
+def build_pairwise_matrix(members_doc: Dict, dtype=np.float32) -> Tuple[List[str], np.ndarray]:
+    """Dense P×P weight matrix; W[a, b] is how much member a wants to room with b.
+
+    Terms are added in the same order as the scalar rules (requests, avoids, each
+    attribute, messiness) so a float64 matrix matches them bit for bit. The default
+    float32 halves the memory footprint for storage and solver input.
+    """
     members: List[Dict] = members_doc.get("members", [])
-    id_by_name = {m["name"]: m["id"] for m in members}
+    P = len(members)
+    ids = [m["id"] for m in members]
+    positions_by_name: Dict[str, List[int]] = {}
+    positions_by_id: Dict[str, List[int]] = {}
+    for p, m in enumerate(members):
+        positions_by_name.setdefault(m["name"], []).append(p)
+        positions_by_id.setdefault(m["id"], []).append(p)
 
-    w: Dict[str, Dict[str, float]] = {}
-    for m in members:
-        w[m["id"]] = {}
-
-    for a, b in itertools.permutations(members, 2):
-        i, j = a["id"], b["id"]
-        score = 0.0
-        # Explicit requests
-        if b["name"] in a.get("requestedWith", []):
-            score += LIKE_SCORE
-        if b["name"] in a.get("avoidWith", []):
-            score += DISLIKE_SCORE
-
-        # Attribute agreements
-        a_attr, b_attr = a.get("attributes", {}), b.get("attributes", {})
-        for key in ("sleep", "temperature", "room_use"):
-            av, bv = a_attr.get(key), b_attr.get(key)
-            if av and bv:
-                if av == bv:
-                    score += ATTR_MATCH
-                else:
-                    score += ATTR_CLASH
-
-        # Messiness proximity
-        am, bm = a_attr.get("messiness"), b_attr.get("messiness")
-        if isinstance(am, int) and isinstance(bm, int):
-            diff = abs(am - bm)
-            if diff <= 1:
-                score += 0.3
-            elif diff >= 3:
-                score -= 0.3
-
-        # Clamp to [-3, 3]
-        if score > 3:
-            score = 3.0
-        if score < -3:
-            score = -3.0
-
-        w[i][j] = score
+    W = np.zeros((P, P), dtype=np.float64)
+
+    # Explicit requests, from a sparse edge list instead of P² membership scans
+    rows, cols = _request_edges(members, "requestedWith", "requestedIds", positions_by_name, positions_by_id)
+    W[rows, cols] += LIKE_SCORE
+    rows, cols = _request_edges(members, "avoidWith", "avoidIds", positions_by_name, positions_by_id)
+    W[rows, cols] += DISLIKE_SCORE
+
+    # Attribute agreements
+    for key in ATTR_KEYS:
+        codes = _categorical(members, key)
+        valid = codes >= 0
+        both = valid[:, None] & valid[None, :]
+        same = codes[:, None] == codes[None, :]
+        W += np.where(both, np.where(same, ATTR_MATCH, ATTR_CLASH), 0.0)
+
+    # Messiness proximity
+    mess = [m.get("attributes", {}).get("messiness") for m in members]
+    valid = np.array([isinstance(v, int) for v in mess], dtype=bool)
+    levels = np.array([v if isinstance(v, int) else 0 for v in mess], dtype=np.int64)
+    if valid.any():
+        diff = np.abs(levels[:, None] - levels[None, :])
+        both = valid[:, None] & valid[None, :]
+        W += np.where(both & (diff <= 1), MESSINESS_CLOSE, np.where(both & (diff >= 3), MESSINESS_FAR, 0.0))
+
+    # Clamp to [-3, 3]
+    np.clip(W, -3.0, 3.0, out=W)
+    np.fill_diagonal(W, 0.0)
+    return ids, W.astype(dtype, copy=False)
 
+
+def matrix_to_dict(ids: List[str], W: np.ndarray) -> Dict[str, Dict[str, float]]:
+    # Adapter for the dict-of-dicts pairwiseW format (every off-diagonal entry)
+    w: Dict[str, Dict[str, float]] = {}
+    for i, mid in enumerate(ids):
+        row = dict(zip(ids, W[i].tolist()))
+        row.pop(mid, None)
+        w[mid] = row
     return w
+
+
+def build_pairwise_weights(members_doc: Dict) -> Dict[str, Dict[str, float]]:
+    ids, W = build_pairwise_matrix(members_doc, dtype=np.float64)
+    return matrix_to_dict(ids, W)
+
+
+def save_pairwise_matrix(path: str, W: np.ndarray) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(path, np.ascontiguousarray(W, dtype=np.float32))
+    return path
+
+
+class MissingWeightsError(LookupError):
+    """A config's weight matrix file is gone; the config has to be saved again."""
+
+
+def load_pairwise(config: Dict[str, Any]) -> Tuple[List[str], np.ndarray] | None:
+    # Memory-mapped (ids, W) for configs stored in the binary format, else None
+    path = config.get("pairwiseFile")
+    if not path or config.get("pairwiseW"):
+        return None
+    try:
+        W = np.load(path, mmap_mode="r")
+    except FileNotFoundError:
+        raise MissingWeightsError(
+            f"Weight matrix {os.path.basename(path)} is missing; save the config again"
+        ) from None
+    return list(config.get("pairwiseIds", [])), W
@@ -0,0 +1,113 @@
+"""Time CSV ingestion: the old read_csv + iterrows loop against the chunked, vectorized path.
+
+    python -m benchmarks.bench_ingest --rows 5000 50000
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd  # noqa: E402
+from app.services.preprocess import _coerce_int, _split_multi, _title_case_name, preprocess_csv  # noqa: E402
+
+HEADER = [
+    "Name", "Year", "Roommate Requests", "Avoid", "Messiness Rating", "Sleep Schedule",
+    "Temperature Preference", "Room Use", "Wants Preference Enforced", "2p Rank", "3p Rank", "4p Rank",
+]
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    names = [f"student{i} {rng.choice(['smith', 'LEE', 'o brien'])}" for i in range(rows)]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            writer.writerow([
+                names[i],
+                rng.choice(["FR", "SO", "JR", "SR"]),
+                "; ".join(rng.sample(names, rng.randint(0, 3))),
+                rng.choice(["", rng.choice(names)]),
+                rng.choice(["1", "2", "3", "4", "5", ""]),
+                rng.choice(["early", "Late", ""]),
+                rng.choice(["cool", "warm"]),
+                rng.choice(["study", "social"]),
+                rng.choice(["Yes", "No"]),
+                *[rng.choice(["1", "2", "3", ""]) for _ in range(3)],
+            ])
+
+
+def row_loop(path: str) -> dict:
+    # The pre-vectorization ingestion (whole-file read_csv + iterrows), kept as the baseline
+    df = pd.read_csv(path)
+    members = []
+    for _, row in df.iterrows():
+        name_raw = str(row.get("Name", "")).strip()
+        if not name_raw:
+            continue
+        name = _title_case_name(name_raw)
+        ranked = {}
+        for size, col in (("2", "2p Rank"), ("3", "3p Rank"), ("4", "4p Rank")):
+            v = _coerce_int(row.get(col))
+            if v is not None:
+                ranked[size] = v
+        members.append({
+            "id": re.sub(r"[^a-z0-9]", "", name.lower()),
+            "name": name,
+            "year": str(row.get("Year", "")).strip(),
+            "attributes": {
+                "year": str(row.get("Year", "")).strip(),
+                "messiness": _coerce_int(row.get("Messiness Rating"), default=3) or 3,
+                "sleep": str(row.get("Sleep Schedule", "")).strip().title(),
+                "temperature": str(row.get("Temperature Preference", "")).strip().title(),
+                "room_use": str(row.get("Room Use", "")).strip().title(),
+                "enforce": str(row.get("Wants Preference Enforced", "")).strip().lower() in ("yes", "true", "1"),
+            },
+            "rankedRoomSizes": ranked,
+            "requestedWith": _split_multi(str(row.get("Roommate Requests", ""))),
+            "avoidWith": _split_multi(str(row.get("Avoid", ""))),
+        })
+    return {"members": members}
+
+
+def measure(fn, *args) -> tuple[float, float]:
+    # (seconds, peak traced MiB); timing is taken without tracemalloc running
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--skip-loop-above", type=int, default=50000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = os.path.join(tmp, f"members_{n}.csv")
+            write_synthetic_csv(path, n)
+            sec, mib = measure(preprocess_csv, path)
+            row = {"rows": n, "chunkedSec": round(sec, 3), "chunkedPeakMiB": round(mib, 1)}
+            if n <= args.skip_loop_above:
+                sec, mib = measure(row_loop, path)
+                row.update(loopSec=round(sec, 3), loopPeakMiB=round(mib, 1))
+                row["speedup"] = round(row["loopSec"] / row["chunkedSec"], 1)
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Time and measure every stage from CSV upload to export on synthetic cohorts.
+
+Stages: preprocess (preprocess_csv, i.e. preprocess_dataframe per chunk plus
+request resolution), weights (build_pairwise_matrix, the default config path),
+weightsDict (build_pairwise_weights, the "json" format), build (build_model),
+solve (run_optimization) and export (the CSV and JSON export endpoints on an
+in-memory database). Everything runs in-process; nothing needs a server.
+
+    python -m benchmarks.bench_pipeline --sizes 50 200 1000 5000 --out bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json --tolerance 0.25
+
+Each stage prints one JSON line. --out writes the lines plus machine details
+as one document; --baseline compares against such a document and exits 1 when
+a stage got slower by more than the tolerance.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from sqlmodel import SQLModel, Session, create_engine  # noqa: E402
+from app.assignments import save_solution  # noqa: E402
+from app.config import available_cpus  # noqa: E402
+from app.routers.solution import export_csv, export_json  # noqa: E402
+from app.services.optimize import build_model, run_optimization  # noqa: E402
+from app.services.preprocess import preprocess_csv  # noqa: E402
+from app.services.weights import build_pairwise_matrix, build_pairwise_weights, save_pairwise_matrix  # noqa: E402
+from benchmarks.synthetic import CohortSpec, config_for, generate_cohort, write_csv  # noqa: E402
+
+# Stages faster than this are noise on a shared machine; never flagged
+NOISE_FLOOR_SEC = 0.05
+
+
+def measure(fn: Callable[..., Any], *args: Any, trace: bool = True, **kwargs: Any) -> Tuple[Any, Dict[str, Any]]:
+    # Timing is taken without tracemalloc running; the peak comes from a second run.
+    # Without `trace` (long native work) only the process's max RSS is reported.
+    t0 = time.perf_counter()
+    value = fn(*args, **kwargs)
+    stats: Dict[str, Any] = {"sec": round(time.perf_counter() - t0, 4)}
+    if trace:
+        tracemalloc.start()
+        fn(*args, **kwargs)
+        stats["peakMiB"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    else:
+        stats["maxRssMiB"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return value, stats
+
+
+async def _body_size(response: Any) -> int:
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def _export(members_doc: Dict[str, Any], rooms: List[Dict[str, Any]]) -> int:
+    # The exports stream; the whole body is drained as a client would
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        sol = save_solution(session, 1, 1, rooms, 0.0, 0)
+        size = sum(asyncio.run(_body_size(export(sol.id or 0, session))) for export in (export_csv, export_json))
+    engine.dispose()
+    return size
+
+
+def run_size(
+    members: int,
+    workdir: str,
+    time_limit: float,
+    engine: str,
+    cpsat_max: int,
+    dict_max: int,
+    seed: int,
+    spec_overrides: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    cohort = generate_cohort(CohortSpec(members=members, seed=seed, **spec_overrides))
+    path = write_csv(os.path.join(workdir, f"members_{members}.csv"), cohort)
+    base = {"members": members, "rooms": len(cohort["rooms"])}
+    rows: List[Dict[str, Any]] = []
+
+    members_doc, stats = measure(preprocess_csv, path)
+    rows.append({**base, "stage": "preprocess", **stats})
+
+    (ids, W), stats = measure(build_pairwise_matrix, members_doc)
+    rows.append({**base, "stage": "weights", **stats})
+    if members <= dict_max:
+        _, stats = measure(build_pairwise_weights, members_doc)
+        rows.append({**base, "stage": "weightsDict", **stats})
+    config = config_for(
+        cohort,
+        members_doc,
+        pairwiseFile=save_pairwise_matrix(os.path.join(workdir, f"w_{members}.npy"), W),
+        pairwiseIds=ids,
+    )
+    member_list = members_doc["members"]
+
+    # Synthetic attributes make nearly every pair nonzero, so the exact model has about
+    # P^2 * R / 2 pair variables: auto keeps it (hinted by the heuristic) to small cohorts
+    chosen = engine if engine != "auto" else ("hybrid" if members <= cpsat_max else "heuristic")
+    if chosen != "heuristic":
+        built, stats = measure(build_model, member_list, config, trace=members <= cpsat_max // 2)
+        rows.append({**base, "stage": "build", "variables": len(built["model"].Proto().variables), **stats})
+        del built
+
+    result, stats = measure(
+        run_optimization, members_doc, config, trace=False, time_limit_sec=time_limit, engine=chosen,
+        solver_params={"seed": seed},
+    )
+    rows.append({
+        **base, "stage": "solve", "engine": chosen, "status": result["status"], "score": result["score"],
+        "solverMs": result["runtimeMs"], **stats,
+    })
+
+    if result["rooms"] and not result.get("infeasibility"):
+        size, stats = measure(_export, members_doc, result["rooms"])
+        rows.append({**base, "stage": "export", "bytes": size, **stats})
+    return rows
+
+
+def machine() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": available_cpus(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[Dict[str, Any]]:
+    # Stages (by cohort size) that got slower than baseline * (1 + tolerance)
+    before = {(row["members"], row["stage"]): row for row in baseline}
+    out = []
+    for row in results:
+        old = before.get((row["members"], row["stage"]))
+        if old is None or max(row["sec"], old["sec"]) < NOISE_FLOOR_SEC:
+            continue
+        if row["sec"] > old["sec"] * (1 + tolerance):
+            out.append({"members": row["members"], "stage": row["stage"], "sec": row["sec"], "baselineSec": old["sec"]})
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000, 5000])
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--engine", choices=["auto", "cpsat", "heuristic", "hybrid"], default="auto")
+    parser.add_argument("--cpsat-max-members", type=int, default=100,
+                        help="with --engine auto, larger cohorts skip the model and use the heuristic")
+    parser.add_argument("--dict-weights-max-members", type=int, default=2000)
+    parser.add_argument("--request-density", type=float, default=1.5)
+    parser.add_argument("--together-rate", type=float, default=0.05)
+    parser.add_argument("--apart-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write all results and machine details as one JSON document")
+    parser.add_argument("--baseline", help="a previous --out document to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    overrides = {
+        "request_density": args.request_density, "together_rate": args.together_rate, "apart_rate": args.apart_rate,
+    }
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            for row in run_size(
+                n, tmp, args.time_limit, args.engine, args.cpsat_max_members, args.dict_weights_max_members,
+                args.seed, overrides,
+            ):
+                print(json.dumps(row), flush=True)
+                results.append(row)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"machine": machine(), "args": vars(args), "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f)["results"], args.tolerance)
+        print(json.dumps({"regressions": slower}))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
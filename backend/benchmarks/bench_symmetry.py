@@ -0,0 +1,150 @@
+"""Time to optimal with and without room symmetry breaking.
+
+Scales the sample layout (2/3/4-person rooms) up to the requested room count and
+fills it with members. The "random" layout gives 90% of the beds to members with
+two random roommate requests each; the "clique" layout fills every bed with groups
+sized like the rooms whose members all request each other.
+
+Each instance is solved twice (baseline, then with add_symmetry_breaking) with a
+fixed seed and one search worker by default. Reported per run: wall time until
+CP-SAT proved OPTIMAL (null when the time limit hit first) and until the first
+incumbent reached the target objective (--target, else the clique optimum or,
+for random layouts, the best score either run found). speedup is baseline time / symmetry time for both measures.
+
+    python -m benchmarks.bench_symmetry --rooms 6 9 12 --layout clique --time-limit 120
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.optimize import run_optimization  # noqa: E402
+
+SAMPLE_ROOMS = os.path.join(os.path.dirname(__file__), "..", "..", "sample_data", "rooms_example.json")
+
+
+def scaled_rooms(n_rooms: int) -> list[dict]:
+    with open(SAMPLE_ROOMS) as f:
+        base = json.load(f)
+    return [
+        {"id": f"{i + 1:03d}", "label": f"{i + 1:03d}", "capacity": base[i % len(base)]["capacity"]}
+        for i in range(n_rooms)
+    ]
+
+
+def synthetic_members(n_members: int, seed: int) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    members = [{"id": f"m{i}", "name": f"Member {i}"} for i in range(n_members)]
+    pairwiseW: dict[str, dict[str, float]] = {m["id"]: {} for m in members}
+    for i in range(n_members):
+        for j in rng.sample(range(n_members), 2):
+            if j != i:
+                pairwiseW[f"m{i}"][f"m{j}"] = 3.0
+    return {"members": members}, pairwiseW
+
+
+def clique_members(rooms: list[dict], seed: int) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    n_members = sum(r["capacity"] for r in rooms)
+    order = list(range(n_members))
+    rng.shuffle(order)
+    members = [{"id": f"m{i}", "name": f"Member {i}"} for i in range(n_members)]
+    pairwiseW: dict[str, dict[str, float]] = {m["id"]: {} for m in members}
+    start = 0
+    for room in rooms:
+        group = order[start:start + room["capacity"]]
+        start += room["capacity"]
+        for i in group:
+            for j in group:
+                if j != i:
+                    pairwiseW[f"m{i}"][f"m{j}"] = 3.0
+    return {"members": members}, pairwiseW
+
+
+def _solve(members: dict, config: dict, time_limit: int, seed: int, workers: int) -> dict:
+    curve: list[tuple[float, float]] = []
+    t0 = time.perf_counter()
+    res = run_optimization(
+        members, json.dumps(config), time_limit_sec=time_limit,
+        on_progress=lambda ev: curve.append((time.perf_counter() - t0, ev["score"])),
+        solver_params={"workers": workers, "seed": seed},
+    )
+    wall = time.perf_counter() - t0
+    return {
+        "status": res["status"],
+        "score": res["score"],
+        "wallSec": round(wall, 3),
+        "timeToOptimalSec": round(wall, 3) if res["status"] == "OPTIMAL" else None,
+        "roomClasses": res["modelStats"]["roomClasses"],
+        "curve": curve,
+    }
+
+
+def _ratio(baseline: float | None, symmetry: float | None) -> float | None:
+    if baseline is None or symmetry is None:
+        return None
+    return round(baseline / max(symmetry, 1e-3), 2)
+
+
+def run(
+    n_rooms: int, time_limit: int, seed: int, layout: str = "random", workers: int = 1, target: float | None = None
+) -> dict:
+    rooms = scaled_rooms(n_rooms)
+    capacity = sum(r["capacity"] for r in rooms)
+    if layout == "clique":
+        members, pairwiseW = clique_members(rooms, seed)
+    else:
+        members, pairwiseW = synthetic_members(int(capacity * 0.9), seed)
+    results = {}
+    for label, sym in (("baseline", False), ("symmetry", True)):
+        config = {
+            "rooms": rooms,
+            "allowEmptyBeds": True,
+            "pairwiseW": pairwiseW,
+            "weights": {"alpha": 0.0, "beta": 0.1, "gamma": 0.0},
+            "symmetryBreaking": sym,
+        }
+        results[label] = _solve(members, config, time_limit, seed, workers)
+
+    if target is None and layout == "clique":
+        # Every group in a room of its size: each ordered pair of roommates scores 3
+        target = sum(3.0 * r["capacity"] * (r["capacity"] - 1) for r in rooms)
+    elif target is None:
+        target = max(r["score"] for r in results.values())
+    for r in results.values():
+        curve = r.pop("curve")
+        r["timeToTargetSec"] = next((round(t, 3) for t, score in curve if score >= target - 1e-9), None)
+    base, sym = results["baseline"], results["symmetry"]
+    return {
+        "rooms": n_rooms,
+        "layout": layout,
+        "members": len(members["members"]),
+        "target": target,
+        **results,
+        "speedup": {
+            "toOptimal": _ratio(base["timeToOptimalSec"], sym["timeToOptimalSec"]),
+            "toTarget": _ratio(base["timeToTargetSec"], sym["timeToTargetSec"]),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, nargs="+", default=[6, 9, 12])
+    parser.add_argument("--time-limit", type=int, default=120, help="cap per solve, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", choices=("random", "clique"), default="random")
+    parser.add_argument("--workers", type=int, default=1, help="CP-SAT search workers")
+    parser.add_argument("--target", type=float, default=None, help="objective for timeToTargetSec")
+    args = parser.parse_args()
+    for n in args.rooms:
+        print(json.dumps(run(n, args.time_limit, args.seed, args.layout, args.workers, args.target)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Time the scalar pairwise-weight loop against the vectorized matrix builder.
+
+    python -m benchmarks.bench_weights --sizes 200 1000 3000
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.weights import build_pairwise_matrix, build_pairwise_weights  # noqa: E402
+
+
+def scalar_weights(members_doc: dict) -> dict:
+    # The pre-vectorization implementation, kept as the baseline
+    members = members_doc.get("members", [])
+    w = {m["id"]: {} for m in members}
+    for a, b in itertools.permutations(members, 2):
+        score = 0.0
+        if b["name"] in a.get("requestedWith", []):
+            score += 3.0
+        if b["name"] in a.get("avoidWith", []):
+            score += -3.0
+        a_attr, b_attr = a.get("attributes", {}), b.get("attributes", {})
+        for key in ("sleep", "temperature", "room_use"):
+            av, bv = a_attr.get(key), b_attr.get(key)
+            if av and bv:
+                score += 0.5 if av == bv else -0.5
+        am, bm = a_attr.get("messiness"), b_attr.get("messiness")
+        if isinstance(am, int) and isinstance(bm, int):
+            diff = abs(am - bm)
+            if diff <= 1:
+                score += 0.3
+            elif diff >= 3:
+                score -= 0.3
+        w[a["id"]][b["id"]] = max(-3.0, min(3.0, score))
+    return w
+
+
+def synthetic_members(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    names = [f"Person {i}" for i in range(n)]
+    return {"members": [
+        {
+            "id": f"m{i}",
+            "name": names[i],
+            "attributes": {
+                "sleep": rng.choice(["Early", "Late"]),
+                "temperature": rng.choice(["Cool", "Warm"]),
+                "room_use": rng.choice(["Study", "Social", "Sleep"]),
+                "messiness": rng.randint(1, 5),
+            },
+            "requestedWith": rng.sample(names, 3),
+            "avoidWith": rng.sample(names, 1),
+        }
+        for i in range(n)
+    ]}
+
+
+def timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 3000])
+    parser.add_argument("--skip-scalar-above", type=int, default=3000)
+    args = parser.parse_args()
+    for n in args.sizes:
+        doc = synthetic_members(n)
+        row = {"members": n, "matrixSec": round(timed(build_pairwise_matrix, doc), 4)}
+        row["dictSec"] = round(timed(build_pairwise_weights, doc), 4)
+        if n <= args.skip_scalar_above:
+            row["scalarSec"] = round(timed(scalar_weights, doc), 4)
+            row["matrixSpeedup"] = round(row["scalarSec"] / row["matrixSec"], 1)
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Seeded synthetic cohorts: a members CSV in the upload format plus a room layout and hard constraints.
+
+    python -m benchmarks.synthetic --members 500 --csv members.csv --rooms rooms.json
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+HEADER = [
+    "Name", "Year", "Roommate Requests", "Avoid", "Messiness Rating", "Sleep Schedule",
+    "Temperature Preference", "Room Use", "Wants Preference Enforced", "2p Rank", "3p Rank", "4p Rank",
+]
+SURNAMES = ["Smith", "Lee", "Garcia", "Nguyen", "Okafor", "Brien", "Kowalski", "Haddad", "Tanaka", "Silva"]
+
+
+@dataclass
+class CohortSpec:
+    members: int
+    # None: enough rooms for every member at `fill` occupancy
+    rooms: int | None = None
+    fill: float = 0.9
+    # Share of each room size among the rooms
+    capacity_mix: Dict[int, float] = field(default_factory=lambda: {2: 0.4, 3: 0.3, 4: 0.3})
+    # Average roommate requests and avoids per member
+    request_density: float = 1.5
+    avoid_density: float = 0.2
+    # Share of members in a mustTogether pair, and mustApart pairs per member
+    together_rate: float = 0.05
+    apart_rate: float = 0.02
+    seed: int = 0
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    # Integer with the given mean: floor plus a Bernoulli for the fraction
+    base = int(mean)
+    return base + (rng.random() < mean - base)
+
+
+def generate_cohort(spec: CohortSpec) -> Dict[str, Any]:
+    """CSV rows, rooms and hard constraints for one cohort.
+
+    Hard pairs name members by their CSV name; ``config_for`` maps them to the ids
+    preprocessing assigns. mustTogether pairs are disjoint and mustApart pairs
+    avoid them, so any layout with a two-bed room per pair stays feasible.
+    """
+    rng = random.Random(spec.seed)
+    P = spec.members
+    names = [f"Student{i} {SURNAMES[i % len(SURNAMES)]}" for i in range(P)]
+
+    sizes = sorted(spec.capacity_mix)
+    shares = [spec.capacity_mix[s] for s in sizes]
+    capacities: List[int] = []
+    if spec.rooms is not None:
+        capacities = rng.choices(sizes, shares, k=spec.rooms)
+    else:
+        while sum(capacities) * spec.fill < P:
+            capacities.append(rng.choices(sizes, shares)[0])
+    rooms = [{"id": f"R{r + 1:04d}", "label": f"R{r + 1:04d}", "capacity": c} for r, c in enumerate(capacities)]
+
+    rows = []
+    for i in range(P):
+        others = [j for j in rng.sample(range(P), min(P, 8)) if j != i]
+        requests = [names[j] for j in others[:_count(rng, spec.request_density)]]
+        avoid = [names[j] for j in others[len(requests):len(requests) + _count(rng, spec.avoid_density)]]
+        ranks = rng.sample(["1", "2", "3"], 3)
+        rows.append([
+            names[i],
+            rng.choice(["FR", "SO", "JR", "SR"]),
+            "; ".join(requests),
+            "; ".join(avoid),
+            rng.choice(["1", "2", "3", "4", "5", ""]),
+            rng.choice(["Early", "Late", ""]),
+            rng.choice(["Cool", "Warm"]),
+            rng.choice(["Study", "Social", "Sleep"]),
+            rng.choice(["Yes", "No"]),
+            *[ranks[k] if size in spec.capacity_mix else "" for k, size in enumerate((2, 3, 4))],
+        ])
+
+    order = list(range(P))
+    rng.shuffle(order)
+    n_together = int(spec.together_rate * P) // 2
+    together = [[names[order[2 * k]], names[order[2 * k + 1]]] for k in range(n_together)]
+    loose = [names[i] for i in order[2 * n_together:]]
+    apart = [rng.sample(loose, 2) for _ in range(int(spec.apart_rate * P))] if len(loose) >= 2 else []
+    return {
+        "header": HEADER,
+        "rows": rows,
+        "rooms": rooms,
+        "hard": {"mustTogetherPairs": together, "mustApartPairs": apart},
+    }
+
+
+def write_csv(path: str, cohort: Dict[str, Any]) -> str:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(cohort["header"])
+        writer.writerows(cohort["rows"])
+    return path
+
+
+def config_for(cohort: Dict[str, Any], members_doc: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    # Rooms and hard pairs with preprocessed member ids; names that did not survive are dropped
+    id_of = {m["name"]: m["id"] for m in members_doc.get("members", [])}
+
+    def pairs(key: str) -> List[List[str]]:
+        return [[id_of[a], id_of[b]] for a, b in cohort["hard"][key] if a in id_of and b in id_of]
+
+    return {
+        "rooms": cohort["rooms"],
+        "hard": {"mustTogetherPairs": pairs("mustTogetherPairs"), "mustApartPairs": pairs("mustApartPairs")},
+        "weights": {"alpha": 0.2, "beta": 0.1, "gamma": 0.1},
+        **extra,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, required=True)
+    parser.add_argument("--rooms-count", type=int, default=None)
+    parser.add_argument("--request-density", type=float, default=1.5)
+    parser.add_argument("--together-rate", type=float, default=0.05)
+    parser.add_argument("--apart-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", required=True)
+    parser.add_argument("--rooms", required=True, help="rooms JSON output path")
+    args = parser.parse_args()
+    cohort = generate_cohort(CohortSpec(
+        members=args.members, rooms=args.rooms_count, request_density=args.request_density,
+        together_rate=args.together_rate, apart_rate=args.apart_rate, seed=args.seed,
+    ))
+    write_csv(args.csv, cohort)
+    with open(args.rooms, "w") as f:
+        json.dump(cohort["rooms"], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
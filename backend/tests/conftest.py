@@ -3,3 +3,40 @@ import os, sys
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+
+@pytest.fixture
+def db_engine():
+    # Fresh in-memory database; StaticPool shares its one connection across sessions and threads
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(db_engine):
+    with Session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_engine, monkeypatch):
+    # The app with every request on db_engine and a fresh live hub
+    from fastapi.testclient import TestClient
+    from app.database import get_session
+    from app.main import app
+    from app.services import live
+
+    def session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    monkeypatch.setattr(live, "_hub", None)
+    app.dependency_overrides[get_session] = session_override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,79 @@
+import json
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import create_engine, select
+from app import database
+from app.assignments import build_rooms, load_assignment, load_rooms, migrate_rooms_json, save_solution, set_room
+from app.models import Assignment, ConfigModel, Dataset, Solution
+
+
+def _seed(session):
+    members = {"members": [{"id": f"m{i}", "name": f"M{i}", "attributes": {"sleep": "Late"}} for i in range(4)]}
+    rooms_spec = [{"id": "A", "label": "Room A", "capacity": 2}, {"id": "B", "label": "Room B", "capacity": 2}]
+    dataset = Dataset(label="d")
+    dataset.set_members(members)
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": rooms_spec})))
+    session.commit()
+    return members, rooms_spec
+
+
+def test_solution_stores_ids_and_joins_details_on_read(session):
+    members, rooms_spec = _seed(session)
+    rooms = build_rooms(rooms_spec, members, {"m0": "A", "m1": "A", "m2": "B"})
+    sol = save_solution(session, 1, 1, rooms, 1.5, 10)
+
+    assert sol.rooms_json is None and sol.version == 0
+    assert load_assignment(session, sol.id) == {"m0": "A", "m1": "A", "m2": "B"}
+    loaded = load_rooms(session, sol)
+    assert [r["label"] for r in loaded] == ["Room A", "Room B"]
+    assert loaded[0]["members"][0] == members["members"][0]
+
+    set_room(session, sol, "m1", "B")
+    set_room(session, sol, "m3", None)
+    session.commit()
+    assert sol.version == 2
+    assert load_assignment(session, sol.id) == {"m0": "A", "m1": "B", "m2": "B", "m3": None}
+    assert [len(r["members"]) for r in load_rooms(session, sol)] == [1, 2]
+
+
+def test_legacy_rooms_json_is_migrated_once(session):
+    members, rooms_spec = _seed(session)
+    legacy_rooms = build_rooms(rooms_spec, members, {"m0": "B", "m3": "A"})
+    session.add(Solution(dataset_id=1, config_id=1, rooms_json=json.dumps(legacy_rooms)))
+    session.commit()
+
+    assert migrate_rooms_json(session) == 1
+    assert migrate_rooms_json(session) == 0
+    sol = session.exec(select(Solution)).one()
+    assert sol.rooms_json is None
+    assert load_assignment(session, sol.id) == {"m0": "B", "m3": "A"}
+    assert len(session.exec(select(Assignment)).all()) == 2
+
+
+def test_member_has_one_row_per_solution(session):
+    members, rooms_spec = _seed(session)
+    sol = save_solution(session, 1, 1, build_rooms(rooms_spec, members, {"m0": "A"}), 0.0, 0)
+    session.add(Assignment(solution_id=sol.id, member_id="m0", room_id="B"))
+    with pytest.raises(IntegrityError):
+        session.commit()
+
+
+def test_existing_databases_keep_the_last_duplicate_and_gain_the_unique_index(tmp_path, monkeypatch):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as conn:
+        conn.execute(text("CREATE TABLE assignment (id INTEGER PRIMARY KEY, solution_id INTEGER NOT NULL, "
+                          "member_id VARCHAR NOT NULL, room_id VARCHAR)"))
+        conn.execute(text("CREATE INDEX ix_assignment_solution_member ON assignment (solution_id, member_id)"))
+        conn.execute(text("INSERT INTO assignment (solution_id, member_id, room_id) "
+                          "VALUES (1, 'm0', 'A'), (1, 'm1', 'A'), (1, 'm0', 'B')"))
+    monkeypatch.setattr(database, "engine", old)
+
+    database._add_missing_columns()
+
+    with old.connect() as conn:
+        rows = conn.execute(text("SELECT member_id, room_id FROM assignment ORDER BY id")).all()
+    assert [tuple(r) for r in rows] == [("m1", "A"), ("m0", "B")]
+    indexes = {ix["name"]: ix["unique"] for ix in inspect(old).get_indexes("assignment")}
+    assert indexes["ix_assignment_solution_member"]
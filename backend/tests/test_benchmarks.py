@@ -0,0 +1,50 @@
+from benchmarks.bench_pipeline import regressions, run_size
+from benchmarks.bench_symmetry import run as run_symmetry
+from benchmarks.synthetic import CohortSpec, generate_cohort
+
+
+def test_generator_is_seeded_and_honors_the_spec():
+    spec = CohortSpec(members=200, capacity_mix={2: 0.5, 4: 0.5}, together_rate=0.1, apart_rate=0.05, seed=4)
+    cohort = generate_cohort(spec)
+    assert cohort == generate_cohort(spec)
+    assert generate_cohort(CohortSpec(members=200, seed=5))["rows"] != cohort["rows"]
+
+    assert len(cohort["rows"]) == 200
+    capacities = [room["capacity"] for room in cohort["rooms"]]
+    assert set(capacities) <= {2, 4} and 0.9 * sum(capacities) >= 200
+    together = cohort["hard"]["mustTogetherPairs"]
+    assert len(together) == 10 and len({n for pair in together for n in pair}) == 20
+    assert len(cohort["hard"]["mustApartPairs"]) == 10
+    assert len(generate_cohort(CohortSpec(members=50, rooms=7))["rooms"]) == 7
+
+
+def test_pipeline_runs_every_stage_offline(tmp_path):
+    rows = run_size(30, str(tmp_path), 1.0, "heuristic", 100, 100, 0, {})
+    assert [row["stage"] for row in rows] == ["preprocess", "weights", "weightsDict", "solve", "export"]
+    assert all(row["members"] == 30 and row["sec"] >= 0 for row in rows)
+    assert rows[3]["status"] == "FEASIBLE" and rows[4]["bytes"] > 0
+
+
+def test_regressions_flag_only_slower_stages_above_noise():
+    baseline = [
+        {"members": 100, "stage": "solve", "sec": 1.0},
+        {"members": 100, "stage": "weights", "sec": 0.001},
+        {"members": 100, "stage": "export", "sec": 0.5},
+    ]
+    current = [
+        {"members": 100, "stage": "solve", "sec": 1.4},
+        {"members": 100, "stage": "weights", "sec": 0.004},
+        {"members": 100, "stage": "export", "sec": 0.55},
+        {"members": 500, "stage": "solve", "sec": 9.0},
+    ]
+    assert regressions(current, baseline, 0.25) == [{"members": 100, "stage": "solve", "sec": 1.4, "baselineSec": 1.0}]
+
+
+def test_symmetry_benchmark_times_both_runs_to_the_clique_optimum():
+    row = run_symmetry(6, time_limit=60, seed=0, layout="clique")
+    assert row["target"] == 120.0
+    for label in ("baseline", "symmetry"):
+        assert row[label]["status"] == "OPTIMAL" and row[label]["score"] == 120.0
+        assert 0 <= row[label]["timeToTargetSec"] <= row[label]["timeToOptimalSec"]
+    assert row["symmetry"]["roomClasses"] == 3
+    assert row["speedup"]["toOptimal"] > 0 and row["speedup"]["toTarget"] > 0
@@ -0,0 +1,102 @@
+import json
+import time
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from app.assignments import build_rooms, load_assignment_matrix, save_solution
+from app.models import ConfigModel, Dataset
+from app.routers.solution import compare
+from app.schemas import CompareRequest
+from app.services.compare import compare_solutions, move_distances
+from app.services.scoring import rooms_soft_scores
+
+
+def _seed(session):
+    members = {"members": [
+        {"id": f"m{i}", "name": f"M{i}", "attributes": {"sleep": "Late" if i % 2 else "Early"}} for i in range(6)
+    ]}
+    members["members"][0]["requestedWith"] = ["M1"]
+    rooms_spec = [{"id": "A", "label": "A", "capacity": 2}, {"id": "B", "label": "B", "capacity": 2},
+                  {"id": "C", "label": "C", "capacity": 2}]
+    dataset = Dataset(label="d")
+    dataset.set_members(members)
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": rooms_spec})))
+    # Same dataset, room C left out
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": rooms_spec[:2]})))
+    session.commit()
+    return members, rooms_spec
+
+
+def test_move_distances_count_differently_placed_members():
+    codes = np.array([[0, 0, 1, -1], [0, 1, 1, -1], [1, 0, 0, 0]], dtype=np.int32)
+    assert move_distances(codes).tolist() == [[0, 1, 3], [1, 0, 4], [3, 4, 0]]
+
+
+def test_comparison_ranks_scores_and_measures_distance(session):
+    members, rooms_spec = _seed(session)
+    layouts = [
+        {"m0": "A", "m1": "A", "m2": "B", "m3": "B", "m4": "C", "m5": "C"},
+        {"m0": "A", "m2": "A", "m1": "B", "m3": "B", "m4": "C", "m5": "C"},
+        {"m0": "A", "m1": "A", "m2": "B", "m3": "B", "m4": "C"},
+    ]
+    sols = [save_solution(session, 1, 1, build_rooms(rooms_spec, members, a), score, 0)
+            for a, score in zip(layouts, [1.0, 3.0, 2.0])]
+    other = save_solution(session, 1, 2, build_rooms(rooms_spec[:2], members, layouts[0]), 0.5, 0)
+
+    out = compare(CompareRequest(datasetId=1), session)
+    assert [row["id"] for row in out["solutions"]] == [sols[1].id, sols[2].id, sols[0].id, other.id]
+    assert [row["rank"] for row in out["solutions"]] == [1, 2, 3, 4]
+    assert [row["movesFromBest"] for row in out["solutions"]] == [0, 3, 2, 2]
+    assert out["moveDistance"][0][1] == 3 and out["moveDistance"][1][0] == 3
+
+    by_id = {row["id"]: row["softScores"] for row in out["solutions"]}
+    assert by_id[sols[0].id] == rooms_soft_scores(members["members"], {"rooms": rooms_spec},
+                                                  build_rooms(rooms_spec, members, layouts[0]))
+    # Config 2 has no room C: its occupants count as unassigned there
+    assert by_id[other.id]["unassigned"] == 2 and by_id[sols[0].id]["unassigned"] == 0
+
+    out = compare(CompareRequest(solutionIds=[sols[0].id, sols[2].id], sortBy="unassigned"), session)
+    assert out["descending"] is False
+    assert [row["id"] for row in out["solutions"]] == [sols[0].id, sols[2].id]
+    assert compare(CompareRequest(solutionIds=[sols[0].id], sortBy="requestsMet"), session)["descending"] is True
+
+
+def test_comparison_rejects_bad_requests(session):
+    members, rooms_spec = _seed(session)
+    sol = save_solution(session, 1, 1, build_rooms(rooms_spec, members, {"m0": "A"}), 0.0, 0)
+    for payload, status in [
+        (CompareRequest(solutionIds=[sol.id, 999]), 404),
+        (CompareRequest(datasetId=2), 404),
+        (CompareRequest(), 400),
+        (CompareRequest(solutionIds=[sol.id], sortBy="nope"), 400),
+        (CompareRequest(datasetId=2, solutionIds=[sol.id]), 400),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            compare(payload, session)
+        assert exc.value.status_code == status
+
+
+def test_hundreds_of_solutions_compare_in_one_pass():
+    rng = np.random.default_rng(0)
+    P, R, S = 400, 100, 250
+    member_list = [{"id": f"m{i}", "name": f"M{i}", "attributes": {"messiness": int(rng.integers(1, 6))}}
+                   for i in range(P)]
+    config = {"rooms": [{"id": f"R{r}", "capacity": 4} for r in range(R)]}
+    codes = np.stack([rng.permutation(np.repeat(np.arange(R), 4)) for _ in range(S)]).astype(np.int32)
+    rows = [{"id": s, "configId": 1, "version": 0, "score": float(s % 7)} for s in range(S)]
+
+    t0 = time.perf_counter()
+    out = compare_solutions(member_list, rows, {1: config}, codes, [f"R{r}" for r in range(R)])
+    assert time.perf_counter() - t0 < 10
+    assert len(out["moveDistance"]) == S and out["solutions"][0]["score"] == 6.0
+    assert all(row["softScores"]["unassigned"] == 0 for row in out["solutions"])
+
+
+def test_matrix_loader_uses_integer_codes(session):
+    members, rooms_spec = _seed(session)
+    a = save_solution(session, 1, 1, build_rooms(rooms_spec, members, {"m0": "A", "m1": "B"}), 0.0, 0)
+    b = save_solution(session, 1, 1, build_rooms(rooms_spec, members, {"m0": "B"}), 0.0, 0)
+    codes, room_ids = load_assignment_matrix(session, [b.id, a.id], ["m1", "m0"])
+    assert codes.dtype == np.int32
+    assert [[room_ids[c] if c >= 0 else None for c in row] for row in codes.tolist()] == [[None, "B"], ["B", "A"]]
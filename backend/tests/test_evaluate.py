@@ -0,0 +1,105 @@
+import random
+from app.services.evaluate import SolutionState
+from app.services.optimize import score_assignment
+
+
+def _instance(seed=0, P=24, R=8, capacities=(2, 4)):
+    rng = random.Random(seed)
+    ids = [f"m{i}" for i in range(P)]
+    members = {"members": [
+        {"id": mid, "name": mid.upper(), "rankedRoomSizes": {"2": rng.randint(1, 5), "4": rng.randint(1, 5)}}
+        for mid in ids
+    ]}
+    rooms_spec = [{"id": f"R{r}", "label": f"R{r}", "capacity": rng.choice(capacities)} for r in range(R)]
+    config = {
+        "rooms": rooms_spec,
+        "pairwiseW": {a: {b: rng.choice([-3.0, -0.5, 0.3, 1.3, 3.0]) for b in rng.sample(ids, 8)} for a in ids},
+        "weights": {"alpha": 0.2, "beta": 0.1, "gamma": 0.0},
+        "hard": {
+            "mustApartPairs": [["m0", "m1"], ["m2", "m3"]],
+            "mustTogetherPairs": [["m4", "m5"]],
+            "fixedRoomAssignments": {"m6": "R0"},
+        },
+    }
+    rooms = [{**spec, "members": []} for spec in rooms_spec]
+    for p, m in enumerate(members["members"]):
+        rooms[p % R]["members"].append(m)
+    return members, config, rooms
+
+
+def _reference_score(members, config, rooms):
+    idx = {m["id"]: p for p, m in enumerate(members["members"])}
+    room_of = {idx[m["id"]]: r for r, room in enumerate(rooms) for m in room["members"]}
+    return score_assignment(members["members"], config, room_of)
+
+
+def _room_sets(state):
+    return {room["id"]: {m["id"] for m in room["members"]} for room in state.rooms()}
+
+
+def test_incremental_score_matches_full_rescore():
+    members, config, rooms = _instance()
+    state = SolutionState(members, config, rooms)
+    assert state.score == _reference_score(members, config, rooms)
+
+    rng = random.Random(1)
+    targets = [room["id"] for room in rooms] + [None]
+    for _ in range(60):
+        member_id = f"m{rng.randrange(24)}"
+        to_room = rng.choice(targets)
+        preview = state.preview(member_id, to_room)
+        before = state.score
+        result = state.move(member_id, to_room)
+        assert result["scoreDelta"] == preview["scoreDelta"]
+        assert abs(result["score"] - (before + result["scoreDelta"])) < 1e-9
+        assert abs(state.score - _reference_score(members, config, state.rooms())) < 1e-9
+
+
+def test_move_reports_hard_violations():
+    members, config, rooms = _instance(capacities=(4,))
+    state = SolutionState(members, config, rooms)
+    # m0..m7 start in R0..R7: m4 and m5 are apart, m6 sits outside its pinned room
+    assert set(state.violations.values()) == {"m4 and m5 must be together", "m6 is pinned to room R0"}
+
+    result = state.move("m5", "R4")
+    assert result["resolvedViolations"] == ["m4 and m5 must be together"]
+    result = state.move("m1", "R0")
+    assert result["newViolations"] == ["m0 and m1 must be apart"]
+    # R1 holds m9 and m17 after m1 left
+    for mid in ("m10", "m11"):
+        assert state.move(mid, "R1")["newViolations"] == []
+    assert state.move("m12", "R1")["newViolations"] == ["Room R1 over capacity"]
+    assert state.move("m12", None)["resolvedViolations"] == ["Room R1 over capacity"]
+    result = state.move("m6", "R0")
+    assert "m6 is pinned to room R0" in result["resolvedViolations"]
+
+
+def test_batch_with_swaps_is_checked_once_and_revertible():
+    members, config, rooms = _instance(capacities=(4,))
+    state = SolutionState(members, config, rooms)
+    start_score, start_violations = state.score, dict(state.violations)
+    start_rooms = _room_sets(state)
+
+    # Swapping whole rooms R1 and R2 passes through over-capacity states that never get reported
+    ops = [("swap", a["id"], b["id"]) for a, b in zip(rooms[1]["members"], rooms[2]["members"])]
+    ops.append(("move", "m1", "R0"))
+    result = state.apply_moves(ops)
+    assert result["newViolations"] == ["m0 and m1 must be apart"]
+    assert len(result["moves"]) == 2 * len(ops) - 1
+    assert abs(state.score - _reference_score(members, config, state.rooms())) < 1e-9
+    assert abs(result["scoreDelta"] - (state.score - start_score)) < 1e-9
+
+    state.revert(result["moves"])
+    assert state.score == start_score and state.violations == start_violations
+    assert _room_sets(state) == start_rooms
+
+
+def test_batch_with_unknown_id_changes_nothing():
+    members, config, rooms = _instance()
+    state = SolutionState(members, config, rooms)
+    before = _room_sets(state)
+    try:
+        state.apply_moves([("move", "m1", "R0"), ("move", "m2", "nowhere")])
+    except KeyError:
+        pass
+    assert _room_sets(state) == before
@@ -0,0 +1,101 @@
+import io
+import json
+import zipfile
+import pytest
+from app.assignments import build_rooms, load_rooms, save_solution
+from app.config import get_settings
+from app.models import ConfigModel, Dataset, Solution
+from app.services import exports
+from app.services.evaluate import forget_solution_state
+
+ROOMS = [{"id": f"R{r}", "label": f"Room {r}", "capacity": 3} for r in range(100)]
+
+
+@pytest.fixture(autouse=True)
+def solutions(session, monkeypatch, tmp_path):
+    members = {"members": [{"id": f"m{i}", "name": f"Member, {i}"} for i in range(250)]}
+    dataset = Dataset(label="d")
+    dataset.set_members(members)
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": ROOMS})))
+    session.commit()
+    for shift in range(2):
+        assignment = {f"m{i}": f"R{(i + shift) % 100}" for i in range(250)}
+        sol = save_solution(session, 1, 1, build_rooms(ROOMS, members, assignment), 0, 0)
+        forget_solution_state(sol.id)
+    monkeypatch.setattr(get_settings(), "data_dir", str(tmp_path))
+
+
+def test_csv_and_json_stream_the_same_documents_with_etags(client, session):
+    rooms = load_rooms(session, session.get(Solution, 1))
+
+    resp = client.get("/solution/1/export.json")
+    assert resp.status_code == 200 and resp.text == json.dumps(rooms)
+    tag = resp.headers["etag"]
+    assert tag == f'"json-1-v0-{exports.rooms_digest(rooms)}"'
+    assert client.get("/solution/1/export.json", headers={"If-None-Match": tag}).status_code == 304
+
+    resp = client.get("/solution/1/export.csv")
+    lines = resp.text.splitlines()
+    assert lines[0] == "Room,Capacity,Member ID,Member Name"
+    assert len(lines) == 251 and lines[1] == 'Room 0,3,m0,"Member, 0"'
+    assert client.get("/solution/1/export.csv", headers={"If-None-Match": f'W/{resp.headers["etag"]}'}).status_code == 304
+
+    client.post("/solution/1/moves", json={"moves": [{"memberId": "m0", "toRoomId": "R5"}]})
+    resp = client.get("/solution/1/export.csv", headers={"If-None-Match": tag})
+    assert resp.status_code == 200 and resp.headers["etag"].startswith('"csv-1-v1-')
+    assert client.get("/solution/9/export.csv").status_code == 404
+
+
+def test_pdf_is_rendered_once_per_version(client, monkeypatch, tmp_path):
+    renders = []
+    original = exports.render_pdf
+    monkeypatch.setattr(exports, "render_pdf", lambda *args: renders.append(args[1]) or original(*args))
+
+    first = client.get("/solution/1/export.pdf")
+    assert first.status_code == 200 and first.content.startswith(b"%PDF")
+    assert int(first.headers["content-length"]) == len(first.content)
+    assert client.get("/solution/1/export.pdf").content == first.content
+    assert client.get("/solution/1/export.pdf", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert renders == [1]
+
+    client.post("/solution/1/moves", json={"moves": [{"memberId": "m0", "toRoomId": "R5"}]})
+    tag = client.get("/solution/1/export.pdf").headers["etag"]
+    assert tag.startswith('"pdf-1-v1-')
+    assert renders == [1, 1]
+    digest = tag.strip('"').rsplit("-", 1)[1]
+    assert sorted(p.name for p in (tmp_path / "exports").iterdir()) == [f"solution_1_v1_{digest}.pdf"]
+
+
+def test_exports_left_by_an_earlier_database_are_not_served(client, tmp_path):
+    # Same solution id and version as before the database was recreated, other content
+    stale = tmp_path / "exports" / "solution_1_v0_0123456789abcdef.pdf"
+    stale.parent.mkdir()
+    stale.write_bytes(b"%PDF old database")
+    old_tag = '"pdf-1-v0-0123456789abcdef"'
+
+    resp = client.get("/solution/1/export.pdf", headers={"If-None-Match": old_tag})
+    assert resp.status_code == 200
+    assert resp.content.startswith(b"%PDF") and b"old database" not in resp.content
+    assert not stale.exists()
+    assert client.get("/solution/1/export.csv", headers={"If-None-Match": '"csv-1-v0"'}).status_code == 200
+
+
+def test_bulk_zip_streams_every_requested_export(client):
+    resp = client.get("/solution/export.zip", params={"ids": [2, 1], "formats": ["csv", "pdf", "json"]})
+    assert resp.status_code == 200 and resp.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
+        assert zf.namelist() == [
+            "solution_2.csv", "solution_2.json", "solution_2.pdf",
+            "solution_1.csv", "solution_1.json", "solution_1.pdf",
+        ]
+        assert zf.read("solution_1.csv").decode() == client.get("/solution/1/export.csv").text
+        assert zf.read("solution_2.pdf") == client.get("/solution/2/export.pdf").content
+
+    tag = resp.headers["etag"]
+    again = client.get("/solution/export.zip", params={"ids": [2, 1], "formats": ["csv", "pdf", "json"]},
+                       headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert client.get("/solution/export.zip", params={"ids": [1]}).headers["etag"] != tag
+    assert client.get("/solution/export.zip", params={"ids": [1, 7]}).status_code == 404
+    assert client.get("/solution/export.zip", params={"ids": [1], "formats": ["xls"]}).status_code == 422
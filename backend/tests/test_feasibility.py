@@ -0,0 +1,57 @@
+import json
+from app.services.feasibility import check_feasibility, explain_infeasibility
+from app.services.optimize import run_optimization
+
+
+def _members(*ids):
+    return {"members": [{"id": i, "name": i.upper()} for i in ids]}
+
+
+def _rooms(*caps):
+    return [{"id": f"R{k}", "label": f"R{k}", "capacity": c} for k, c in enumerate(caps, start=1)]
+
+
+def test_quick_checks_report_structural_problems():
+    config = {
+        "rooms": _rooms(2, 2, 2, 1),
+        "allowEmptyBeds": False,
+        "hard": {
+            "mustTogetherPairs": [["a", "b"], ["b", "c"]],
+            "mustApartPairs": [["a", "c"]],
+            "fixedRoomAssignments": {"d": "R1", "e": "R1", "f": "R1"},
+        },
+    }
+    report = check_feasibility(_members("a", "b", "c", "d", "e", "f"), config)
+
+    codes = {issue["code"] for issue in report["issues"]}
+    assert not report["feasible"]
+    assert codes == {"emptyBedsNotAllowed", "apartInGroup", "groupTooLarge", "pinnedOverflow"}
+    overflow = next(i for i in report["issues"] if i["code"] == "pinnedOverflow")
+    assert overflow["rooms"] == ["R1"] and set(overflow["members"]) == {"d", "e", "f"}
+
+
+def test_quick_checks_pass_on_sane_config():
+    config = {"rooms": _rooms(2, 2), "hard": {"mustTogetherPairs": [["a", "b"]]}}
+    assert check_feasibility(_members("a", "b", "c"), config)["feasible"]
+
+
+def test_minimal_conflict_from_cp_sat():
+    # Three mutually apart members but only two rooms: passes the quick checks
+    config = {
+        "rooms": _rooms(2, 2),
+        "hard": {"mustApartPairs": [["a", "b"], ["b", "c"], ["a", "c"]], "fixedRoomAssignments": {"d": "R2"}},
+    }
+    members = _members("a", "b", "c", "d")
+    assert check_feasibility(members, config)["feasible"]
+
+    conflict = explain_infeasibility(members, config)
+    assert {issue["code"] for issue in conflict} == {"mustApart"}
+    assert len(conflict) == 3
+
+
+def test_run_optimization_returns_report_instead_of_empty_rooms():
+    config = {"rooms": _rooms(1), "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0}}
+    result = run_optimization(_members("a", "b"), json.dumps(config), time_limit_sec=300)
+    assert result["status"] == "INFEASIBLE"
+    assert result["infeasibility"]["issues"][0]["code"] == "capacityShortfall"
+    assert result["hardViolations"]
@@ -0,0 +1,103 @@
+import random
+import numpy as np
+import pytest
+from app.services.coefficients import pair_coefficient_matrix, pair_coefficients
+from app.services.optimize import run_optimization, score_assignment
+from app.services.weights import build_pairwise_matrix, matrix_to_dict, save_pairwise_matrix
+
+
+def _instance(P=24, seed=3):
+    rng = random.Random(seed)
+    members = [
+        {
+            "id": f"m{i}",
+            "name": f"M{i}",
+            "requestedIds": [f"m{rng.randrange(P)}"],
+            "attributes": {"sleep": rng.choice(["Early", "Late"]), "messiness": rng.randint(1, 5)},
+            "rankedRoomSizes": {"2": rng.randint(1, 3), "3": rng.randint(1, 3)},
+        }
+        for i in range(P)
+    ]
+    ids, W = build_pairwise_matrix({"members": members}, dtype=np.float64)
+    rooms = [{"id": f"R{r}", "label": f"R{r}", "capacity": 2 + r % 2} for r in range(11)]
+    config = {
+        "rooms": rooms,
+        "pairwiseW": matrix_to_dict(ids, W),
+        "hard": {
+            "mustTogetherPairs": [["m0", "m1"], ["m1", "m2"]],
+            "mustApartPairs": [["m3", "m4"], ["m5", "m6"]],
+            "fixedRoomAssignments": {"m7": "R0", "m8": "R0"},
+        },
+        "weights": {"alpha": 0.3, "beta": 0.2, "gamma": 0.0},
+    }
+    return {"members": members}, config
+
+
+def _room_of_member(members, config, result):
+    idx = {m["id"]: p for p, m in enumerate(members["members"])}
+    room_idx = {room["id"]: r for r, room in enumerate(config["rooms"])}
+    return {idx[m["id"]]: room_idx[room["id"]] for room in result["rooms"] for m in room["members"]}
+
+
+def test_heuristic_respects_hard_constraints_and_reports_its_objective():
+    members, config = _instance()
+    result = run_optimization(members, config, time_limit_sec=1, engine="heuristic")
+
+    assert result["status"] == "FEASIBLE" and result["modelStats"]["engine"] == "heuristic"
+    room_of = {m["id"]: room["id"] for room in result["rooms"] for m in room["members"]}
+    assert len(room_of) == 24
+    assert room_of["m0"] == room_of["m1"] == room_of["m2"]
+    assert room_of["m3"] != room_of["m4"] and room_of["m5"] != room_of["m6"]
+    assert room_of["m7"] == room_of["m8"] == "R0"
+    assert all(len(room["members"]) <= room["capacity"] for room in result["rooms"])
+    # The incrementally tracked objective matches a full rescore
+    assert result["score"] == score_assignment(members["members"], config, _room_of_member(members, config, result))
+    # Pair stats as the exact model's presolve counts them
+    exact = run_optimization(members, config, time_limit_sec=1)
+    assert result["presolve"] == exact["presolve"] and result["presolve"]["pairsBefore"] > 0
+
+
+def test_heuristic_is_close_to_exact_and_hybrid_is_not_worse():
+    members, config = _instance()
+    exact = run_optimization(members, config, time_limit_sec=3)
+    heuristic = run_optimization(members, config, time_limit_sec=1, engine="heuristic")
+    hybrid = run_optimization(members, config, time_limit_sec=2, engine="hybrid")
+
+    assert heuristic["score"] >= 0.9 * exact["score"]
+    assert hybrid["score"] >= heuristic["score"]
+
+
+def test_heuristic_gives_up_when_it_cannot_place_everyone():
+    members = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(4)]}
+    config = {
+        "rooms": [{"id": f"R{r}", "label": f"R{r}", "capacity": 3} for r in range(2)],
+        "hard": {"mustTogetherPairs": [["m0", "m1"]], "mustApartPairs": [["m0", "m2"], ["m1", "m3"]]},
+    }
+    result = run_optimization(members, config, time_limit_sec=1, engine="heuristic")
+    assert result["status"] == "FEASIBLE"
+
+    # m2 and m3 both have to leave the pair's room, but may not share the other one
+    config["hard"]["mustApartPairs"].append(["m2", "m3"])
+    result = run_optimization(members, config, time_limit_sec=1, engine="heuristic")
+    assert result["status"] in ("UNKNOWN", "INFEASIBLE")
+    assert result["hardViolations"]
+
+
+def test_dense_coefficients_match_both_formats(tmp_path):
+    members, config = _instance(P=12)
+    ids = [m["id"] for m in members["members"]]
+    dense = pair_coefficient_matrix(ids, config)
+    for (i, j), c in pair_coefficients(ids, config["pairwiseW"]).items():
+        assert dense[i, j] == dense[j, i] == c
+    assert np.count_nonzero(np.triu(dense, 1)) == len(pair_coefficients(ids, config["pairwiseW"]))
+
+    _, W = build_pairwise_matrix(members)
+    path = save_pairwise_matrix(str(tmp_path / "w.npy"), W)
+    binary = {"pairwiseFile": path, "pairwiseIds": ids}
+    assert np.array_equal(pair_coefficient_matrix(ids, binary), dense)
+
+
+def test_unknown_engine_is_rejected():
+    members, config = _instance(P=4)
+    with pytest.raises(ValueError):
+        run_optimization(members, config, engine="annealing")
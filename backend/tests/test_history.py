@@ -0,0 +1,116 @@
+import json
+import random
+import pytest
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from sqlmodel import select
+from app.assignments import build_rooms, load_assignment, save_solution
+from app.models import ConfigModel, Dataset, Move, SolutionSnapshot
+from app.routers.solution import apply_moves, get_solution, redo, solution_at, undo
+from app.schemas import BatchMoveRequest
+from app.services import history
+from app.services.evaluate import forget_solution_state
+
+ROOMS = [{"id": f"R{r}", "label": f"R{r}", "capacity": 3} for r in range(4)]
+
+
+def _solution(session):
+    members = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(8)]}
+    dataset = Dataset(label="d")
+    dataset.set_members(members)
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": ROOMS})))
+    session.commit()
+    start = {f"m{i}": f"R{i % 4}" for i in range(8)}
+    sol = save_solution(session, 1, 1, build_rooms(ROOMS, members, start), 0.0, 0)
+    forget_solution_state(sol.id)
+    return sol.id, start
+
+
+def _move(session, sid, *pairs):
+    ops = [{"memberId": mid, "toRoomId": rid} for mid, rid in pairs]
+    return apply_moves(sid, BatchMoveRequest(moves=ops), session)
+
+
+def _at(session, sid, seq):
+    rooms = solution_at(sid, seq, session)["rooms"]
+    return {m["id"]: room["id"] for room in rooms for m in room["members"]}
+
+
+def test_undo_redo_move_the_head_and_keep_the_log(session, monkeypatch):
+    sid, start = _solution(session)
+    assert _move(session, sid, ("m0", "R1"), ("m1", "R2"))["moveSeq"] == 2
+    after_first = load_assignment(session, sid)
+    assert _move(session, sid, ("m2", "R3"))["moveSeq"] == 3
+
+    out = undo(sid, session)
+    assert out["moveSeq"] == 2 and load_assignment(session, sid) == after_first
+    out = undo(sid, session)
+    assert out["moveSeq"] == 0 and load_assignment(session, sid) == start
+    with pytest.raises(HTTPException) as exc:
+        undo(sid, session)
+    assert exc.value.status_code == 409
+
+    assert redo(sid, session)["moveSeq"] == 2
+    assert load_assignment(session, sid) == after_first
+    assert get_solution(sid, session).moveSeq == 2
+    # A new edit after an undo starts a branch; redo follows it, not the old one
+    assert _move(session, sid, ("m3", "R0"))["moveSeq"] == 4
+    with pytest.raises(HTTPException):
+        redo(sid, session)
+    undo(sid, session)
+    assert redo(sid, session)["moveSeq"] == 4
+    assert len(session.exec(select(Move)).all()) == 4
+
+
+def test_replay_matches_every_point_of_a_branching_history(session, monkeypatch):
+    monkeypatch.setattr(history, "SNAPSHOT_EVERY", 5)
+    sid, start = _solution(session)
+    rng = random.Random(3)
+    expected = {0: dict(start)}
+    head = 0
+    for step in range(60):
+        if head and rng.random() < 0.2:
+            head = undo(sid, session)["moveSeq"]
+            continue
+        current = dict(expected[head])
+        pairs = []
+        for _ in range(rng.randint(1, 3)):
+            mid = f"m{rng.randrange(8)}"
+            rid = rng.choice([room["id"] for room in ROOMS if room["id"] != current[mid]])
+            pairs.append((mid, rid))
+            current[mid] = rid
+        seq = _move(session, sid, *pairs)["moveSeq"]
+        # Every move of the batch is its own point in time
+        state = dict(expected[head])
+        for k, (mid, rid) in enumerate(pairs):
+            state[mid] = rid
+            expected[seq - len(pairs) + 1 + k] = dict(state)
+        head = seq
+        assert load_assignment(session, sid) == current
+
+    snapshots = session.exec(select(SolutionSnapshot)).all()
+    assert len(snapshots) > 5 and {s.seq for s in snapshots} >= {0}
+    for seq, assignment in expected.items():
+        assert _at(session, sid, seq) == assignment
+    with pytest.raises(HTTPException) as exc:
+        solution_at(sid, max(expected) + 1, session)
+    assert exc.value.status_code == 404
+
+
+def test_replay_reads_only_moves_since_the_nearest_snapshot(session, monkeypatch):
+    monkeypatch.setattr(history, "SNAPSHOT_EVERY", 10)
+    sid, _ = _solution(session)
+    for k in range(95):
+        _move(session, sid, ("m0", f"R{(k + 1) % 4}"))
+    target = session.exec(select(Move).where(Move.seq == 95)).one()
+    assert target.base == 90 and target.depth == 95
+    assert _at(session, sid, 95) == load_assignment(session, sid)
+
+
+def test_a_reused_move_number_is_refused(session):
+    sid, _ = _solution(session)
+    _move(session, sid, ("m0", "R1"))
+    session.add(Move(solution_id=sid, member_id="m1", seq=1, prev=0, batch=1, base=0))
+    with pytest.raises(IntegrityError):
+        session.commit()
@@ -0,0 +1,170 @@
+import json
+import random
+import threading
+import time
+import pytest
+from app.services.jobs import MAX_EVENTS, Job, JobManager
+
+
+def _wait(job, timeout=60):
+    deadline = time.time() + timeout
+    while not (job.finished and job.drained):
+        assert time.time() < deadline, f"job still {job.status}"
+        time.sleep(0.1)
+
+
+@pytest.fixture(scope="module")
+def manager():
+    mgr = JobManager(max_workers=1)
+    yield mgr
+    mgr.shutdown()
+
+
+def test_job_runs_and_reports_progress(manager):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}, {"id": "c", "name": "C"}]}
+    config = {
+        "rooms": [{"id": "R1", "label": "R1", "capacity": 2}, {"id": "R2", "label": "R2", "capacity": 1}],
+        "pairwiseW": {"a": {"b": 3.0}},
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+    }
+    done = []
+
+    job = manager.submit(members, json.dumps(config), 5, on_done=done.append)
+    _wait(job)
+
+    assert job.status == "done"
+    assert done == [job]
+    assert job.result["score"] == 3.0
+    assert job.events and job.events[-1]["score"] == 3.0
+    assert {"bound", "gap", "elapsedMs"} <= set(job.events[-1])
+
+
+def test_cancel_stops_running_search(manager):
+    rng = random.Random(1)
+    ids = [f"m{i}" for i in range(60)]
+    members = {"members": [{"id": i, "name": i} for i in ids]}
+    config = {
+        "rooms": [{"id": f"R{r}", "label": f"R{r}", "capacity": 3} for r in range(20)],
+        "pairwiseW": {i: {j: rng.uniform(-3, 3) for j in rng.sample(ids, 10) if j != i} for i in ids},
+    }
+
+    job = manager.submit(members, json.dumps(config), 120)
+    deadline = time.time() + 60
+    while job.status != "running":
+        assert time.time() < deadline
+        time.sleep(0.1)
+    started = time.time()
+    manager.cancel(job.id)
+    _wait(job)
+
+    assert job.status == "cancelled"
+    assert time.time() - started < 30
+
+
+def test_jobs_with_the_same_key_are_shared(manager):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]}
+    config = json.dumps({"rooms": [{"id": "R1", "label": "R1", "capacity": 2}]})
+
+    first = manager.submit(members, config, 5, key="same")
+    second = manager.submit(members, config, 5, key="same")
+    other = manager.submit(members, config, 5, key="other")
+    assert second is first and other is not first
+    _wait(first)
+    _wait(other)
+
+    # Once finished the key is released and a new submit runs again
+    third = manager.submit(members, config, 5, key="same")
+    assert third is not first
+    _wait(third)
+    assert third.status == "done"
+
+    cached = manager.completed(first.result, solution_id=7)
+    assert cached.finished and cached.drained and manager.get(cached.id).solution_id == 7
+
+
+def test_inline_runs_and_submitted_jobs_share_one_registry(manager):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]}
+    config = json.dumps({"rooms": [{"id": "R1", "label": "R1", "capacity": 2}]})
+    release = threading.Event()
+    calls, done = [], []
+
+    def solve(job):
+        calls.append(job.id)
+        release.wait(30)
+        return {"score": 1.0}
+
+    inline = threading.Thread(target=lambda: manager.run_inline("shared", solve, on_done=done.append))
+    inline.start()
+    deadline = time.time() + 10
+    while not calls:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    # A job submitted while the request solves joins it instead of solving again
+    joined = manager.submit(members, config, 5, key="shared")
+    assert joined.id == calls[0] and joined.status == "running"
+    release.set()
+    inline.join(10)
+    assert joined.status == "done" and done == [joined] and joined.result == {"score": 1.0}
+
+    # A request arriving while a submitted job runs waits for that job
+    running = manager.submit(members, config, 5, key="pooled")
+    waited = manager.run_inline("pooled", lambda job: calls.append("again"))
+    assert waited is running and waited.status == "done" and calls == [joined.id]
+
+
+def test_sweep_runs_as_a_job(manager):
+    members = {"members": [{"id": "a", "name": "A", "requestedIds": ["b"]}, {"id": "b", "name": "B"}, {"id": "c", "name": "C"}]}
+    config = {
+        "rooms": [{"id": "R1", "label": "R1", "capacity": 2}, {"id": "R2", "label": "R2", "capacity": 1}],
+        "pairwiseW": {"a": {"b": 3.0}},
+    }
+    points = [{"alpha": 0.0, "beta": 0.0}, {"alpha": 1.0, "beta": 0.5}]
+
+    job = manager.submit_sweep(members, config, points, 5, cores=1)
+    _wait(job)
+
+    assert job.kind == "sweep" and job.status == "done"
+    assert [run["weights"] for run in job.result["runs"]] == points
+    assert [ev["weights"] for ev in job.events] == points
+    assert all(ev["status"] == "OPTIMAL" for ev in job.events)
+
+
+def test_cancelled_sweep_skips_the_remaining_points(manager):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]}
+    config = {"rooms": [{"id": "R1", "label": "R1", "capacity": 2}]}
+    points = [{"alpha": a / 10, "beta": 0.0} for a in range(5)]
+
+    job = manager.submit_sweep(members, config, points, 5, cores=1)
+    manager.cancel(job.id)
+    _wait(job)
+
+    assert job.status == "cancelled"
+    assert job.result is None or all(run["status"] == "CANCELLED" for run in job.result["runs"])
+
+
+def test_infeasible_sweep_fails_with_the_reason(manager):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]}
+    config = {"rooms": [{"id": "R1", "label": "R1", "capacity": 1}]}
+
+    job = manager.submit_sweep(members, config, [{"alpha": 0.0, "beta": 0.0}], 5, cores=1)
+    _wait(job)
+
+    assert job.status == "failed" and job.error
+
+
+def test_events_are_capped_and_read_by_absolute_position():
+    job = Job(id="j")
+    for k in range(3):
+        job.add_event({"n": k})
+    first, position = job.events_since(0)
+    assert [ev["n"] for ev in first] == [0, 1, 2] and position == 3
+
+    for k in range(3, MAX_EVENTS + 10):
+        job.add_event({"n": k})
+    assert len(job.events) == MAX_EVENTS and job.events[-1]["n"] == MAX_EVENTS + 9
+    # A reader that fell behind gets what is still kept, then resumes where it stopped
+    missed, position = job.events_since(position)
+    assert [ev["n"] for ev in missed] == list(range(10, MAX_EVENTS + 10))
+    job.add_event({"n": "last"})
+    assert job.events_since(position) == ([{"n": "last"}], MAX_EVENTS + 11)
+    assert job.events_since(position + 1) == ([], MAX_EVENTS + 11)
@@ -0,0 +1,106 @@
+import json
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+from app.assignments import build_rooms, load_assignment, save_solution
+from app.models import ConfigModel, Dataset, Move, Solution
+from app.routers.solution import apply_move, apply_moves
+from app.schemas import ApplyMoveRequest, BatchMoveRequest
+from app.services import live
+from app.services.evaluate import forget_solution_state
+
+ROOMS = [{"id": f"R{r}", "label": f"R{r}", "capacity": 4} for r in range(3)]
+
+
+@pytest.fixture(autouse=True)
+def solution(session):
+    members = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(6)]}
+    dataset = Dataset(label="d")
+    dataset.set_members(members)
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": ROOMS})))
+    session.commit()
+    sol = save_solution(session, 1, 1, build_rooms(ROOMS, members, {f"m{i}": f"R{i % 3}" for i in range(6)}), 0, 0)
+    forget_solution_state(sol.id)
+    return sol.id
+
+
+def _moves(*pairs, **extra):
+    return {"type": "moves", "moves": [{"memberId": m, "toRoomId": r} for m, r in pairs], **extra}
+
+
+def test_edits_reach_every_client_as_compact_deltas(client, session):
+    with client.websocket_connect("/solution/1/live") as a, client.websocket_connect("/solution/1/live") as b:
+        assert a.receive_json() == {"type": "hello", "version": 0, "moveSeq": 0, "score": 0.0}
+        b.receive_json()
+
+        a.send_json(_moves(("m0", "R1"), requestId="r1", baseVersion=0))
+        delta = a.receive_json()
+        assert a.receive_json() == {"type": "ack", "requestId": "r1", "version": 1, "moveSeq": 1}
+        assert b.receive_json() == delta
+        assert delta["type"] == "delta" and delta["version"] == 1 and delta["moves"] == [["m0", "R0", "R1"]]
+        assert set(delta) == {"type", "version", "moveSeq", "moves", "scoreDelta", "score",
+                              "newViolations", "resolvedViolations"}
+
+        # REST edits and undo are broadcast too
+        assert client.post("/solution/1/moves", json={"moves": [{"memberId": "m1", "toRoomId": "R0"}]}).status_code == 200
+        assert a.receive_json()["moves"] == [["m1", "R1", "R0"]]
+        b.receive_json()
+        b.send_json({"type": "undo", "requestId": "u"})
+        assert b.receive_json()["moves"] == [["m1", "R0", "R1"]]
+        assert b.receive_json()["type"] == "ack"
+        assert a.receive_json()["version"] == 3
+
+    assert load_assignment(session, 1)["m0"] == "R1" and load_assignment(session, 1)["m1"] == "R1"
+
+
+def test_concurrent_edits_to_the_same_member_are_rejected(client):
+    with client.websocket_connect("/solution/1/live") as a, client.websocket_connect("/solution/1/live") as b:
+        a.receive_json(), b.receive_json()
+        a.send_json(_moves(("m0", "R2"), requestId="a", baseVersion=0))
+        a.receive_json(), a.receive_json(), b.receive_json()
+
+        # b still thinks it is at version 0
+        b.send_json(_moves(("m0", "R1"), requestId="b1", baseVersion=0))
+        reject = b.receive_json()
+        assert reject["type"] == "reject" and reject["status"] == 409
+        assert reject["detail"] == {"conflict": "members", "memberIds": ["m0"], "version": 1}
+        # Other members rebase onto the newer version
+        b.send_json(_moves(("m3", "R1"), requestId="b2", baseVersion=0))
+        assert b.receive_json()["version"] == 2
+        assert b.receive_json() == {"type": "ack", "requestId": "b2", "version": 2, "moveSeq": 2}
+
+        b.send_json(_moves(("m4", "R0"), requestId="b3", baseVersion=7))
+        assert b.receive_json()["detail"]["conflict"] == "stale"
+        b.send_text("not json")
+        assert b.receive_json()["status"] == 400
+
+    resp = client.post("/solution/1/moves", json={"moves": [{"memberId": "m3", "toRoomId": "R0"}], "baseVersion": 1})
+    assert resp.status_code == 409 and resp.json()["detail"]["memberIds"] == ["m3"]
+
+
+def test_history_gaps_force_a_resync():
+    hub = live.LiveHub()
+    hub.publish(1, 5, ["m0"], {"type": "delta"})
+    hub.publish(1, 6, ["m1"], {"type": "delta"})
+    assert hub.touched_since(1, 4, 6) == {"m0", "m1"}
+    assert hub.touched_since(1, 5, 6) == {"m1"}
+    assert hub.touched_since(1, 3, 6) is None
+    assert hub.touched_since(2, 0, 1) is None
+
+
+def test_single_moves_see_edits_committed_by_another_session(db_engine, session):
+    with Session(db_engine) as a, Session(db_engine) as b:
+        a.get(Solution, 1)  # a now holds version 0
+        apply_moves(1, BatchMoveRequest(moves=[{"memberId": "m0", "toRoomId": "R1"}]), b)
+        out = apply_move(1, ApplyMoveRequest(memberId="m1", toRoomId="R2"), a)
+        assert out["version"] == 2 and out["moveSeq"] == 2
+
+        with pytest.raises(HTTPException) as exc:
+            apply_move(1, ApplyMoveRequest(memberId="m0", toRoomId="R0", baseVersion=0), a)
+        assert exc.value.status_code == 409 and exc.value.detail["memberIds"] == ["m0"]
+
+    session.expire_all()
+    assert session.get(Solution, 1).version == 2
+    moves = session.exec(select(Move.seq, Move.prev).order_by(Move.seq)).all()
+    assert [tuple(m) for m in moves] == [(1, 0), (2, 1)]
@@ -0,0 +1,60 @@
+import pytest
+from app.services.neighborhood import reoptimize_neighborhood
+
+
+def _setup():
+    ids = [f"m{i}" for i in range(8)]
+    members = {"members": [{"id": i, "name": i.upper()} for i in ids]}
+    rooms_spec = [{"id": f"R{r}", "label": f"R{r}", "capacity": 2} for r in range(4)]
+    config = {
+        "rooms": rooms_spec,
+        # m0 wants m2, m1 wants m3; m4 and m5 would rather be with m6 and m7
+        "pairwiseW": {"m0": {"m2": 3.0}, "m1": {"m3": 3.0}, "m4": {"m6": 3.0}, "m5": {"m7": 3.0}},
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+    }
+    rooms = [
+        {**rooms_spec[0], "members": [members["members"][0], members["members"][1]]},
+        {**rooms_spec[1], "members": [members["members"][2], members["members"][3]]},
+        {**rooms_spec[2], "members": [members["members"][4], members["members"][5]]},
+        {**rooms_spec[3], "members": [members["members"][6], members["members"][7]]},
+    ]
+    return members, config, rooms
+
+
+def _ids(room):
+    return {m["id"] for m in room["members"]}
+
+
+def test_only_selected_rooms_change():
+    members, config, rooms = _setup()
+
+    result = reoptimize_neighborhood(members, config, rooms, ["R0", "R1"], [], time_limit_sec=5)
+
+    assert result["neighborhood"] == {"rooms": 2, "members": 4, "freeMembers": 4}
+    assert {frozenset(_ids(r)) for r in result["rooms"][:2]} == {frozenset({"m0", "m2"}), frozenset({"m1", "m3"})}
+    # Untouched rooms are carried over as-is
+    assert _ids(result["rooms"][2]) == {"m4", "m5"}
+    assert _ids(result["rooms"][3]) == {"m6", "m7"}
+    assert result["scoreDelta"] == 6.0
+
+
+def test_must_together_partner_pulls_room_in():
+    members, config, rooms = _setup()
+    config["hard"] = {"mustTogetherPairs": [["m4", "m6"]]}
+
+    # Only m4 is free and R3 is full with m6 and m7 pinned: no bed to join m6 in
+    result = reoptimize_neighborhood(members, config, rooms, [], ["m4"], time_limit_sec=5)
+    assert result["status"] == "INFEASIBLE"
+
+    # Freeing m7 as well lets the two swap
+    result = reoptimize_neighborhood(members, config, rooms, [], ["m4", "m7"], time_limit_sec=5)
+    assert _ids(result["rooms"][3]) == {"m4", "m6"}
+    assert _ids(result["rooms"][2]) == {"m5", "m7"}
+
+
+def test_assigned_room_missing_from_the_config_is_named():
+    members, config, rooms = _setup()
+    config = {**config, "rooms": config["rooms"][1:]}
+
+    with pytest.raises(ValueError, match="Room R0"):
+        reoptimize_neighborhood(members, config, rooms, ["R0"], [], time_limit_sec=5)
@@ -1,4 +1,5 @@
-from app.services.optimize import run_optimization
+from app.services.coefficients import pair_coefficients
+from app.services.optimize import run_optimization, room_classes
 from app.services.weights import build_pairwise_weights
 
 
@@ -30,3 +31,104 @@ def test_optimize_tiny():
     r1_members = [m["id"] for m in result["rooms"][0]["members"]]
     assert set(r1_members) == {"a", "b"}
     assert result["rooms"][1]["members"][0]["id"] == "c"
+
+
+def test_pair_coefficients_sparse_and_threshold():
+    ids = ["a", "b", "c", "d"]
+    W = {"a": {"b": 1.5, "c": 0.0}, "b": {"a": 1.5}, "c": {"d": 0.05}, "d": {"c": -0.2}}
+
+    pairs = pair_coefficients(ids, W)
+    assert pairs == {(0, 1): 300, (2, 3): -15}
+
+    # Near-zero combined weights are dropped by the threshold
+    assert pair_coefficients(ids, W, threshold=0.5) == {(0, 1): 300}
+
+
+def test_optimize_model_scales_with_pairs():
+    members_doc = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(20)]}
+    rooms = [{"id": f"R{r}", "label": f"R{r}", "capacity": 2} for r in range(10)]
+    config = {
+        "rooms": rooms,
+        "pairwiseW": {"m0": {"m1": 3.0}},
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+    }
+
+    result = run_optimization(members_doc, __import__("json").dumps(config), time_limit_sec=5)
+
+    assert result["modelStats"]["pairs"] == 1
+    # x vars plus one co-location var per room for the single weighted pair
+    assert result["modelStats"]["variables"] == 20 * 10 + 10
+    together = [r for r in result["rooms"] if {"m0", "m1"} <= {m["id"] for m in r["members"]}]
+    assert len(together) == 1
+
+
+def test_room_classes_skip_pinned_and_distinct_rooms():
+    rooms = [
+        {"id": "A", "label": "A", "capacity": 2},
+        {"id": "B", "label": "B", "capacity": 2},
+        {"id": "C", "label": "C", "capacity": 3},
+        {"id": "D", "label": "D", "capacity": 2},
+        {"id": "E", "label": "E", "capacity": 2, "floor": 2},
+    ]
+    assert room_classes(rooms) == [[0, 1, 3]]
+    assert room_classes(rooms, exclude={1, 3}) == []
+
+
+def test_symmetry_breaking_keeps_optimum():
+    members_doc = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(6)]}
+    rooms = [{"id": f"R{r}", "label": f"R{r}", "capacity": 2} for r in range(3)]
+    W = {"m0": {"m5": 3.0}, "m1": {"m4": 3.0}, "m2": {"m3": 3.0}}
+    config = {
+        "rooms": rooms,
+        "allowEmptyBeds": False,
+        "pairwiseW": W,
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+        "symmetryBreaking": True,
+    }
+
+    result = run_optimization(members_doc, __import__("json").dumps(config), time_limit_sec=5)
+
+    assert result["modelStats"]["roomClasses"] == 1
+    assert result["score"] == 9.0
+    assert {m["id"] for m in result["rooms"][0]["members"]} == {"m0", "m5"}
+
+
+def _four_members():
+    return {"members": [{"id": i, "name": i.upper()} for i in ["a", "b", "c", "d"]]}
+
+
+def _two_rooms_config(W):
+    return {
+        "rooms": [{"id": "R1", "label": "R1", "capacity": 2}, {"id": "R2", "label": "R2", "capacity": 2}],
+        "pairwiseW": W,
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+    }
+
+
+def test_warm_start_minimizes_moves():
+    # Every split scores the same, so the move-minimizing phase must keep the base
+    base = {"a": "R2", "b": "R1", "c": "R1", "d": "R2"}
+    config = _two_rooms_config({})
+
+    result = run_optimization(
+        _four_members(), __import__("json").dumps(config), time_limit_sec=5,
+        base_assignment=base, minimize_moves=True,
+    )
+
+    assert result["moved"] == 0
+    assert {m["id"] for m in result["rooms"][0]["members"]} == {"b", "c"}
+
+
+def test_warm_start_locked_room_stays_put():
+    base = {"a": "R1", "c": "R1", "b": "R2", "d": "R2"}
+    config = _two_rooms_config({"a": {"b": 3.0}})
+
+    unlocked = run_optimization(_four_members(), __import__("json").dumps(config), time_limit_sec=5, base_assignment=base)
+    locked = run_optimization(
+        _four_members(), __import__("json").dumps(config), time_limit_sec=5,
+        base_assignment=base, locked_room_ids=["R1"],
+    )
+
+    assert unlocked["score"] == 3.0 and unlocked["moved"] > 0
+    assert {m["id"] for m in locked["rooms"][0]["members"]} == {"a", "c"}
+    assert locked["moved"] == 0
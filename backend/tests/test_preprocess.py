@@ -25,3 +25,100 @@ def test_preprocess_basic():
     assert set(m["avoidWith"]) == {"Eve"}
     assert m["rankedRoomSizes"]["2"] == 1
     assert m["rankedRoomSizes"]["3"] == 2
+
+
+def _reference_preprocess(df):
+    # The original row-by-row implementation, kept to pin the vectorized output
+    import re
+    from app.services.preprocess import _title_case_name, _split_multi, _coerce_int
+
+    cols = {c.lower().strip(): c for c in df.columns}
+
+    def pick(*candidates):
+        for cand in candidates:
+            for k, orig in cols.items():
+                if cand in k:
+                    return orig
+        return None
+
+    name_col = pick("name") or "Name"
+    year_col, req_col, dislike_col = pick("year"), pick("roommate request", "roommate"), pick("avoid", "dislike")
+    messiness_col, bother_col, sleep_col = pick("messiness"), pick("bother"), pick("sleep")
+    temp_col, room_use_col = pick("temp"), pick("room use", "use")
+    enforce_col = pick("wants preference enforced", "enforce")
+    rank_cols = {"2": pick("2p rank", "rank 2"), "3": pick("3p rank", "rank 3"), "4": pick("4p rank", "rank 4")}
+    members = []
+    for _, row in df.iterrows():
+        name_raw = str(row.get(name_col, "")).strip()
+        if not name_raw:
+            continue
+        name = _title_case_name(name_raw)
+        ranked = {}
+        for size, col in rank_cols.items():
+            v = _coerce_int(row.get(col)) if col else None
+            if v is not None:
+                ranked[size] = v
+        attributes = {}
+        if year_col:
+            attributes["year"] = str(row.get(year_col, "")).strip()
+        if messiness_col:
+            attributes["messiness"] = _coerce_int(row.get(messiness_col), default=3) or 3
+        if bother_col:
+            attributes["bother"] = str(row.get(bother_col, "")).strip()
+        if sleep_col:
+            attributes["sleep"] = str(row.get(sleep_col, "")).strip().title()
+        if temp_col:
+            attributes["temperature"] = str(row.get(temp_col, "")).strip().title()
+        if room_use_col:
+            attributes["room_use"] = str(row.get(room_use_col, "")).strip().title()
+        if enforce_col:
+            attributes["enforce"] = str(row.get(enforce_col, "")).strip().lower() in ("yes", "true", "1")
+        members.append({
+            "id": re.sub(r"[^a-z0-9]", "", name.lower()),
+            "name": name,
+            "year": attributes.get("year"),
+            "attributes": attributes,
+            "rankedRoomSizes": ranked,
+            "requestedWith": _split_multi(str(row.get(req_col, ""))) if req_col else [],
+            "avoidWith": _split_multi(str(row.get(dislike_col, ""))) if dislike_col else [],
+        })
+    return {"members": members}
+
+
+def test_vectorized_preprocess_matches_row_loop():
+    import random
+    rng = random.Random(7)
+    first = ["alice", "BOB", "carol", "o'neil", "dave-ray", "  eve  "]
+    rows = []
+    for i in range(300):
+        name = f"{rng.choice(first)}  {rng.choice(first)} {i}" if rng.random() > 0.05 else rng.choice(["", "   ", None])
+        rows.append({
+            "Name": name,
+            "Year": rng.choice(["SR", " jr ", None]),
+            "Roommate Requests": rng.choice(["", None, "bob ; Carol\n dave,,bob", "ALICE  smith", " ; "]),
+            "Avoid": rng.choice(["", "eve", None]),
+            "Messiness Rating": rng.choice([1, 4, "x", None, " 2 ", 0]),
+            "Sleep Schedule": rng.choice(["late", "EARLY ", None]),
+            "Temperature Preference": rng.choice(["cool", "warm"]),
+            "Room Use": rng.choice(["study", ""]),
+            "Wants Preference Enforced": rng.choice(["Yes", " true", "no", None]),
+            "2p Rank": rng.choice([1, 2, None, "3", "2.0"]),
+            "3p Rank": rng.choice([1.0, None, 3]),
+        })
+    df = pd.DataFrame(rows)
+    assert preprocess_dataframe(df) == _reference_preprocess(df)
+
+
+def test_preprocess_csv_reads_blanks_as_empty(tmp_path):
+    from app.services.preprocess import preprocess_csv
+    path = tmp_path / "members.csv"
+    path.write_text(
+        "Name,Roommate Requests,Sleep Schedule,2p Rank\n"
+        "alice smith,bob,late,1\n"
+        ",carol,early,2\n"
+        "bob jones,,,\n"
+    )
+    members = preprocess_csv(str(path), chunk_rows=2)["members"]
+    assert [m["name"] for m in members] == ["Alice Smith", "Bob Jones"]
+    assert members[1]["requestedWith"] == [] and members[1]["attributes"]["sleep"] == ""
+    assert members[0]["rankedRoomSizes"] == {"2": 1} and members[1]["rankedRoomSizes"] == {}
@@ -0,0 +1,66 @@
+import json
+from app.services.presolve import presolve
+from app.services.optimize import run_optimization
+
+
+ROOMS = [
+    {"id": "R1", "label": "R1", "capacity": 3},
+    {"id": "R2", "label": "R2", "capacity": 2},
+]
+
+
+def test_presolve_contracts_groups_and_folds_pins():
+    ids = ["a", "b", "c", "d", "e"]
+    hard = {
+        "mustTogetherPairs": [["a", "b"], ["b", "c"]],
+        "fixedRoomAssignments": {"d": "R2"},
+        "mustApartPairs": [["a", "e"]],
+    }
+    pairs = {(0, 1): 300, (0, 3): 50, (3, 4): 100, (2, 4): -20}
+
+    pre = presolve(ids, ROOMS, hard, pairs)
+
+    assert pre["units"] == [[0, 1, 2], [3], [4]]
+    assert pre["sizes"] == [3, 1, 1]
+    assert pre["pinned"] == {1: 1}
+    assert pre["free"] == [0, 2]
+    assert pre["roomLoad"] == [0, 1]
+    # a-b is inside the group; d is pinned so its pairs become room-specific terms
+    assert pre["constant"] == 300
+    assert pre["linear"] == {(0, 1): 50, (1, 1): 100}
+    assert pre["pairs"] == {(0, 1): -20}
+    assert pre["apart"] == {(0, 1)}
+    # The 3-member group no longer fits next to d in R2
+    assert (0, 1) in pre["forbidden"]
+    assert pre["stats"]["assignmentVarsBefore"] == 10
+    assert pre["stats"]["assignmentVarsAfter"] == 4
+    assert not pre["conflicts"]
+
+
+def test_presolve_reports_conflicts():
+    ids = ["a", "b"]
+    hard = {
+        "mustTogetherPairs": [["a", "b"]],
+        "mustApartPairs": [["a", "b"]],
+        "fixedRoomAssignments": {"a": "R1", "b": "R2"},
+    }
+    pre = presolve(ids, ROOMS, hard, {})
+    assert len(pre["conflicts"]) == 2
+
+
+def test_optimize_with_groups_and_pins():
+    members_doc = {"members": [{"id": i, "name": i.upper()} for i in ["a", "b", "c", "d", "e"]]}
+    config = {
+        "rooms": ROOMS,
+        "allowEmptyBeds": False,
+        "pairwiseW": {"d": {"e": 2.0}, "a": {"e": 1.0}},
+        "hard": {"mustTogetherPairs": [["a", "b"], ["b", "c"]], "fixedRoomAssignments": {"d": "R2"}},
+        "weights": {"alpha": 0.0, "beta": 0.0, "gamma": 0.0},
+    }
+
+    result = run_optimization(members_doc, json.dumps(config), time_limit_sec=5)
+
+    assert [m["id"] for m in result["rooms"][0]["members"]] == ["a", "b", "c"]
+    assert [m["id"] for m in result["rooms"][1]["members"]] == ["d", "e"]
+    assert result["score"] == 2.0
+    assert result["presolve"]["mergedGroups"] == 1
@@ -0,0 +1,46 @@
+from app.services.resolve import NameIndex, resolve_requests
+from app.services.weights import build_pairwise_matrix
+
+
+def _member(name, requested=(), avoid=()):
+    return {
+        "id": name.replace(" ", "").lower(),
+        "name": name,
+        "attributes": {},
+        "requestedWith": list(requested),
+        "avoidWith": list(avoid),
+    }
+
+
+def test_lookup_exact_fuzzy_and_ambiguous():
+    index = NameIndex([_member(n) for n in ("Bob Jones", "Robert Jones", "Alex Smith", "Alex Stone", "Eve Stone")])
+    assert index.lookup("  bob   JONES ") == ("exact", ["bobjones"], 1.0)
+    assert index.lookup("Bob Jnes")[:2] == ("fuzzy", ["bobjones"])
+    assert index.lookup("Eve")[:2] == ("fuzzy", ["evestone"])
+    # Close to two people, or to nobody
+    assert index.lookup("Rob Jones")[0] == "unresolved"
+    assert index.lookup("Alex")[0] == "unresolved"
+    assert index.lookup("Zed Quinn")[0] == "unresolved"
+    # Members never resolve to themselves
+    assert index.lookup("Eve Stone", exclude="evestone")[0] == "unresolved"
+
+
+def test_resolved_requests_drive_weights():
+    doc = {"members": [
+        _member("Alice Smith", requested=["Bob Jnes"], avoid=["Carol"]),
+        _member("Bob Jones", requested=["alice smith", "Nobody Here"]),
+        _member("Carol Lee"),
+    ]}
+    resolved = resolve_requests(doc)
+    alice, bob, _ = resolved["members"]
+    assert alice["requestedIds"] == ["bobjones"] and alice["avoidIds"] == ["carollee"]
+    assert bob["requestedIds"] == ["alicesmith"]
+    report = resolved["resolution"]
+    assert (report["exact"], report["fuzzy"], report["unresolved"]) == (1, 2, 1)
+    assert report["unresolvedNames"] == [{"memberId": "bobjones", "field": "requestedWith", "name": "Nobody Here"}]
+
+    # The typo used to be dropped silently; with ids it counts
+    _, before = build_pairwise_matrix(doc)
+    _, after = build_pairwise_matrix(resolved)
+    assert before[0, 1] == 0 and after[0, 1] == 3.0
+    assert after[0, 2] == -3.0 and after[1, 0] == 3.0
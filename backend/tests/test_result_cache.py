@@ -0,0 +1,100 @@
+import threading
+import time
+import numpy as np
+import pytest
+from app.services.result_cache import ResultCache, result_key
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_is_canonical_and_covers_every_input(tmp_path):
+    members = {"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]}
+    config = {"rooms": [{"id": "R", "capacity": 2}], "weights": {"alpha": 0.2, "beta": 0.1}}
+    base = result_key(members, config, {"timeLimitSec": 10})
+
+    reordered = {"weights": {"beta": 0.1, "alpha": 0.2}, "rooms": [{"capacity": 2, "id": "R"}]}
+    assert result_key(members, reordered, {"timeLimitSec": 10}) == base
+    assert result_key(members, config, {"timeLimitSec": 20}) != base
+    assert result_key(members, {**config, "weights": {"alpha": 0.3}}, {"timeLimitSec": 10}) != base
+    assert result_key({"members": members["members"][:1]}, config, {"timeLimitSec": 10}) != base
+
+    # Binary weights count by content, not by where the file lives
+    first, second = tmp_path / "config_1.npy", tmp_path / "config_2.npy"
+    np.save(first, np.eye(2, dtype=np.float32))
+    np.save(second, np.eye(2, dtype=np.float32))
+    keys = [result_key(members, {**config, "pairwiseFile": str(p)}, {}) for p in (first, second)]
+    assert keys[0] == keys[1]
+    np.save(second, np.ones((2, 2), dtype=np.float32))
+    assert result_key(members, {**config, "pairwiseFile": str(second)}, {}) != keys[0]
+
+
+def test_entries_expire_by_age_and_size():
+    clock = _Clock()
+    cache = ResultCache(max_entries=2, ttl_sec=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+    clock.now = 11
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_run_reuses_valid_entries_and_skips_uncacheable():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert cache.run("k", compute) == ({"n": 1}, False)
+    assert cache.run("k", compute) == ({"n": 1}, True)
+    assert cache.run("k", compute, valid=lambda v: False) == ({"n": 2}, False)
+
+    assert cache.run("bad", lambda: {"infeasible": True}, cacheable=lambda v: False)[1] is False
+    assert cache.get("bad") is None
+
+
+def test_identical_inflight_requests_share_one_run():
+    cache = ResultCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "solved"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.run("k", compute)))
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=lambda: results.append(cache.run("k", compute))) for _ in range(3)]
+    for t in others:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in [first, *others]:
+        t.join(5)
+
+    assert calls == [1]
+    assert sorted(results, key=lambda r: r[1]) == [("solved", False)] + [("solved", True)] * 3
+
+
+def test_failed_run_reaches_waiters_and_is_not_cached():
+    cache = ResultCache()
+    with pytest.raises(RuntimeError):
+        cache.run("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert cache.get("k") is None
+    assert cache.run("k", lambda: "ok") == ("ok", False)
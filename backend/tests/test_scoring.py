@@ -0,0 +1,109 @@
+import random
+import numpy as np
+from app.services.evaluate import SolutionState
+from app.services.optimize import score_assignment
+from app.services.scoring import ScoringContext, rooms_soft_scores, soft_scores, soft_scores_many
+from app.services.weights import build_pairwise_matrix, matrix_to_dict, save_pairwise_matrix
+
+
+def _members():
+    attrs = [
+        {"sleep": "Early", "temperature": "Cool", "messiness": 1},
+        {"sleep": "Early", "temperature": "Warm", "messiness": 4},
+        {"sleep": "Late", "messiness": 2},
+        {"sleep": "Late", "temperature": "Cool"},
+        {},
+    ]
+    members = [{"id": f"m{i}", "name": f"M{i}", "attributes": a} for i, a in enumerate(attrs)]
+    members[0].update(requestedWith=["M1", "M2"], avoidWith=["M3"], rankedRoomSizes={"2": 1, "3": 2})
+    members[3].update(requestedIds=["m0"], avoidIds=["m2"])
+    return members
+
+
+def _config(members, **extra):
+    ids, W = build_pairwise_matrix({"members": members}, dtype=np.float64)
+    return {
+        "rooms": [{"id": "A", "capacity": 3}, {"id": "B", "capacity": 2}, {"id": "C", "capacity": 2}],
+        "pairwiseW": matrix_to_dict(ids, W),
+        "weights": {"alpha": 0.5, "beta": 0.2},
+        **extra,
+    }
+
+
+def test_breakdown_counts_each_term():
+    members = _members()
+    config = _config(members)
+    ctx = ScoringContext(members, config, [3, 2, 2])
+    # A: m0 m1 m3, B: m2, m4 unassigned, C empty
+    scores = soft_scores(ctx, np.array([0, 0, 1, 0, -1]))
+
+    assert scores["requestsMet"] == 2 and scores["requestsUnmet"] == 1  # m0->m1, m3->m0 met; m0->m2 not
+    assert scores["avoidHits"] == 1  # m0 avoids m3
+    assert scores["sleepAgree"] == 1 and scores["sleepClash"] == 2
+    assert scores["temperatureAgree"] == 1 and scores["temperatureClash"] == 2
+    assert scores["roomUseAgree"] == scores["roomUseClash"] == 0
+    # A holds messiness 1 and 4 (m3 unrated); B has one rated member
+    assert scores["messinessSpread"] == 3 and scores["messinessSpreadMax"] == 3
+    assert scores["emptyBeds"] == 3 and scores["unassigned"] == 1
+    # m0 ranked the 3-bed size second: (5 - 2) * alpha
+    assert scores["rankBonus"] == 1.5
+    assert scores["emptyBedPenalty"] == -0.6
+
+
+def _random_instance(P=40, seed=2):
+    rng = random.Random(seed)
+    members = [
+        {
+            "id": f"m{i}",
+            "name": f"M{i}",
+            "attributes": {"sleep": rng.choice(["Early", "Late"]), "room_use": rng.choice(["Study", ""]),
+                           "messiness": rng.randint(1, 5)},
+            "requestedWith": [f"M{rng.randrange(P)}"],
+            "rankedRoomSizes": {"2": rng.randint(1, 3), "4": rng.randint(1, 3)},
+        }
+        for i in range(P)
+    ]
+    rooms = [{"id": f"R{r}", "label": f"R{r}", "capacity": 2 + 2 * (r % 2)} for r in range(16)]
+    return members, {**_config(members), "rooms": rooms}
+
+
+def test_no_rooms_scores_zero():
+    members = _members()
+    ctx = ScoringContext(members, _config(members, rooms=[]), [])
+    scores = soft_scores_many(ctx, np.full((2, len(members)), -1))
+
+    assert [(s["rankBonus"], s["pairwise"], s["unassigned"]) for s in scores] == [(0.0, 0.0, 5.0)] * 2
+
+
+def test_objective_terms_add_up_to_the_score_for_both_weight_formats(tmp_path):
+    members, config = _random_instance()
+    rng = np.random.default_rng(0)
+    capacities = [room["capacity"] for room in config["rooms"]]
+    A = np.stack([rng.permutation(np.repeat(np.arange(16), capacities))[:40] for _ in range(5)])
+
+    ids, W = build_pairwise_matrix({"members": members})
+    binary = {**config, "pairwiseW": {}, "pairwiseFile": save_pairwise_matrix(str(tmp_path / "w.npy"), W),
+              "pairwiseIds": ids}
+    for cfg in (config, binary):
+        ctx = ScoringContext(members, cfg, capacities)
+        batch = soft_scores_many(ctx, A)
+        for row, scores in zip(A, batch):
+            expected = score_assignment(members, cfg, dict(enumerate(row.tolist())))
+            assert abs(scores["pairwise"] + scores["rankBonus"] + scores["emptyBedPenalty"] - expected) < 1e-6
+            assert scores == soft_scores(ctx, row)
+
+
+def test_solution_state_breakdown_follows_moves():
+    members, config = _random_instance(P=12)
+    rooms = [{**room, "members": []} for room in config["rooms"]]
+    for p, m in enumerate(members):
+        rooms[p % 6]["members"].append(m)
+    state = SolutionState({"members": members}, config, rooms)
+
+    def objective(s):
+        return s["pairwise"] + s["rankBonus"] + s["emptyBedPenalty"]
+
+    assert abs(objective(state.soft_scores()) - state.score) < 1e-6
+    state.apply_moves([("move", "m0", "R9"), ("swap", "m1", "m2")])
+    assert abs(objective(state.soft_scores()) - state.score) < 1e-6
+    assert state.soft_scores() == rooms_soft_scores(members, config, state.rooms())
@@ -0,0 +1,53 @@
+import random
+import time
+import pytest
+from app.assignments import save_solution
+from app.config import available_cpus
+from app.models import Solution
+from app.services.optimize import run_optimization, solver_settings
+
+
+def _instance(P=60, seed=1):
+    rng = random.Random(seed)
+    ids = [f"m{i}" for i in range(P)]
+    members = {"members": [{"id": i, "name": i} for i in ids]}
+    config = {
+        "rooms": [{"id": f"R{r}", "label": f"R{r}", "capacity": 3} for r in range(P // 3)],
+        "pairwiseW": {i: {j: rng.uniform(-3, 3) for j in rng.sample(ids, 10) if j != i} for i in ids},
+    }
+    return members, config
+
+
+def test_settings_fill_defaults_and_reject_unknown_presets():
+    params = solver_settings({"seed": 7})
+    assert params["workers"] >= 1 and params["workers"] <= max(1, available_cpus())
+    assert params["seed"] == 7 and params["preset"] == "default"
+    assert params["relativeGap"] is None and params["noImprovementSec"] is None
+    assert solver_settings({"workers": 3})["workers"] == 3
+    with pytest.raises(ValueError):
+        solver_settings({"preset": "annealing"})
+
+
+def test_used_settings_come_back_with_the_result():
+    members, config = _instance(P=12)
+    result = run_optimization(
+        members, config, time_limit_sec=2, solver_params={"workers": 1, "seed": 5, "preset": "lns", "relativeGap": 0.5}
+    )
+    assert result["status"] in ("OPTIMAL", "FEASIBLE")
+    used = result["solverParams"]
+    assert used["engine"] == "cpsat" and used["timeLimitSec"] == 2
+    assert (used["workers"], used["seed"], used["preset"], used["relativeGap"]) == (1, 5, "lns", 0.5)
+
+
+def test_no_improvement_stops_a_long_search_early():
+    members, config = _instance()
+    started = time.time()
+    result = run_optimization(members, config, time_limit_sec=60, solver_params={"workers": 1, "noImprovementSec": 1})
+    assert result["status"] in ("OPTIMAL", "FEASIBLE")
+    assert time.time() - started < 30
+
+
+def test_solution_keeps_its_params(session):
+    sol = save_solution(session, 1, 1, [], 1.0, 10, {"engine": "cpsat", "seed": 3})
+    assert session.get(Solution, sol.id).get_params() == {"engine": "cpsat", "seed": 3}
+    assert save_solution(session, 1, 1, [], 1.0, 10).get_params() == {}
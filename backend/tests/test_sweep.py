@@ -0,0 +1,85 @@
+import threading
+from app.services.optimize import build_model, run_optimization, solve_model, weighted_objective
+from app.services.sweep import CoreBudget, pareto_front, run_sweep, sweep_metrics, weight_points
+
+
+def _instance():
+    members = [
+        {"id": "a", "name": "A", "requestedIds": ["b"], "rankedRoomSizes": {"2": 1, "3": 2}},
+        {"id": "b", "name": "B", "requestedIds": ["a"], "rankedRoomSizes": {"2": 1}},
+        {"id": "c", "name": "C", "requestedIds": [], "rankedRoomSizes": {"3": 1}},
+        {"id": "d", "name": "D", "requestedIds": ["c"], "rankedRoomSizes": {"2": 1}},
+    ]
+    config = {
+        "rooms": [{"id": "R2", "label": "R2", "capacity": 2}, {"id": "R3", "label": "R3", "capacity": 3}],
+        "pairwiseW": {"a": {"b": 3.0}, "d": {"c": 3.0}},
+    }
+    return {"members": members}, config
+
+
+def test_weight_points_from_points_grid_and_samples():
+    points = weight_points(
+        points=[{"alpha": 0.5}],
+        grid={"alpha": [0.0, 1.0], "beta": [0.0, 0.5]},
+        samples=3,
+        ranges={"beta": [0.0, 2.0]},
+        seed=4,
+        defaults={"alpha": 0.2, "beta": 0.1, "gamma": 0.3},
+    )
+    assert points[0] == {"alpha": 0.5, "beta": 0.1, "gamma": 0.3}
+    assert [(p["alpha"], p["beta"]) for p in points[1:5]] == [(0.0, 0.0), (0.0, 0.5), (1.0, 0.0), (1.0, 0.5)]
+    assert len(points) == 8 and all(p["alpha"] == 0.2 and 0 <= p["beta"] <= 2 for p in points[5:])
+    assert points[5:] == weight_points(samples=3, ranges={"beta": [0.0, 2.0]}, seed=4, defaults={"gamma": 0.3})
+
+
+def test_swapped_objective_matches_a_fresh_model():
+    members, config = _instance()
+    member_list = members["members"]
+    built = build_model(member_list, config)
+    for weights in ({"alpha": 0.0, "beta": 0.0}, {"alpha": 1.0, "beta": 2.0}, {"alpha": 0.4, "beta": 0.0}):
+        built["model"].Maximize(weighted_objective(built, member_list, config, weights))
+        solver, _ = solve_model(built["model"], 5, params={"workers": 1})
+        fresh = run_optimization(members, {**config, "weights": weights}, time_limit_sec=5)
+        assert solver.ObjectiveValue() / 100.0 == fresh["score"]
+
+
+def test_metrics_and_pareto_front():
+    members, config = _instance()
+    # a+b in the pair, c+d in the triple: both requests met, three first choices, one empty bed
+    metrics = sweep_metrics(members["members"], config["rooms"], {0: 0, 1: 0, 2: 1, 3: 1})
+    assert metrics == {"requestsMet": 1.0, "rankSatisfaction": 0.75, "emptyBeds": 1.0}
+
+    runs = [
+        {"metrics": {"requestsMet": 1.0, "rankSatisfaction": 0.5, "emptyBeds": 1.0}},
+        {"metrics": {"requestsMet": 0.5, "rankSatisfaction": 1.0, "emptyBeds": 1.0}},
+        {"metrics": {"requestsMet": 0.5, "rankSatisfaction": 0.5, "emptyBeds": 1.0}},
+        {"status": "UNKNOWN"},
+        {"metrics": {"requestsMet": 1.0, "rankSatisfaction": 0.5, "emptyBeds": 2.0}},
+    ]
+    assert pareto_front(runs) == [0, 1]
+
+
+def test_sweep_dedupes_gamma_and_returns_all_points():
+    members, config = _instance()
+    points = [{"alpha": 0.0, "beta": 0.0, "gamma": g} for g in (0.0, 0.5)] + [{"alpha": 1.0, "beta": 0.5, "gamma": 0.0}]
+    result = run_sweep(members, config, points, 2.0, CoreBudget(1), cores=4)
+
+    assert result["cores"] == 1 and result["processes"] == 1
+    assert [run["weights"] for run in result["runs"]] == points
+    assert result["runs"][0]["metrics"] == result["runs"][1]["metrics"]
+    assert all(run["status"] == "OPTIMAL" for run in result["runs"])
+    assert set(result["paretoFront"]) <= {0, 1, 2} and result["paretoFront"]
+
+
+def test_core_budget_caps_concurrent_sweeps():
+    budget = CoreBudget(3)
+    assert budget.acquire(2) == 2
+    assert budget.acquire(5) == 1
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(budget.acquire(2)))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    budget.release(2)
+    waiter.join(5)
+    assert got == [2]
@@ -0,0 +1,96 @@
+from app.models import ConfigModel, Dataset, SolveRun
+from app.routers import optimize as router
+from app.services import result_cache
+from app.services.optimize import run_optimization
+from app.services.telemetry import (
+    HEURISTIC_MAX_TIME_LIMIT_SEC,
+    HEURISTIC_MIN_TIME_LIMIT_SEC,
+    MAX_TIME_LIMIT_SEC,
+    MIN_TIME_LIMIT_SEC,
+    TIME_LIMIT_MARGIN,
+    record_run,
+    suggest_settings,
+)
+
+
+def _add(session, members, time_to_best_ms, workers=1, engine="cpsat", warm=False):
+    session.add(SolveRun(
+        engine=engine, members=members, rooms=members // 2, workers=workers,
+        time_to_best_ms=time_to_best_ms, warm_start=warm,
+    ))
+    session.commit()
+
+
+def test_run_reports_telemetry_and_is_recorded(session):
+    members = {"members": [{"id": f"m{i}", "name": f"M{i}"} for i in range(6)]}
+    config = {
+        "rooms": [{"id": f"R{r}", "label": f"R{r}", "capacity": 2} for r in range(3)],
+        "pairwiseW": {"m0": {"m1": 3.0}, "m2": {"m3": 2.0}},
+    }
+    result = run_optimization(members, config, time_limit_sec=5, solver_params={"workers": 1})
+    telemetry = result["telemetry"]
+    assert telemetry["curve"] and telemetry["curve"][-1][1] == result["score"]
+    assert 0 <= telemetry["timeToBestMs"] <= result["runtimeMs"] + 1
+
+    run = record_run(session, result, solution_id=7)
+    assert (run.solution_id, run.engine, run.members, run.rooms, run.workers) == (7, "cpsat", 6, 3, 1)
+    assert run.status == "OPTIMAL" and not run.warm_start
+    assert run.pairs == 2 and run.time_limit_sec == 5 and run.get_curve() == telemetry["curve"]
+
+
+def test_without_history_the_limit_follows_cohort_size(session):
+    small = suggest_settings(session, 20, 10)
+    large = suggest_settings(session, 2000, 1000)
+    assert small["basis"] == "size" and small["runs"] == 0
+    assert MIN_TIME_LIMIT_SEC <= small["timeLimitSec"] < large["timeLimitSec"] <= MAX_TIME_LIMIT_SEC
+
+
+def test_heuristic_keeps_its_own_budget(session):
+    assert suggest_settings(session, 2000, 1000, "heuristic")["timeLimitSec"] == HEURISTIC_MIN_TIME_LIMIT_SEC
+    for ms in (20_000, 40_000, 80_000):
+        _add(session, 2000, ms, engine="heuristic")
+    suggested = suggest_settings(session, 2000, 1000, "heuristic")
+    assert suggested["basis"] == "history" and suggested["timeLimitSec"] == HEURISTIC_MAX_TIME_LIMIT_SEC
+
+
+def test_limit_comes_from_similar_cold_runs(session):
+    for ms in (2000, 4000, 8000):
+        _add(session, 100, ms)
+    # Different engine, far-off size and warm starts do not count
+    _add(session, 100, 400_000, engine="heuristic")
+    _add(session, 1000, 400_000)
+    _add(session, 100, 400_000, warm=True)
+
+    suggested = suggest_settings(session, 110, 55)
+    assert suggested["basis"] == "history" and suggested["runs"] == 3
+    assert suggested["timeLimitSec"] == TIME_LIMIT_MARGIN * 8
+    assert suggested["workers"] is None
+
+
+def test_workers_prefer_the_count_that_reached_its_best_soonest(session, monkeypatch):
+    monkeypatch.setattr("app.services.telemetry.available_cpus", lambda: 8)
+    for ms in (9000, 10000, 11000):
+        _add(session, 100, ms, workers=1)
+    for ms in (3000, 4000, 5000):
+        _add(session, 100, ms, workers=4)
+    for ms in (100, 100, 100):
+        # More threads than this machine has
+        _add(session, 100, ms, workers=16)
+    assert suggest_settings(session, 100, 50)["workers"] == 4
+
+
+def test_requests_without_a_time_limit_hit_the_cache_as_suggestions_change(client, session, monkeypatch):
+    dataset = Dataset(label="d")
+    dataset.set_members({"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]})
+    session.add(dataset)
+    session.add(ConfigModel(dataset_id=1, config_json='{"rooms": [{"id": "R1", "label": "R1", "capacity": 2}]}'))
+    session.commit()
+    limits = iter([5.0, 7.0])
+    monkeypatch.setattr(router, "suggest_settings", lambda *args: {"timeLimitSec": next(limits), "workers": 1})
+    monkeypatch.setattr(result_cache, "_cache", None)
+
+    first = client.post("/optimize", json={"datasetId": 1, "configId": 1}).json()
+    second = client.post("/optimize", json={"datasetId": 1, "configId": 1}).json()
+
+    assert not first["cached"] and second["cached"]
+    assert second["solutionId"] == first["solutionId"]
@@ -0,0 +1,135 @@
+import itertools
+import json
+import os
+import random
+import numpy as np
+import pytest
+from sqlmodel import Session
+from app.config import get_settings
+from app.models import ConfigModel, Dataset
+from app.services.weights import (
+    MissingWeightsError,
+    build_pairwise_weights,
+    build_pairwise_matrix,
+    matrix_to_dict,
+    save_pairwise_matrix,
+    load_pairwise,
+)
+from app.services.coefficients import pair_coefficients, config_pair_coefficients
+
+
+def _reference_weights(members_doc):
+    # The original scalar rules, kept here to pin the vectorized output
+    members = members_doc["members"]
+    w = {m["id"]: {} for m in members}
+    for a, b in itertools.permutations(members, 2):
+        score = 0.0
+        if b["name"] in a.get("requestedWith", []):
+            score += 3.0
+        if b["name"] in a.get("avoidWith", []):
+            score += -3.0
+        a_attr, b_attr = a.get("attributes", {}), b.get("attributes", {})
+        for key in ("sleep", "temperature", "room_use"):
+            av, bv = a_attr.get(key), b_attr.get(key)
+            if av and bv:
+                score += 0.5 if av == bv else -0.5
+        am, bm = a_attr.get("messiness"), b_attr.get("messiness")
+        if isinstance(am, int) and isinstance(bm, int):
+            diff = abs(am - bm)
+            if diff <= 1:
+                score += 0.3
+            elif diff >= 3:
+                score -= 0.3
+        w[a["id"]][b["id"]] = max(-3.0, min(3.0, score))
+    return w
+
+
+def _random_members(n, seed=0):
+    rng = random.Random(seed)
+    names = [f"Person {i}" for i in range(n)]
+    members = []
+    for i in range(n):
+        attrs = {
+            "sleep": rng.choice(["Early", "Late", ""]),
+            "temperature": rng.choice(["Cool", "Warm", None]),
+            "room_use": rng.choice(["Study", "Social"]),
+        }
+        if rng.random() < 0.8:
+            attrs["messiness"] = rng.randint(1, 5)
+        members.append({
+            "id": f"m{i}",
+            "name": names[i],
+            "attributes": attrs,
+            "requestedWith": rng.sample(names, 3) + ["Nobody Here"],
+            "avoidWith": rng.sample(names, 1),
+        })
+    return {"members": members}
+
+
+def test_vectorized_weights_match_scalar_rules():
+    doc = _random_members(60)
+    assert build_pairwise_weights(doc) == _reference_weights(doc)
+
+
+def test_matrix_is_compact_and_round_trips():
+    doc = _random_members(20, seed=3)
+    ids, W = build_pairwise_matrix(doc)
+    assert W.dtype == np.float32 and W.shape == (20, 20)
+    assert not W.diagonal().any()
+    as_dict = matrix_to_dict(ids, W)
+    ref = _reference_weights(doc)
+    assert all(abs(as_dict[i][j] - ref[i][j]) < 1e-6 for i in ref for j in ref[i])
+
+
+def test_binary_weights_give_same_coefficients(tmp_path):
+    doc = _random_members(40, seed=5)
+    ids, W = build_pairwise_matrix(doc)
+    path = save_pairwise_matrix(str(tmp_path / "weights" / "config_1.npy"), W)
+    config = {"pairwiseFile": path, "pairwiseIds": ids, "pairwiseThreshold": 0.4}
+    loaded_ids, loaded = load_pairwise(config)
+    assert loaded_ids == ids and isinstance(loaded, np.memmap)
+
+    # Members in a different order, one unknown to the matrix
+    member_ids = list(reversed(ids[:30])) + ["ghost"]
+    expected = pair_coefficients(member_ids, build_pairwise_weights(doc), 0.4)
+    assert config_pair_coefficients(member_ids, config) == expected
+    # Inline JSON weights take precedence over a file
+    assert load_pairwise({**config, "pairwiseW": {"a": {"b": 1.0}}}) is None
+
+
+def test_saved_config_points_at_its_matrix_and_failed_saves_leave_no_file(client, session, monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "data_dir", str(tmp_path))
+    dataset = Dataset(label="d")
+    dataset.set_members({"members": [{"id": "a", "name": "A", "requestedWith": ["B"]}, {"id": "b", "name": "B"}]})
+    session.add(dataset)
+    session.commit()
+    weights_dir = tmp_path / "weights"
+
+    config_id = client.post("/config", json={"datasetId": dataset.id, "config": {"rooms": []}}).json()["configId"]
+    saved = json.loads(session.get(ConfigModel, config_id).config_json)
+    assert saved["pairwiseIds"] == ["a", "b"] and os.path.isabs(saved["pairwiseFile"])
+    assert [str(p) for p in weights_dir.iterdir()] == [saved["pairwiseFile"]]
+
+    def fail(self):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(Session, "commit", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/config", json={"datasetId": dataset.id, "config": {"rooms": []}})
+    assert [str(p) for p in weights_dir.iterdir()] == [saved["pairwiseFile"]]
+
+
+def test_missing_matrix_file_is_a_client_error(client, session, tmp_path):
+    config = {"pairwiseFile": str(tmp_path / "gone.npy"), "pairwiseIds": ["a", "b"]}
+    with pytest.raises(MissingWeightsError, match="gone.npy"):
+        load_pairwise(config)
+
+    dataset = Dataset(label="d")
+    dataset.set_members({"members": [{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]})
+    session.add(dataset)
+    rooms = [{"id": "R1", "label": "R1", "capacity": 2}]
+    session.add(ConfigModel(dataset_id=1, config_json=json.dumps({"rooms": rooms, **config})))
+    session.commit()
+
+    response = client.post("/optimize", json={"datasetId": 1, "configId": 1, "timeLimitSec": 5})
+    assert response.status_code == 409 and "save the config again" in response.json()["detail"]
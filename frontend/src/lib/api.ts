@@ -32,14 +32,50 @@ export const ConfigAPI = {
   save: (datasetId: number, config: any) => api.post('/config', { datasetId, config }).then(r => r.data),
 }
 
+export type SolverParams = {
+  workers?: number, relativeGap?: number, absoluteGap?: number, noImprovementSec?: number, seed?: number,
+  preset?: 'default' | 'lns' | 'lnsOnly',
+}
+
 export const OptimizeAPI = {
-  run: (datasetId: number, configId: number, timeLimitSec = 60) =>
-    api.post('/optimize', { datasetId, configId, timeLimitSec }).then(r => r.data),
+  // timeLimitSec left out: the server picks one from past runs on similar cohorts
+  run: (datasetId: number, configId: number, timeLimitSec?: number, engine: 'cpsat' | 'heuristic' | 'hybrid' = 'cpsat', solver: SolverParams = {}) =>
+    api.post('/optimize', { datasetId, configId, timeLimitSec, engine, solver }).then(r => r.data),
+  warmStart: (datasetId: number, configId: number, solutionId: number, opts: { lockedRoomIds?: string[], minimizeMoves?: boolean, timeLimitSec?: number } = {}) =>
+    api.post('/optimize', { datasetId, configId, solutionId, timeLimitSec: opts.timeLimitSec ?? 30, lockedRoomIds: opts.lockedRoomIds ?? [], minimizeMoves: opts.minimizeMoves ?? false }).then(r => r.data),
+  suggest: (datasetId: number, configId: number, engine: 'cpsat' | 'heuristic' | 'hybrid' = 'cpsat') =>
+    api.post('/optimize/suggest', { datasetId, configId, engine }).then(r => r.data),
+  submitJob: (datasetId: number, configId: number, timeLimitSec?: number) =>
+    api.post('/optimize/jobs', { datasetId, configId, timeLimitSec }).then(r => r.data),
+  jobStatus: (jobId: string) => api.get(`/optimize/jobs/${jobId}`).then(r => r.data),
+  cancelJob: (jobId: string) => api.post(`/optimize/jobs/${jobId}/cancel`).then(r => r.data),
+  jobEventsUrl: (jobId: string) => `${api.defaults.baseURL}/optimize/jobs/${jobId}/events`,
+  // Starts a sweep job: follow it with jobStatus / jobEventsUrl, the runs arrive in status.sweep
+  sweep: (datasetId: number, configId: number, opts: { points?: Record<string, number>[], grid?: Record<string, number[]>, samples?: number, timeLimitSec?: number, cores?: number } = {}) =>
+    api.post('/optimize/sweep', { datasetId, configId, ...opts }).then(r => r.data),
 }
 
 export const SolutionAPI = {
+  get: (solutionId: number) => api.get(`/solution/${solutionId}`).then(r => r.data),
+  compare: (payload: { datasetId?: number, solutionIds?: number[], sortBy?: string, descending?: boolean }) =>
+    api.post('/solution/compare', payload).then(r => r.data),
   applyMove: (solutionId: number, payload: { memberId: string, fromRoomId?: string | null, toRoomId?: string | null }) =>
     api.post(`/solution/${solutionId}/apply-move`, payload).then(r => r.data),
+  previewMove: (solutionId: number, payload: { memberId: string, toRoomId?: string | null }) =>
+    api.post(`/solution/${solutionId}/preview-move`, payload).then(r => r.data),
+  undo: (solutionId: number) => api.post(`/solution/${solutionId}/undo`).then(r => r.data),
+  redo: (solutionId: number) => api.post(`/solution/${solutionId}/redo`).then(r => r.data),
+  at: (solutionId: number, moveSeq: number) => api.get(`/solution/${solutionId}/history/${moveSeq}`).then(r => r.data),
+  reoptimize: (solutionId: number, payload: { roomIds?: string[], memberIds?: string[], timeLimitSec?: number }) =>
+    api.post(`/solution/${solutionId}/reoptimize`, payload).then(r => r.data),
+}
+
+// Shared editing channel of a solution: messages are hello, delta, ack, reject and resync
+export function liveSolution(solutionId: number, onMessage: (msg: any) => void): WebSocket {
+  const base = (api.defaults.baseURL || '').replace(/^http/, 'ws')
+  const ws = new WebSocket(`${base}/solution/${solutionId}/live`)
+  ws.onmessage = ev => onMessage(JSON.parse(ev.data))
+  return ws
 }
 
 export default api
@@ -22,7 +22,8 @@ export function Upload() {
     try {
       const res = await UploadAPI.uploadCSV(file)
       setDatasetId(res.datasetId)
-      setMessage(`Successfully uploaded ${res.memberCount} members`)
+      const unresolved = res.unresolvedRequests ? ` (${res.unresolvedRequests} roommate requests did not match anyone)` : ''
+      setMessage(`Successfully uploaded ${res.memberCount} members${unresolved}`)
       setTimeout(() => nav('/setup', { state: { datasetId: res.datasetId } }), 1200)
     } catch (error) {
       setMessage('Upload failed. Please try again.')